@@ -1,11 +1,62 @@
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Tuple
+import bisect
+import logging
+import os
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from timespan import DAY_MINUTES, Span, hour_of, parse_minutes, to_iso
+from . import vector_scoring
 from .base import Agent
+from .optimal import PRIORITY_WEIGHTS, search_order, solve, weighted_minutes
+from .slot_index import SlotIndex
+
+logger = logging.getLogger(__name__)
 
 
 class AllocatorAgent(Agent):
+    """Places tasks into free slots in Eisenhower priority order.
+
+    ``scoring`` (default: FLOW_ALLOCATOR_SCORING, else "indexed") selects
+    how each task's slot is chosen:
+    - "indexed": best-fit lookups in a SlotIndex
+    - "vector": a NumPy tasks × slots cost matrix that also weighs
+      preference distance and learned slot weights (``state["slotWeights"]``)
+    - "vector_compat": the NumPy matrix with the indexed mode's exact
+      scoring and tie-breaking, for A/B comparison
+    The vector modes need numpy and fall back to "indexed" without it.
+
+    ``allocation`` (default: FLOW_ALLOCATOR_MODE, else "greedy") set to
+    "optimal" then searches for the placement maximizing priority-weighted
+    scheduled minutes (high 3, medium 2, low 1), starting from the greedy
+    result and stopping after ``time_budget_ms``. The greedy placement is
+    kept unless the search strictly beats it. ``state["allocationStats"]``
+    reports tasks and minutes scheduled, and in optimal mode the greedy
+    baseline alongside.
+
+    Greedy placement never starts a task too late to finish by its
+    ``deadline``. Given a ``state["slotStream"]`` (see
+    ``ConstraintAgent(streaming=True)``), indexed greedy placement pulls
+    slots day by day only until every task is placed or its deadline has
+    passed. Other modes read the whole stream first.
+    """
+
     name = "allocator"
 
+    SCORING_MODES = ("indexed", "vector", "vector_compat")
+    ALLOCATION_MODES = ("greedy", "optimal")
+
+    def __init__(self, scoring: Optional[str] = None, allocation: Optional[str] = None,
+                 time_budget_ms: float = 200):
+        self.allocation = allocation or os.environ.get("FLOW_ALLOCATOR_MODE", "greedy")
+        if self.allocation not in self.ALLOCATION_MODES:
+            raise ValueError(f"Unknown allocation mode: {self.allocation}")
+        self.time_budget_ms = time_budget_ms
+        self.scoring = scoring or os.environ.get("FLOW_ALLOCATOR_SCORING", "indexed")
+        if self.scoring not in self.SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode: {self.scoring}")
+        if self.scoring != "indexed" and not vector_scoring.available():
+            logger.warning("numpy is not installed; using indexed scoring")
+            self.scoring = "indexed"
+
     def _categorize_tasks(self, tasks: List[Dict]) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict]]:
         """Categorize tasks using Eisenhower matrix."""
         urgent_important = []
@@ -34,33 +85,51 @@ class AllocatorAgent(Agent):
         return (urgent_important, not_urgent_important, 
                 urgent_not_important, not_urgent_not_important)
 
-    def _find_best_slot(self, task: Dict, available_slots: List[Dict], 
-                        preferences: Dict) -> Dict:
-        """Find the best available slot for a task considering preferences."""
-        task_duration = task.get("estimatedMinutes", 60) / 60  # Convert to hours
-        task_category = task.get("category", "")
-        preferred_time = preferences.get(f"preferred_{task_category}_time", "")
+    def _slot_spans(self, state: Dict[str, Any]) -> List[Span]:
+        """Return the free slots as spans, parsing availableSlots only if needed."""
+        spans = state.get("slotIntervals")
+        if spans is None:
+            spans = [Span.parse(s["startTime"], s["endTime"]) for s in state.get("availableSlots", [])]
+        return spans
+
+    def prioritized(self, tasks: List[Dict]) -> List[Tuple[Dict, str]]:
+        """Return tasks in placement order, each tagged with its priority once."""
+        quadrants = self._categorize_tasks(tasks)
+        labels = ("high", "medium", "low", "low")
+        return [(task, label) for quadrant, label in zip(quadrants, labels) for task in quadrant]
+
+    def preferred_hour(self, task: Dict, preferences: Dict) -> Optional[int]:
+        """Return the hour the task's category prefers, if any."""
+        preferred_time = preferences.get(f"preferred_{task.get('category', '')}_time", "")
+        return int(preferred_time.split(":")[0]) if preferred_time else None
+
+    def _find_best_slot(self, task: Dict, available_slots: List[Span],
+                        preferences: Dict) -> Optional[Span]:
+        """Find the best available slot for a task considering preferences.
+
+        Linear-scan reference for ``SlotIndex.best_fit``, which the allocator
+        uses (ties there go to the earliest start rather than list order).
+        """
+        task_minutes = task.get("estimatedMinutes", 60)
+        task_duration = task_minutes / 60  # Convert to hours
+        preferred_hour = self.preferred_hour(task, preferences)
 
         best_slot = None
         min_score = float('inf')
 
         for slot in available_slots:
-            if slot["duration"] < task_duration:
+            if slot.minutes < task_minutes:
                 continue
 
-            slot_start = datetime.fromisoformat(slot["startTime"])
-            
             # Score the slot (lower is better)
             score = 0
             
             # Prefer slots that closely match the task duration
-            score += abs(slot["duration"] - task_duration)
+            score += abs(slot.hours - task_duration)
             
             # Prefer slots that match category preferences
-            if preferred_time:
-                preferred_hour = int(preferred_time.split(":")[0])
-                if abs(slot_start.hour - preferred_hour) > 2:
-                    score += 2
+            if preferred_hour is not None and abs(hour_of(slot.start) - preferred_hour) > 2:
+                score += 2
             
             if score < min_score:
                 min_score = score
@@ -68,10 +137,145 @@ class AllocatorAgent(Agent):
 
         return best_slot
 
-    def _allocate_breaks(self, schedule: List[Dict], preferences: Dict) -> List[Dict]:
+    def _place(self, prioritized: List[Tuple[Dict, str]], available_slots: List[Span],
+               preferences: Dict, state: Dict[str, Any]) -> List[Optional[Span]]:
+        """Greedy placement with the configured scoring mode."""
+        if self.scoring == "indexed":
+            return self._place_indexed(prioritized, available_slots, preferences)
+        return vector_scoring.vector_allocate(
+            [(task, self.preferred_hour(task, preferences)) for task, _ in prioritized],
+            available_slots,
+            compat=self.scoring == "vector_compat",
+            slot_weights=state.get("slotWeights"),
+            latest_starts=[self.latest_start(task) for task, _ in prioritized]
+        )
+
+    def _place_indexed(self, prioritized: List[Tuple[Dict, str]], available_slots: List[Span],
+                       preferences: Dict) -> List[Optional[Span]]:
+        """Place tasks in order with best-fit lookups; None where a task does not fit."""
+        remaining_slots = SlotIndex(available_slots)
+        spans: List[Optional[Span]] = []
+        for task, _ in prioritized:
+            best_slot = remaining_slots.best_fit(
+                task.get("estimatedMinutes", 60), self.preferred_hour(task, preferences),
+                self.latest_start(task)
+            )
+            if not best_slot:
+                spans.append(None)
+                continue
+
+            spans.append(self._take(remaining_slots, best_slot, task.get("estimatedMinutes", 60)))
+        return spans
+
+    def _take(self, index: SlotIndex, slot: Span, minutes: int) -> Span:
+        """Place a task at the start of `slot` and return its span."""
+        task_span = Span(slot.start, slot.start + minutes)
+        # Split the slot, keeping the leftover if there's still 30+ minutes
+        index.remove(slot)
+        if slot.end - task_span.end >= 30:
+            index.add(Span(task_span.end, slot.end))
+        return task_span
+
+    def _deadline(self, task: Dict) -> Optional[int]:
+        """Epoch minute a task must finish by; a bare date means end of that day."""
+        deadline = task.get("deadline")
+        if not deadline:
+            return None
+        try:
+            if len(deadline) == 10:
+                return parse_minutes(f"{deadline}T00:00:00") + DAY_MINUTES
+            return parse_minutes(deadline)
+        except (TypeError, ValueError):
+            return None
+
+    def latest_start(self, task: Dict, minutes: Optional[int] = None) -> Optional[int]:
+        """Latest epoch minute a task (of `minutes`, else its estimate) can start and meet its deadline."""
+        deadline = self._deadline(task)
+        if deadline is None:
+            return None
+        return deadline - (minutes if minutes is not None else task.get("estimatedMinutes", 60))
+
+    def _place_streaming(self, prioritized: List[Tuple[Dict, str]], stream: Iterator[Span],
+                         preferences: Dict) -> Tuple[List[Optional[Span]], List[Span]]:
+        """Place tasks while pulling free slots from a day-ordered stream.
+
+        Each task takes the best-fitting slot among the days pulled so far.
+        Another day is pulled only when nothing fits and the task's deadline
+        still allows it. Returns the task spans and the slots pulled.
+        """
+        stream = iter(stream)
+        upcoming = next(stream, None)
+        remaining_slots = SlotIndex()
+        pulled: List[Span] = []
+        spans: List[Optional[Span]] = []
+        for task, _ in prioritized:
+            minutes = task.get("estimatedMinutes", 60)
+            preferred_hour = self.preferred_hour(task, preferences)
+            latest_start = self.latest_start(task)
+            while True:
+                best_slot = remaining_slots.best_fit(minutes, preferred_hour, latest_start)
+                if best_slot or upcoming is None:
+                    break
+                if latest_start is not None and upcoming.start > latest_start:
+                    break
+                day_end = (upcoming.start // DAY_MINUTES + 1) * DAY_MINUTES
+                while upcoming is not None and upcoming.start < day_end:
+                    remaining_slots.add(upcoming)
+                    pulled.append(upcoming)
+                    upcoming = next(stream, None)
+            spans.append(self._take(remaining_slots, best_slot, minutes) if best_slot else None)
+        return spans, pulled
+
+    def _summary(self, prioritized: List[Tuple[Dict, str]], spans: List[Optional[Span]]) -> Dict[str, int]:
+        """Tasks, minutes and priority-weighted minutes actually scheduled."""
+        placed = [
+            (task_span.minutes, priority)
+            for (_, priority), task_span in zip(prioritized, spans)
+            if task_span is not None
+        ]
+        return {
+            "tasks": len(placed),
+            "minutes": sum(minutes for minutes, _ in placed),
+            "weightedMinutes": weighted_minutes(placed)
+        }
+
+    def _optimize(self, prioritized: List[Tuple[Dict, str]], available_slots: List[Span],
+                  greedy: List[Optional[Span]]) -> Tuple[List[Optional[Span]], Dict[str, Any]]:
+        """Improve on the greedy placement with the branch-and-bound solver."""
+        slots = sorted(available_slots, key=lambda slot: slot.start)
+        starts = [slot.start for slot in slots]
+        sizes = [task.get("estimatedMinutes", 60) for task, _ in prioritized]
+        # Each greedy span lies inside exactly one original slot
+        incumbent = [
+            bisect.bisect_right(starts, task_span.start) - 1 if task_span is not None else -1
+            for task_span in greedy
+        ]
+        weights = [PRIORITY_WEIGHTS[priority] for _, priority in prioritized]
+        assignment, search = solve(
+            sizes, weights, [slot.minutes for slot in slots], incumbent, self.time_budget_ms,
+            bin_starts=starts, latest_starts=[self.latest_start(task) for task, _ in prioritized]
+        )
+        search = {"nodes": search["nodes"], "provenOptimal": search["provenOptimal"]}
+        if assignment == incumbent:
+            return greedy, search
+
+        # Pack each slot's tasks back to back from its start in the solver's
+        # order, which its deadline checks assumed
+        cursor = {}
+        spans: List[Optional[Span]] = [None] * len(sizes)
+        for i in search_order(sizes, weights):
+            b = assignment[i]
+            if b < 0:
+                continue
+            start = cursor.get(b, slots[b].start)
+            spans[i] = Span(start, start + sizes[i])
+            cursor[b] = start + sizes[i]
+        return spans, search
+
+    def allocate_breaks(self, placed: List[Tuple[Span, Dict]], preferences: Dict) -> List[Tuple[Span, Dict]]:
         """Add breaks between tasks based on preferences."""
-        if not schedule:
-            return schedule
+        if not placed:
+            return placed
 
         break_duration = preferences.get("breakDuration", 15)
         min_work_block = preferences.get("minWorkBlock", 45)
@@ -79,81 +283,85 @@ class AllocatorAgent(Agent):
         enhanced_schedule = []
         last_end = None
 
-        for event in schedule:
-            start = datetime.fromisoformat(event["startTime"])
-            
-            if last_end:
-                work_duration = (start - last_end).total_seconds() / 60
+        for span, fields in placed:
+            if last_end is not None:
+                work_duration = span.start - last_end
                 if work_duration >= min_work_block:
-                    break_start = last_end
-                    break_end = break_start + timedelta(minutes=break_duration)
-                    if break_end < start:
-                        enhanced_schedule.append({
-                            "title": "Break",
-                            "category": "break",
-                            "startTime": break_start.isoformat(),
-                            "endTime": break_end.isoformat()
-                        })
-
-            enhanced_schedule.append(event)
-            last_end = datetime.fromisoformat(event["endTime"])
+                    break_end = last_end + break_duration
+                    if break_end < span.start:
+                        enhanced_schedule.append((Span(last_end, break_end), {"title": "Break", "category": "break"}))
+
+            enhanced_schedule.append((span, fields))
+            last_end = span.end
 
         return enhanced_schedule
 
+    def entry_fields(self, task: Dict, priority: str) -> Dict[str, Any]:
+        """The task fields a schedule entry carries."""
+        fields = {"title": task["title"], "category": task.get("category", ""), "priority": priority}
+        if task.get("deadline"):
+            fields["deadline"] = task["deadline"]
+        return fields
+
+    def serialize(self, placed: List[Tuple[Span, Dict]]) -> List[Dict]:
+        """Render placed spans as schedule entries with ISO times."""
+        schedule = []
+        for span, fields in placed:
+            entry = {
+                "title": fields["title"],
+                "category": fields["category"],
+                "startTime": to_iso(span.start),
+                "endTime": to_iso(span.end)
+            }
+            for key in ("priority", "deadline"):
+                if key in fields:
+                    entry[key] = fields[key]
+            schedule.append(entry)
+        return schedule
+
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Allocate tasks to available time slots using Eisenhower prioritization."""
         tasks = state.get("tasks", [])
-        available_slots = state.get("availableSlots", [])
         preferences = state.get("preferences", {})
-        
-        if not tasks or not available_slots:
-            state["schedule"] = []
-            return state
+        # A slot stream can be consumed once; it is not kept in the state
+        stream = state.pop("slotStream", None)
 
-        # Categorize tasks using Eisenhower matrix
-        (urgent_important, not_urgent_important,
-         urgent_not_important, not_urgent_not_important) = self._categorize_tasks(tasks)
+        if stream is not None and self.scoring == "indexed" and self.allocation == "greedy":
+            prioritized = self.prioritized(tasks)
+            spans, pulled = self._place_streaming(prioritized, stream, preferences)
+            # Only the slots actually examined are reported
+            state["availableSlots"] = [span.to_slot() for span in pulled]
+        else:
+            if stream is not None:
+                state["slotIntervals"] = list(stream)
+                state["availableSlots"] = [span.to_slot() for span in state["slotIntervals"]]
+            available_slots = self._slot_spans(state)
+            if not tasks or not available_slots:
+                state["schedule"] = []
+                return state
+            prioritized = self.prioritized(tasks)
+            spans = self._place(prioritized, available_slots, preferences, state)
 
-        # Combine all tasks in priority order
-        all_tasks = (urgent_important + not_urgent_important + 
-                    urgent_not_important + not_urgent_not_important)
+        stats = {
+            "mode": self.allocation,
+            "scoring": self.scoring,
+            "totalTasks": len(tasks),
+            "scheduled": self._summary(prioritized, spans)
+        }
+        if self.allocation == "optimal":
+            greedy_stats = stats["scheduled"]
+            spans, search = self._optimize(prioritized, available_slots, spans)
+            stats.update(search, greedy=greedy_stats, scheduled=self._summary(prioritized, spans))
+        state["allocationStats"] = stats
 
-        schedule = []
-        remaining_slots = available_slots.copy()
+        placed = [
+            (task_span, self.entry_fields(task, priority))
+            for (task, priority), task_span in zip(prioritized, spans)
+            if task_span is not None
+        ]
 
-        # Allocate tasks to slots
-        for task in all_tasks:
-            best_slot = self._find_best_slot(task, remaining_slots, preferences)
-            if not best_slot:
-                continue
+        # Add breaks between tasks, then render ISO times once
+        placed = self.allocate_breaks(sorted(placed, key=lambda p: p[0].start), preferences)
 
-            # Calculate task end time
-            task_duration = task.get("estimatedMinutes", 60)
-            start_time = datetime.fromisoformat(best_slot["startTime"])
-            end_time = start_time + timedelta(minutes=task_duration)
-
-            # Create schedule entry
-            schedule_entry = {
-                "title": task["title"],
-                "category": task["category"],
-                "startTime": start_time.isoformat(),
-                "endTime": end_time.isoformat(),
-                "priority": "high" if task in urgent_important else "medium" if task in not_urgent_important else "low"
-            }
-            schedule.append(schedule_entry)
-
-            # Update the slot
-            remaining_duration = (datetime.fromisoformat(best_slot["endTime"]) - end_time).total_seconds() / 3600
-            if remaining_duration >= 0.5:  # If there's still 30+ minutes
-                remaining_slots.append({
-                    "startTime": end_time.isoformat(),
-                    "endTime": best_slot["endTime"],
-                    "duration": remaining_duration
-                })
-            remaining_slots.remove(best_slot)
-
-        # Add breaks between tasks
-        schedule = self._allocate_breaks(sorted(schedule, key=lambda x: x["startTime"]), preferences)
-
-        state["schedule"] = schedule
+        state["schedule"] = self.serialize(placed)
         return state
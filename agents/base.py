@@ -8,3 +8,17 @@ class Agent:
 
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
         raise NotImplementedError
+
+    async def arun(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Asynchronous run; agents that call the LLM override this to await it."""
+        return self.run(state)
+
+
+def record_prompt_stats(state: Dict[str, Any], agent: str, rendered) -> None:
+    """Note a prompt's estimated tokens before and after compact rendering."""
+    state.setdefault("promptStats", []).append({
+        "agent": agent,
+        "tokensBefore": rendered.tokens_before,
+        "tokensAfter": rendered.tokens_after,
+        "dropped": rendered.dropped
+    })
@@ -1,4 +1,4 @@
-from .base import Agent
+from .base import Agent, record_prompt_stats
 
 
 from llm_client import LLMClient
@@ -9,15 +9,29 @@ class CoachAgent(Agent):
     name = "coach"
 
     def __init__(self):
-        self.llm = LLMClient()
+        self.llm = LLMClient.shared()
 
     def run(self, state):
+        resp = self.llm.generate_validated(self._prompt(state), self.name)
+        return self._apply(state, resp)
+
+    async def arun(self, state):
+        """Like run, awaiting the LLM so other calls can proceed meanwhile."""
+        resp = await self.llm.agenerate_validated(self._prompt(state), self.name)
+        return self._apply(state, resp)
+
+    def _prompt(self, state):
         schedule = state.get("schedule", [])
         context = state.get("context", [])
         
         # get LLM to generate coaching message
-        prompt = CoachPromptTemplate.format(context=context, schedule=schedule)
-        resp = self.llm.generate(prompt)
+        rendered = CoachPromptTemplate.render(context=context, schedule=schedule,
+                                              preferences=state.get("preferences"))
+        record_prompt_stats(state, self.name, rendered)
+        return rendered.text
+
+    def _apply(self, state, resp):
+        schedule = state.get("schedule", [])
         parsed = parse_llm_response(resp["text"])
         
         # attach message and any concerns
@@ -1,9 +1,235 @@
+"""Sort-and-sweep conflict detection and priority-based resolution."""
+import bisect
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from timespan import Span, parse_minutes, to_iso
 from .base import Agent
+from .constraint import ConstraintAgent
+from .recurrence import expand, is_recurring
+from .timeline import (busy_intervals, expansion_window, free_intervals, merge_intervals,
+                       parse_clock, working_windows)
+
+# Lower ranks win a conflict. Fixed and imported events never move.
+IMMOVABLE_RANK = 0
+PRIORITY_RANK = {"high": 1, "medium": 2, "low": 3}
+UNKNOWN_RANK = 4
+BREAK_RANK = 5
+
+
+class Item(NamedTuple):
+    start: int
+    end: int
+    rank: int
+    source: str
+    # Index into the source list (fixed events, imported events or schedule)
+    index: int
+
+
+def _event_items(events: List[Dict], source: str, window: Optional[Tuple[int, int]]) -> List[Item]:
+    """One item per event occurrence; recurring events are expanded within `window`."""
+    items = []
+    for i, event in enumerate(events):
+        if window is not None and is_recurring(event):
+            occurrences = expand(event, *window)
+        else:
+            occurrences = [(parse_minutes(event.get("startTime") or event["start"]),
+                            parse_minutes(event.get("endTime") or event["end"]))]
+        items.extend(Item(start, end, IMMOVABLE_RANK, source, i)
+                     for start, end in occurrences if end > start)
+    return items
+
+
+def _schedule_rank(entry: Dict) -> int:
+    if entry.get("category") == "break":
+        return BREAK_RANK
+    return PRIORITY_RANK.get(entry.get("priority"), UNKNOWN_RANK)
+
+
+def conflict_groups(items: List[Item]) -> List[List[Item]]:
+    """Sweep items by start time, grouping chains of overlapping items.
+
+    Two items share a group when they overlap directly or through other
+    members. Only groups of two or more are returned. Sorting dominates,
+    so this is O(n log n).
+    """
+    groups: List[List[Item]] = []
+    group: List[Item] = []
+    group_end = None
+    for item in sorted(items):
+        if group and item.start < group_end:
+            group.append(item)
+            group_end = max(group_end, item.end)
+        else:
+            if len(group) > 1:
+                groups.append(group)
+            group, group_end = [item], item.end
+    if len(group) > 1:
+        groups.append(group)
+    return groups
+
+
+def _overlaps(busy: List[Tuple[int, int]], start: int, end: int) -> bool:
+    """Whether [start, end) overlaps any interval of a sorted, disjoint list."""
+    i = bisect.bisect_left(busy, (end,))
+    return i > 0 and busy[i - 1][1] > start
+
+
+class FreeSlots:
+    """Free spans ordered by start, for nearest-slot placement."""
+
+    def __init__(self, spans: List[Span]):
+        self._spans = [(span.start, span.end) for span in spans]
+
+    def nearest(self, start: int, minutes: int) -> Optional[int]:
+        """Start of the free placement of `minutes` closest to `start`, or None.
+
+        Spans are disjoint and sorted, so the distance only grows moving away
+        from `start` in either direction: the first fit each way is the best.
+        """
+        pos = bisect.bisect_right(self._spans, (start, float("inf")))
+        best = None
+        for i in range(pos - 1, -1, -1):
+            free_start, free_end = self._spans[i]
+            if free_end - free_start >= minutes:
+                best = min(max(start, free_start), free_end - minutes)
+                break
+        for i in range(pos, len(self._spans)):
+            free_start, free_end = self._spans[i]
+            if free_end - free_start >= minutes:
+                if best is None or free_start - start < abs(start - best):
+                    best = free_start
+                break
+        return best
+
+    def take(self, start: int, end: int) -> None:
+        """Occupy [start, end), which lies inside one free span."""
+        i = bisect.bisect_right(self._spans, (start, float("inf"))) - 1
+        free_start, free_end = self._spans[i]
+        rest = [(s, e) for s, e in ((free_start, start), (end, free_end)) if e > s]
+        self._spans[i:i + 1] = rest
+
 
 class ConflictResolverAgent(Agent):
+    """Finds and resolves overlaps between fixed events, imported calendar
+    events (``state["importedEvents"]``) and the schedule.
+
+    Overlaps are found with a sort-and-sweep over every item, reported in
+    ``state["conflicts"]`` as groups of mutually overlapping items. In each
+    group fixed and imported events stay put and schedule entries keep
+    their time in priority order (high, medium, low, then breaks) unless
+    something ranked higher already holds it. Displaced tasks move to the
+    nearest free time within working hours; displaced breaks are dropped.
+    Tasks with nowhere to go are removed from the schedule and marked
+    "unscheduled" in their group.
+    """
+
     name = "conflict_resolver"
 
-    def run(self, state):
-        # Stub: In a future phase, resolve schedule conflicts
-        state.setdefault("conflicts", [])
+    def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        fixed_events = state.get("fixedEvents", [])
+        imported = state.get("importedEvents", [])
+        schedule = state.get("schedule", [])
+        preferences = state.get("preferences", {})
+
+        entries = [
+            Item(parse_minutes(e["startTime"]), parse_minutes(e["endTime"]), _schedule_rank(e), "schedule", i)
+            for i, e in enumerate(schedule)
+        ]
+        events = fixed_events + imported
+        window = None
+        horizon = None
+        if any(is_recurring(e) for e in events):
+            first = busy_intervals(events) + [(item.start, item.end) for item in entries]
+            horizon = ConstraintAgent().horizon(state, sorted(first), True)
+            window = expansion_window(*horizon)
+        items = (_event_items(fixed_events, "fixed", window)
+                 + _event_items(imported, "imported", window) + entries)
+
+        groups = conflict_groups(items)
+        actions: Dict[Item, str] = {}
+        displaced: List[Item] = []
+        for group in groups:
+            busy = merge_intervals((item.start, item.end) for item in group if item.rank == IMMOVABLE_RANK)
+            for item in sorted(group, key=lambda item: (item.rank, item.start)):
+                if item.rank == IMMOVABLE_RANK:
+                    actions[item] = "kept"
+                elif _overlaps(busy, item.start, item.end):
+                    displaced.append(item)
+                else:
+                    bisect.insort(busy, (item.start, item.end))
+                    actions[item] = "kept"
+
+        moved: Dict[int, Tuple[int, int]] = {}
+        if displaced:
+            free = self._free_slots(state, items, set(displaced), horizon, preferences)
+            for item in sorted(displaced, key=lambda item: (item.rank, item.start)):
+                minutes = item.end - item.start
+                start = None if item.rank == BREAK_RANK else free.nearest(item.start, minutes)
+                if start is None:
+                    actions[item] = "dropped" if item.rank == BREAK_RANK else "unscheduled"
+                    continue
+                free.take(start, start + minutes)
+                moved[item.index] = (start, start + minutes)
+                actions[item] = "moved"
+
+        state["conflicts"] = [self._report(group, actions, moved, fixed_events, imported, schedule)
+                              for group in groups]
+        if displaced:
+            state["schedule"] = self._apply(schedule, displaced, moved)
         return state
+
+    def _free_slots(self, state: Dict[str, Any], items: List[Item], displaced: set,
+                    horizon, preferences: Dict) -> FreeSlots:
+        """Free working time around every item that keeps its place."""
+        busy = merge_intervals((item.start, item.end) for item in items if item not in displaced)
+        if horizon is None:
+            horizon = ConstraintAgent().horizon(state, busy)
+        windows = working_windows(
+            *horizon,
+            parse_clock(preferences.get("workDayStart", "09:00")),
+            parse_clock(preferences.get("workDayEnd", "17:00"))
+        )
+        return FreeSlots(list(free_intervals(busy, windows, min_minutes=1)))
+
+    def _apply(self, schedule: List[Dict], displaced: List[Item],
+               moved: Dict[int, Tuple[int, int]]) -> List[Dict]:
+        """The schedule with displaced entries moved or removed, in start order."""
+        removed = {item.index for item in displaced}
+        result = [entry for i, entry in enumerate(schedule) if i not in removed]
+        for index, (start, end) in moved.items():
+            entry = schedule[index]
+            result.append({**entry, "startTime": to_iso(start), "endTime": to_iso(end),
+                           "previousStartTime": entry["startTime"], "previousEndTime": entry["endTime"]})
+        result.sort(key=lambda entry: parse_minutes(entry["startTime"]))
+        return result
+
+    def _report(self, group: List[Item], actions: Dict[Item, str], moved: Dict[int, Tuple[int, int]],
+                fixed_events: List[Dict], imported: List[Dict], schedule: List[Dict]) -> Dict[str, Any]:
+        sources = {"fixed": fixed_events, "imported": imported, "schedule": schedule}
+        members = []
+        for item in group:
+            member = {
+                "title": sources[item.source][item.index].get("title", ""),
+                "source": item.source,
+                "startTime": to_iso(item.start),
+                "endTime": to_iso(item.end),
+                "action": actions[item]
+            }
+            if item.source == "schedule" and item.index in moved:
+                start, end = moved[item.index]
+                member["newStartTime"], member["newEndTime"] = to_iso(start), to_iso(end)
+            members.append(member)
+        return {
+            "startTime": to_iso(group[0].start),
+            "endTime": to_iso(max(item.end for item in group)),
+            "items": members,
+            "resolved": self._resolved(group, actions)
+        }
+
+    @staticmethod
+    def _resolved(group: List[Item], actions: Dict[Item, str]) -> bool:
+        """False when immovable events still overlap or a task was left unscheduled."""
+        if any(actions[item] == "unscheduled" for item in group):
+            return False
+        immovable = sorted(item for item in group if item.rank == IMMOVABLE_RANK)
+        return all(a.end <= b.start for a, b in zip(immovable, immovable[1:]))
@@ -1,12 +1,36 @@
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+import os
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
+from timespan import Span, from_minutes
 from .base import Agent
+from .recurrence import is_recurring
+from .timeline import (busy_intervals, expanding_free_intervals, expansion_window, free_intervals, parse_clock,
+                       working_windows)
+
+# Days planned when neither the state nor the fixed events give a horizon
+DEFAULT_HORIZON_DAYS = 7
+# Longest horizon a slot stream may cover
+MAX_STREAM_DAYS = 366
 
 
 class ConstraintAgent(Agent):
+    """Turns fixed events and working hours into free time slots.
+
+    With ``streaming=True`` (default: FLOW_STREAM_SLOTS=1) the slots are not materialized. The state gets
+    ``slotStream``, a generator yielding free spans day by day from the
+    horizon start, and the allocator pulls from it only as far as it needs.
+    Without an explicit ``horizonEnd`` the stream runs for MAX_STREAM_DAYS;
+    recurring events are expanded a day at a time as the stream is pulled.
+    """
+
     name = "constraint"
 
+    def __init__(self, streaming: Optional[bool] = None):
+        if streaming is None:
+            streaming = os.environ.get("FLOW_STREAM_SLOTS") == "1"
+        self.streaming = streaming
+
     def _check_conflicts(self, event1: Dict, event2: Dict) -> bool:
         """Check if two events overlap in time."""
         start1 = datetime.fromisoformat(event1["startTime"])
@@ -16,83 +40,88 @@ class ConstraintAgent(Agent):
         
         return (start1 < end2) and (end1 > start2)
 
-    def _get_available_slots(self, fixed_events: List[Dict], preferences: Dict) -> List[Dict]:
-        """Get available time slots between fixed events."""
-        if not fixed_events:
-            return []
-            
-        # Sort fixed events by start time
-        sorted_events = sorted(fixed_events, key=lambda x: x["startTime"])
-        
-        # Get working hours from preferences or use defaults
-        work_start = preferences.get("workDayStart", "09:00")
-        work_end = preferences.get("workDayEnd", "17:00")
-        
-        slots = []
-        current_date = datetime.fromisoformat(sorted_events[0]["startTime"]).date()
-        end_date = datetime.fromisoformat(sorted_events[-1]["startTime"]).date()
-        
-        while current_date <= end_date:
-            day_start = datetime.combine(current_date, datetime.strptime(work_start, "%H:%M").time())
-            day_end = datetime.combine(current_date, datetime.strptime(work_end, "%H:%M").time())
-            
-            # Filter events for current day
-            day_events = [e for e in sorted_events if 
-                         datetime.fromisoformat(e["startTime"]).date() == current_date]
-            
-            if not day_events:
-                slots.append({
-                    "startTime": day_start.isoformat(),
-                    "endTime": day_end.isoformat(),
-                    "duration": (day_end - day_start).total_seconds() / 3600
-                })
-                current_date += timedelta(days=1)
-                continue
-                
-            # Find gaps between fixed events
-            current_time = day_start
-            for event in day_events:
-                event_start = datetime.fromisoformat(event["startTime"])
-                event_end = datetime.fromisoformat(event["endTime"])
-                
-                if current_time < event_start:
-                    duration = (event_start - current_time).total_seconds() / 3600
-                    if duration >= 0.5:  # Only include slots >= 30 minutes
-                        slots.append({
-                            "startTime": current_time.isoformat(),
-                            "endTime": event_start.isoformat(),
-                            "duration": duration
-                        })
-                current_time = max(current_time, event_end)
-            
-            # Add remaining time until end of work day
-            if current_time < day_end:
-                duration = (day_end - current_time).total_seconds() / 3600
-                if duration >= 0.5:
-                    slots.append({
-                        "startTime": current_time.isoformat(),
-                        "endTime": day_end.isoformat(),
-                        "duration": duration
-                    })
-            
-            current_date += timedelta(days=1)
-            
-        return slots
+    def horizon(self, state: Dict[str, Any], busy: List, recurring: bool = False) -> Tuple[date, date]:
+        """Return the first and last day to plan, inclusive.
+
+        Uses ``horizonStart``/``horizonEnd`` from the state when given,
+        otherwise the days spanned by the fixed events, or a week from today.
+        With recurring events the default spans at least a week.
+        """
+        if busy:
+            default_start, default_end = from_minutes(busy[0][0]).date(), from_minutes(busy[-1][0]).date()
+            if recurring:
+                default_end = max(default_end, default_start + timedelta(days=DEFAULT_HORIZON_DAYS - 1))
+        else:
+            default_start = date.today()
+            default_end = default_start + timedelta(days=DEFAULT_HORIZON_DAYS - 1)
+        start = state.get("horizonStart")
+        end = state.get("horizonEnd")
+        return (
+            date.fromisoformat(start[:10]) if start else default_start,
+            date.fromisoformat(end[:10]) if end else default_end
+        )
+
+    def _get_available_slots(self, fixed_events: List[Dict], preferences: Dict,
+                             start_date: Optional[date] = None,
+                             end_date: Optional[date] = None) -> List[Dict]:
+        """Get available time slots between fixed events within working hours."""
+        busy = busy_intervals(fixed_events)
+        recurring = any(is_recurring(e) for e in fixed_events)
+        default_start, default_end = self.horizon({}, busy, recurring)
+        start_date, end_date = start_date or default_start, end_date or default_end
+        if recurring:
+            busy = busy_intervals(fixed_events, expansion_window(start_date, end_date))
+        spans = self._free_spans(busy, preferences, start_date, end_date)
+        return [span.to_slot() for span in spans]
+
+    def _free_spans(self, busy: List, preferences: Dict,
+                    start_date: date, end_date: date) -> List[Span]:
+        """Sweep merged busy intervals against each day's working hours."""
+        return list(self._slot_stream(busy, preferences, start_date, end_date))
+
+    def _windows(self, preferences: Dict, start_date: date, end_date: date) -> Iterator[Tuple[int, int]]:
+        """Each day's working hours from start_date to end_date, in epoch minutes."""
+        return working_windows(
+            start_date, end_date,
+            parse_clock(preferences.get("workDayStart", "09:00")),
+            parse_clock(preferences.get("workDayEnd", "17:00"))
+        )
+
+    def _slot_stream(self, busy: List, preferences: Dict,
+                     start_date: date, end_date: date) -> Iterator[Span]:
+        """Lazily yield free spans, one working day at a time."""
+        return free_intervals(busy, self._windows(preferences, start_date, end_date))
 
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Process fixed events and identify available time slots."""
         fixed_events = state.get("fixedEvents", [])
         preferences = state.get("preferences", {})
-        
-        if not fixed_events:
-            state["availableSlots"] = []
+
+        # Each event is parsed once; the sweep is O(n log n) in events plus
+        # one step per day of the horizon
+        busy = busy_intervals(fixed_events)
+        recurring = any(is_recurring(e) for e in fixed_events)
+        start_date, end_date = self.horizon(state, busy, recurring)
+
+        if self.streaming:
+            limit = start_date + timedelta(days=MAX_STREAM_DAYS - 1)
+            end_date = min(end_date, limit) if state.get("horizonEnd") else limit
+            windows = self._windows(preferences, start_date, end_date)
+            # Recurring events are expanded per day as the allocator pulls
+            state["slotStream"] = (expanding_free_intervals(fixed_events, windows) if recurring
+                                   else free_intervals(busy, windows))
+            state["fixedEvents"] = fixed_events
             return state
-            
-        # Get available time slots
-        available_slots = self._get_available_slots(fixed_events, preferences)
-        
-        # Attach processed data to state
-        state["availableSlots"] = available_slots
+        if recurring:
+            # Expand recurring events only within the planned days
+            busy = busy_intervals(fixed_events, expansion_window(start_date, end_date))
+
+        spans = self._free_spans(busy, preferences, start_date, end_date)
+
+        # Attach processed data to state. slotIntervals is the pre-parsed
+        # form the allocator works from; availableSlots is its ISO rendering
+        state["slotIntervals"] = spans
+        state["availableSlots"] = [span.to_slot() for span in spans]
         state["fixedEvents"] = fixed_events
-        
+
         return state
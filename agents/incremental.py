@@ -0,0 +1,237 @@
+"""Incremental repair of an existing schedule after a single change."""
+import heapq
+import itertools
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from timespan import Span, to_iso
+from .allocator import AllocatorAgent
+from .constraint import ConstraintAgent
+from .slot_index import SlotIndex
+from .recurrence import is_recurring
+from .timeline import busy_intervals, expansion_window, free_intervals, parse_clock, working_windows
+
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+DELTA_TYPES = ("task_added", "task_removed", "duration_changed", "fixed_event_added")
+
+
+class FreeTime:
+    """Free spans indexed for best fit, merging back together when time is released."""
+
+    def __init__(self, spans: List[Span]):
+        self.index = SlotIndex(spans)
+        self._by_start = {span.start: span for span in spans}
+        self._by_end = {span.end: span for span in spans}
+
+    def _add(self, span: Span) -> None:
+        self.index.add(span)
+        self._by_start[span.start] = span
+        self._by_end[span.end] = span
+
+    def _discard(self, span: Span) -> None:
+        self.index.remove(span)
+        del self._by_start[span.start]
+        del self._by_end[span.end]
+
+    def before(self, minute: int) -> Optional[Span]:
+        """The free span ending exactly at `minute`, if any."""
+        return self._by_end.get(minute)
+
+    def after(self, minute: int) -> Optional[Span]:
+        """The free span starting exactly at `minute`, if any."""
+        return self._by_start.get(minute)
+
+    def release(self, span: Span) -> None:
+        """Return a span to free time, merging it with touching free spans."""
+        start, end = span.start, span.end
+        before, after = self.before(start), self.after(end)
+        if before is not None:
+            self._discard(before)
+            start = before.start
+        if after is not None:
+            self._discard(after)
+            end = after.end
+        self._add(Span(start, end))
+
+    def take(self, free: Span, start: int, end: int) -> None:
+        """Occupy [start, end) inside the free span `free`."""
+        self._discard(free)
+        if free.start < start:
+            self._add(Span(free.start, start))
+        if end < free.end:
+            self._add(Span(end, free.end))
+
+
+class IncrementalScheduler:
+    """Patches a previous schedule for one delta instead of recomputing it.
+
+    Supported deltas:
+    - {"type": "task_added", "task": {...}}
+    - {"type": "task_removed", "title": ...}
+    - {"type": "duration_changed", "title": ..., "estimatedMinutes": n}
+    - {"type": "fixed_event_added", "event": {...}}
+
+    Entries the delta does not touch stay where they are. A task that grows
+    is extended in place if the time after it is free. Entries that no
+    longer fit (or overlap a new fixed event) are re-placed best-fit, in
+    priority order. When nothing fits, the lowest-priority entry whose
+    removal opens a large enough gap is displaced and re-placed in turn.
+    The cascade only ever displaces lower priorities, so it terminates.
+    Entries carrying a ``deadline`` are only placed where they can meet it.
+    """
+
+    def __init__(self, allocator: Optional[AllocatorAgent] = None):
+        self.allocator = allocator or AllocatorAgent()
+
+    def apply(self, state: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+        """Return {"schedule", "moved", "unscheduled"} after applying `delta`.
+
+        `state` holds the previous "schedule", "fixedEvents", "preferences"
+        and optionally "horizonStart"/"horizonEnd". Moved entries carry
+        their previous times as "previousStartTime"/"previousEndTime".
+        """
+        kind = delta.get("type")
+        if kind not in DELTA_TYPES:
+            raise ValueError(f"Unknown schedule delta: {kind}")
+        payload = {"task_added": "task", "fixed_event_added": "event"}.get(kind)
+        if payload and not isinstance(delta.get(payload), dict):
+            raise ValueError(f"{kind} delta needs a {payload} object")
+        preferences = state.get("preferences", {})
+        fixed_events = list(state.get("fixedEvents", []))
+        if kind == "fixed_event_added":
+            fixed_events.append(delta["event"])
+
+        # Breaks are re-derived once the schedule settles
+        entries: List[Tuple[Span, Dict[str, Any]]] = [
+            (Span.parse(e["startTime"], e["endTime"]), dict(e))
+            for e in state.get("schedule", []) if e.get("category") != "break"
+        ]
+        horizon = self._horizon(state, fixed_events, entries)
+        # Items waiting for a slot: (rank, order, minutes, fields, previous span)
+        queue: List[Tuple[int, int, int, Dict[str, Any], Optional[Span]]] = []
+        grow: Optional[Tuple[int, int]] = None
+        order = itertools.count()
+
+        def enqueue(minutes: int, fields: Dict[str, Any], previous: Optional[Span]) -> None:
+            rank = PRIORITY_RANK.get(fields.get("priority"), len(PRIORITY_RANK))
+            heapq.heappush(queue, (rank, next(order), minutes, fields, previous))
+
+        if kind == "task_added":
+            task = delta["task"]
+            (_, priority), = self.allocator.prioritized([task])
+            enqueue(task.get("estimatedMinutes", 60), self.allocator.entry_fields(task, priority), None)
+        elif kind == "task_removed":
+            entries = [(span, fields) for span, fields in entries if fields["title"] != delta["title"]]
+        elif kind == "duration_changed":
+            minutes = delta["estimatedMinutes"]
+            for i, (span, fields) in enumerate(entries):
+                if fields["title"] == delta["title"]:
+                    if minutes <= span.minutes:
+                        entries[i] = (Span(span.start, span.start + minutes), fields)
+                    else:
+                        grow = (i, minutes)
+                    break
+        else:
+            busy = busy_intervals([delta["event"]], expansion_window(*horizon))
+            kept = []
+            for span, fields in entries:
+                if any(start < span.end and span.start < end for start, end in busy):
+                    enqueue(span.minutes, fields, span)
+                else:
+                    kept.append((span, fields))
+            entries = kept
+
+        free = self._free_time(horizon, fixed_events, entries, preferences)
+
+        if grow is not None:
+            i, minutes = grow
+            span, fields = entries[i]
+            after = free.after(span.end)
+            latest = self.allocator.latest_start(fields, minutes)
+            fits = after is not None and after.end - span.start >= minutes
+            if fits and (latest is None or span.start <= latest):
+                free.take(after, span.end, span.start + minutes)
+                entries[i] = (Span(span.start, span.start + minutes), fields)
+            else:
+                del entries[i]
+                free.release(span)
+                enqueue(minutes, fields, span)
+
+        moved, unscheduled = [], []
+        while queue:
+            rank, _, minutes, fields, previous = heapq.heappop(queue)
+            preferred_hour = self.allocator.preferred_hour(fields, preferences)
+            # Never start past the point the task could still meet its deadline
+            latest = self.allocator.latest_start(fields, minutes)
+            slot = free.index.best_fit(minutes, preferred_hour, latest)
+            if slot is None:
+                victim = self._victim(entries, free, rank, minutes, latest)
+                if victim is not None:
+                    span, victim_fields = entries.pop(victim)
+                    free.release(span)
+                    enqueue(span.minutes, victim_fields, span)
+                    slot = free.index.best_fit(minutes, preferred_hour, latest)
+            if slot is None:
+                unscheduled.append(fields)
+                continue
+            span = Span(slot.start, slot.start + minutes)
+            free.take(slot, span.start, span.end)
+            entries.append((span, fields))
+            if previous is not None and previous != span:
+                moved.append((span, fields, previous))
+
+        placed = self.allocator.allocate_breaks(sorted(entries, key=lambda e: e[0].start), preferences)
+        return {
+            "schedule": self.allocator.serialize(placed),
+            "moved": [
+                {**self.allocator.serialize([(span, fields)])[0],
+                 "previousStartTime": to_iso(previous.start),
+                 "previousEndTime": to_iso(previous.end)}
+                for span, fields, previous in moved
+            ],
+            "unscheduled": unscheduled
+        }
+
+    def _horizon(self, state: Dict[str, Any], fixed_events: List[Dict],
+                 entries: List[Tuple[Span, Dict]]) -> Tuple[date, date]:
+        """Days to plan: the state's horizon, else those spanned by events and entries."""
+        busy = sorted(busy_intervals(fixed_events) + [(span.start, span.end) for span, _ in entries])
+        return ConstraintAgent().horizon(state, busy, any(is_recurring(e) for e in fixed_events))
+
+    def _free_time(self, horizon: Tuple[date, date], fixed_events: List[Dict],
+                   entries: List[Tuple[Span, Dict]], preferences: Dict) -> FreeTime:
+        """Free time within working hours around fixed events and kept entries."""
+        start_date, end_date = horizon
+        busy = busy_intervals(fixed_events, expansion_window(start_date, end_date))
+        # Scheduled entries never overlap each other or fixed events, so
+        # they can be merged into the busy list directly
+        busy = sorted(busy + [(span.start, span.end) for span, _ in entries])
+        windows = working_windows(
+            start_date, end_date,
+            parse_clock(preferences.get("workDayStart", "09:00")),
+            parse_clock(preferences.get("workDayEnd", "17:00"))
+        )
+        # Keep every fragment so released time merges back exactly
+        return FreeTime(list(free_intervals(busy, windows, min_minutes=1)))
+
+    def _victim(self, entries: List[Tuple[Span, Dict]], free: FreeTime,
+                rank: int, minutes: int, latest_start: Optional[int] = None) -> Optional[int]:
+        """Pick the lowest-priority entry whose removal frees a gap of `minutes`.
+
+        With `latest_start`, the gap must also begin no later than it.
+        """
+        best = None
+        for i, (span, fields) in enumerate(entries):
+            victim_rank = PRIORITY_RANK.get(fields.get("priority"), len(PRIORITY_RANK))
+            if victim_rank <= rank:
+                continue
+            before, after = free.before(span.start), free.after(span.end)
+            if latest_start is not None and (before.start if before else span.start) > latest_start:
+                continue
+            gap = span.minutes + (before.minutes if before else 0) + (after.minutes if after else 0)
+            if gap >= minutes:
+                key = (-victim_rank, gap)
+                if best is None or key < best[0]:
+                    best = (key, i)
+        return best[1] if best else None
@@ -0,0 +1,209 @@
+"""Rule-based intent classifier used ahead of the LLM by ParserAgent.
+
+Each intent has weighted regex rules. An intent's score combines its
+matching rules as a noisy-or (1 - prod(1 - weight)), and confidence is the
+top score discounted by the strongest competing intent. Specific intents
+override the generic "schedule_task", so "plan my week for exams" is a
+confident plan_exam rather than a tie. Queries naming people or places the
+rules cannot extract ("with Bob", "to Paris") lose confidence, so they go to
+the LLM. So do negated queries ("don't schedule anything tomorrow"), and
+update_preferences / plan_exam queries whose preferences or subjects the
+rules could not extract.
+"""
+import re
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+_RULES: Dict[str, List[Tuple[str, float]]] = {
+    "schedule_task": [
+        # Too generic to decide alone ("plan a trip"); needs a second cue
+        (r"\b(schedule|plan|organi[sz]e|block (out )?time|fit in|make time)\b", 0.55),
+        (r"\b(my (day|week|tasks)|today|tomorrow|this week|next week)\b", 0.4),
+        (r"\badd (a )?task\b", 0.8),
+    ],
+    "plan_exam": [
+        (r"\b(exams?|midterms?|finals|tests?|quiz(zes)?)\b", 0.8),
+        (r"\b(study|revise|revision|prepare|prep)\b", 0.4),
+        (r"\b(schedule|plan)\b.*\b(exams?|midterms?|finals|tests?)\b", 0.5),
+    ],
+    "reschedule": [
+        (r"\b(re-?schedule|move|shift|push (it |this )?(back|forward)|postpone|delay|swap)\b", 0.85),
+        (r"\b(instead|later|earlier|another (time|day))\b", 0.3),
+    ],
+    "update_preferences": [
+        (r"\b(prefer|preferences?|i work best|work ?day|wake up|go to (bed|sleep))\b", 0.8),
+        (r"\b(start|end|finish) (my day|work|working) at\b", 0.7),
+        (r"\bbreaks? (every|of|after)\b", 0.6),
+    ],
+    "add_goal": [
+        (r"\b(goals?|milestones?|aim to|want to (learn|finish|achieve|master))\b", 0.8),
+        (r"\bby the end of\b", 0.3),
+    ],
+    "general_advice": [
+        (r"\b(what should i|how (can|do|should) i|any (tips|advice)|suggest|recommend|focus on)\b", 0.7),
+        (r"\b(motivat\w*|procrastinat\w*|overwhelmed|burn(ed|t)? out|productive)\b", 0.5),
+    ],
+}
+
+# Intents whose matches make a "schedule_task" match redundant
+_OVERRIDES = {
+    "plan_exam": {"schedule_task"},
+    "reschedule": {"schedule_task"},
+    "update_preferences": {"schedule_task"},
+    "add_goal": {"schedule_task"},
+}
+
+_COMPILED: Dict[str, List[Tuple[Pattern, float]]] = {
+    intent: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in rules]
+    for intent, rules in _RULES.items()
+}
+
+_PRIORITY = re.compile(r"\b(urgent|asap|high|medium|low)(est)? ?(priority)?\b", re.IGNORECASE)
+_DURATION = re.compile(r"\b(\d+(?:\.\d+)?)\s*(hours?|hrs?|h|minutes?|mins?|m)\b", re.IGNORECASE)
+_CLOCK = re.compile(r"\b(\d{1,2}(?::\d{2})?\s*(?:am|pm)|\d{1,2}:\d{2})\b", re.IGNORECASE)
+_WEEKDAY = r"(?:mon|tues|wednes|thurs|fri|satur|sun)days?"
+_MONTH = (r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+          r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)")
+_DATE_RANGE = re.compile(
+    r"\b(today|tonight|tomorrow|this weekend|this week|next week|weekend|next month|this month"
+    r"|(?:the )?end of (?:the |this |next )?(?:week|month)"
+    rf"|(?:(?:this|next) )?{_WEEKDAY}(?: (?:morning|afternoon|evening|night))?"
+    rf"|{_MONTH}\.? \d{{1,2}}(?:st|nd|rd|th)?|\d{{1,2}}(?:st|nd|rd|th)? (?:of )?{_MONTH}"
+    r"|(?:the )?\d{1,2}(?:st|nd|rd|th)|\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}(?:/\d{2,4})?)\b",
+    re.IGNORECASE
+)
+# A capitalized name after a preposition ("with Bob", "to Paris"): people and
+# places the rules cannot extract
+_ENTITY = re.compile(r"\b(?:with|at|in|to|for|from)\s+([A-Z][\w'-]*)")
+# Confidence kept when the query names entities the rules left unextracted
+ENTITY_DISCOUNT = 0.5
+# Negations flip what the matched rules mean; only the LLM reads them
+_NEGATION = re.compile(r"\b(?:not|never|no longer|nothing|dont)\b|n['’]t\b", re.IGNORECASE)
+_WORK_HOURS = re.compile(
+    r"\b(start|end|finish) (?:my day|work|working) at (\d{1,2})(?::(\d{2}))?\s*(am|pm)?\b", re.IGNORECASE
+)
+_BREAK_LENGTH = re.compile(r"\bbreaks? of (\d+)\s*(?:minutes?|mins?)\b", re.IGNORECASE)
+_SUBJECT = re.compile(r"\b([a-z][\w+#-]*) (?:exams?|midterms?|finals?|tests?|quiz(?:zes)?)\b", re.IGNORECASE)
+_NOT_SUBJECTS = {"a", "an", "the", "my", "our", "your", "this", "next", "upcoming", "final", "big", "all",
+                 "for", "of", "and", "mock", "practice", "study", "prep", "plan", "schedule", "week", "day"}
+# Parameters an intent cannot be answered without
+_REQUIRED = {"update_preferences": "preferences", "plan_exam": "subjects"}
+
+
+class Classification(NamedTuple):
+    intent: str
+    parameters: Dict[str, Any]
+    confidence: float
+
+
+def extract_parameters(query: str) -> Dict[str, Any]:
+    """Parameters the LLM prompt asks for, where the query states them plainly."""
+    parameters: Dict[str, Any] = {}
+    match = _PRIORITY.search(query)
+    if match and (match.group(3) or match.group(1).lower() in ("urgent", "asap")):
+        word = match.group(1).lower()
+        parameters["priority"] = "high" if word in ("urgent", "asap") else word
+    match = _DURATION.search(query)
+    if match:
+        parameters["duration"] = f"{match.group(1)} {match.group(2)}"
+    times = _CLOCK.findall(query)
+    if times:
+        parameters["specific_times"] = times
+    match = _DATE_RANGE.search(query)
+    if match:
+        parameters["date_range"] = match.group(1).lower()
+    subjects = [m.group(1).lower() for m in _SUBJECT.finditer(query) if m.group(1).lower() not in _NOT_SUBJECTS]
+    if subjects:
+        parameters["subjects"] = subjects
+    preferences = _preferences(query)
+    if preferences:
+        parameters["preferences"] = preferences
+    return parameters
+
+
+def _preferences(query: str) -> Dict[str, Any]:
+    """Working hours and break length, in the keys the scheduler reads."""
+    preferences: Dict[str, Any] = {}
+    for m in _WORK_HOURS.finditer(query):
+        hour = int(m.group(2))
+        if m.group(4):
+            hour = hour % 12 + (12 if m.group(4).lower() == "pm" else 0)
+        if hour < 24:
+            key = "workDayStart" if m.group(1).lower() == "start" else "workDayEnd"
+            preferences[key] = f"{hour:02d}:{m.group(3) or '00'}"
+    match = _BREAK_LENGTH.search(query)
+    if match:
+        preferences["breakDuration"] = int(match.group(1))
+    return preferences
+
+
+def classify(query: str) -> Classification:
+    """Score every intent against the query; confidence is 0 when nothing matches."""
+    scores = {}
+    for intent, rules in _COMPILED.items():
+        miss = 1.0
+        for pattern, weight in rules:
+            if pattern.search(query):
+                miss *= 1 - weight
+        if miss < 1:
+            scores[intent] = 1 - miss
+    if not scores:
+        return Classification("general_advice", {}, 0.0)
+    intent = max(scores, key=scores.get)
+    competing = max((score for other, score in scores.items()
+                     if other != intent and other not in _OVERRIDES.get(intent, ())), default=0.0)
+    confidence = scores[intent] * (1 - competing)
+    if _has_unextracted_entities(query):
+        # The LLM would fill parameters the rules would silently drop
+        confidence *= ENTITY_DISCOUNT
+    parameters = extract_parameters(query)
+    required = _REQUIRED.get(intent)
+    if _NEGATION.search(query) or (required and required not in parameters):
+        # Negated, or missing the parameters the LLM would have extracted
+        confidence = 0.0
+    return Classification(intent, parameters, confidence)
+
+
+def _has_unextracted_entities(query: str) -> bool:
+    """Whether the query names people or places outside the extracted parameters."""
+    extracted = [m.span() for pattern in (_PRIORITY, _DURATION, _CLOCK, _DATE_RANGE)
+                 for m in pattern.finditer(query)]
+    return any(
+        not any(start <= m.start(1) < end for start, end in extracted)
+        for m in _ENTITY.finditer(query)
+    )
+
+
+class FastPathStats:
+    """Process-wide counts of queries answered by rules versus the LLM."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.hits = 0
+        self.fallbacks = 0
+        self.by_intent: Dict[str, int] = {}
+
+    def record(self, intent: Optional[str]) -> None:
+        """Count a rule hit for `intent`, or an LLM fallback when None."""
+        with self._lock:
+            if intent is None:
+                self.fallbacks += 1
+            else:
+                self.hits += 1
+                self.by_intent[intent] = self.by_intent.get(intent, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.fallbacks
+            return {
+                "hits": self.hits,
+                "fallbacks": self.fallbacks,
+                "hit_rate": self.hits / total if total else 0.0,
+                "by_intent": dict(self.by_intent)
+            }
+
+
+stats = FastPathStats()
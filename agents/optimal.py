@@ -0,0 +1,125 @@
+"""Branch-and-bound multiple-knapsack solver for optimal task placement.
+
+Tasks are items (size = minutes, value = priority weight × minutes) and
+free slots are bins. Several tasks can share a slot, so this is a
+multiple-knapsack problem rather than a one-to-one assignment.
+"""
+import time
+from typing import Dict, List, Optional, Tuple
+
+PRIORITY_WEIGHTS = {"high": 3, "medium": 2, "low": 1}
+
+# Nodes between deadline checks
+_CHECK_EVERY = 256
+
+
+def search_order(sizes: List[int], weights: List[int]) -> List[int]:
+    """Item indices by weight then size, the order items are assigned and packed."""
+    return sorted(range(len(sizes)), key=lambda i: (-weights[i], -sizes[i]))
+
+
+def solve(sizes: List[int], weights: List[int], capacities: List[int],
+          incumbent: List[int], time_budget_ms: float = 200,
+          bin_starts: Optional[List[int]] = None,
+          latest_starts: Optional[List[Optional[int]]] = None) -> Tuple[List[int], Dict[str, int]]:
+    """Maximize sum(weight × size) of items packed into bins.
+
+    `incumbent` is a feasible assignment (bin index per item, -1 if
+    unplaced) to improve on, normally the greedy result. The search is
+    depth-first: items in ``search_order``, each tried in the tightest
+    fitting bin first (bins with equal remaining capacity are tried once).
+    Subtrees are cut with a fractional-knapsack bound. When the time budget
+    runs out, the best assignment found so far is returned. Stats report
+    nodes explored and whether optimality was proven.
+
+    With `bin_starts` and `latest_starts` (None for no bound), each bin is
+    packed back to back in ``search_order``, and an item only goes into a
+    bin whose next free start is no later than its latest start.
+    """
+    n = len(sizes)
+    order = search_order(sizes, weights)
+    best_value = sum(weights[i] * sizes[i] for i, b in enumerate(incumbent) if b >= 0)
+    best = list(incumbent)
+    caps = list(capacities)
+    bounded = bin_starts is not None and latest_starts is not None and any(
+        latest is not None for latest in latest_starts
+    )
+
+    def options(depth: int) -> List[int]:
+        item = order[depth]
+        size = sizes[item]
+        latest = latest_starts[item] if bounded else None
+        by_capacity = {}
+        for b, cap in enumerate(caps):
+            if cap < size:
+                continue
+            # Bins only differ by remaining capacity unless starts matter
+            key = cap
+            if bounded:
+                next_start = bin_starts[b] + capacities[b] - cap
+                if latest is not None and next_start > latest:
+                    continue
+                key = (cap, next_start)
+            if key not in by_capacity:
+                by_capacity[key] = b
+        return [by_capacity[key] for key in sorted(by_capacity)] + [-1]
+
+    def bound(depth: int, value: int) -> float:
+        remaining = sum(caps)
+        largest = max(caps) if caps else 0
+        for k in range(depth, n):
+            if remaining <= 0:
+                break
+            item = order[k]
+            if sizes[item] > largest:
+                continue
+            take = min(sizes[item], remaining)
+            value += weights[item] * take
+            remaining -= take
+        return value
+
+    assign = [-1] * n
+    value = 0
+    nodes = 0
+    complete = True
+    deadline = time.monotonic() + time_budget_ms / 1000
+    # Frames: [depth, options, next option, bin applied at this depth]
+    # Nothing to search if even the relaxation cannot beat the incumbent
+    stack = [[0, options(0), 0, -1]] if n and bound(0, 0) > best_value else []
+    while stack:
+        frame = stack[-1]
+        depth, opts, pos, applied = frame
+        item = order[depth]
+        if applied >= 0:
+            caps[applied] += sizes[item]
+            value -= weights[item] * sizes[item]
+            assign[item] = -1
+            frame[3] = -1
+        if pos == len(opts):
+            stack.pop()
+            continue
+        frame[2] += 1
+
+        nodes += 1
+        if nodes % _CHECK_EVERY == 0 and time.monotonic() > deadline:
+            complete = False
+            break
+
+        b = opts[pos]
+        if b >= 0:
+            caps[b] -= sizes[item]
+            value += weights[item] * sizes[item]
+            assign[item] = b
+            frame[3] = b
+        if value > best_value:
+            best_value = value
+            best = list(assign)
+        if depth + 1 < n and bound(depth + 1, value) > best_value:
+            stack.append([depth + 1, options(depth + 1), 0, -1])
+
+    return best, {"nodes": nodes, "provenOptimal": complete, "weightedMinutes": best_value}
+
+
+def weighted_minutes(placed: List[Tuple[int, str]]) -> int:
+    """Objective value of (minutes, priority) pairs."""
+    return sum(PRIORITY_WEIGHTS[priority] * minutes for minutes, priority in placed)
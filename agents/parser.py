@@ -1,27 +1,81 @@
-from .base import Agent
+import os
+from typing import Optional
+
+from . import intent
+from .base import Agent, record_prompt_stats
 
 
 from llm_client import LLMClient
 from prompts import ParserPromptTemplate, parse_llm_response
 
+# Minimum rule confidence for answering without the LLM
+DEFAULT_THRESHOLD = 0.7
+
 
 class ParserAgent(Agent):
+    """Extracts the intent and parameters of the user's query.
+
+    Routine queries are answered by the rule-based classifier in
+    ``agents.intent`` when its confidence reaches ``threshold`` (default:
+    FLOW_PARSER_THRESHOLD, else 0.7); the rest go to the LLM. Setting
+    FLOW_PARSER_FAST_PATH=0 sends everything to the LLM. ``intent.stats``
+    counts rule hits against LLM fallbacks (served at GET /parser_stats),
+    and ``state["parsedBy"]`` says which one answered.
+    """
+
     name = "parser"
 
-    def __init__(self):
-        self.llm = LLMClient()
+    def __init__(self, fast_path: Optional[bool] = None, threshold: Optional[float] = None):
+        # Intent extraction is deterministic, so identical prompts are served from cache
+        self.llm = LLMClient.shared(temperature=0)
+        if fast_path is None:
+            fast_path = os.environ.get("FLOW_PARSER_FAST_PATH", "1") != "0"
+        self.fast_path = fast_path
+        if threshold is None:
+            threshold = float(os.environ.get("FLOW_PARSER_THRESHOLD", DEFAULT_THRESHOLD))
+        self.threshold = threshold
 
     def run(self, state):
+        if self._classify(state):
+            return state
+        resp = self.llm.generate_validated(self._prompt(state), self.name)
+        return self._apply(state, resp)
+
+    async def arun(self, state):
+        """Like run, awaiting the LLM so other calls can proceed meanwhile."""
+        if self._classify(state):
+            return state
+        resp = await self.llm.agenerate_validated(self._prompt(state), self.name)
+        return self._apply(state, resp)
+
+    def _classify(self, state) -> bool:
+        """Answer from the rules if they are confident enough; return whether they were."""
+        if not self.fast_path:
+            return False
+        result = intent.classify(state.get("query", ""))
+        if result.confidence < self.threshold:
+            intent.stats.record(None)
+            return False
+        intent.stats.record(result.intent)
+        state["parsed"] = {"intent": result.intent, "parameters": result.parameters}
+        state["parsedBy"] = "rules"
+        return True
+
+    def _prompt(self, state):
         query = state.get("query", "")
         context = state.get("context", [])
         
         # get LLM to parse intent and parameters
-        prompt = ParserPromptTemplate.format(context=context, query=query)
-        resp = self.llm.generate(prompt)
+        rendered = ParserPromptTemplate.render(context=context, query=query)
+        record_prompt_stats(state, self.name, rendered)
+        return rendered.text
+
+    def _apply(self, state, resp):
         parsed = parse_llm_response(resp["text"])
         
         # attach parsed intent or fallback
         state["parsed"] = parsed.parsed or {"intent": "general"}
+        state["parsedBy"] = "llm"
         if parsed.error:
             state.setdefault("errors", []).append({"agent": self.name, "error": parsed.error})
         
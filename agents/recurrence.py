@@ -0,0 +1,105 @@
+"""Recurring fixed events, expanded lazily within a window.
+
+A fixed event's own start/end is its first occurrence. The rule is either
+``"recurrence": {"freq": "weekly", "interval": 1, "byweekday": ["MO", "WE"],
+"until": "2025-12-19", "exceptions": ["2025-11-03"]}`` or the shorthand
+``"recurring": "daily" | "weekly" | "weekdays" | "weekends"``.
+"""
+from datetime import date
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from timespan import DAY_MINUTES, EPOCH, parse_minutes
+
+_WEEKDAYS = {"mo": 0, "tu": 1, "we": 2, "th": 3, "fr": 4, "sa": 5, "su": 6}
+_SHORTHANDS = {
+    "daily": ("daily", ()),
+    "weekly": ("weekly", ()),
+    "weekdays": ("weekly", (0, 1, 2, 3, 4)),
+    "weekends": ("weekly", (5, 6))
+}
+
+
+class Rule(NamedTuple):
+    """A normalized, hashable recurrence rule."""
+    freq: str
+    interval: int
+    byweekday: Tuple[int, ...]
+    until_day: Optional[int]
+    exceptions: FrozenSet[int]
+
+
+def _epoch_day(value: str) -> int:
+    return (date.fromisoformat(value[:10]) - EPOCH.date()).days
+
+
+def _weekday(value) -> int:
+    if isinstance(value, int):
+        return value % 7
+    return _WEEKDAYS[str(value)[:2].lower()]
+
+
+def rule_of(event: Dict) -> Optional[Rule]:
+    """Return the event's recurrence rule, or None for a one-off event."""
+    spec = event.get("recurrence")
+    if spec is None:
+        shorthand = event.get("recurring")
+        if not shorthand:
+            return None
+        if shorthand not in _SHORTHANDS:
+            raise ValueError(f"Unknown recurrence: {shorthand}")
+        freq, byweekday = _SHORTHANDS[shorthand]
+        spec = {"freq": freq, "byweekday": list(byweekday)}
+    freq = spec.get("freq", "weekly")
+    if freq not in ("daily", "weekly"):
+        raise ValueError(f"Unsupported recurrence frequency: {freq}")
+    return Rule(
+        freq=freq,
+        interval=max(int(spec.get("interval", 1)), 1),
+        byweekday=tuple(sorted({_weekday(d) for d in spec.get("byweekday") or ()})),
+        until_day=_epoch_day(spec["until"]) if spec.get("until") else None,
+        exceptions=frozenset(_epoch_day(d) for d in spec.get("exceptions") or ())
+    )
+
+
+@lru_cache(maxsize=1024)
+def _occurrences(rule: Rule, anchor: int, duration: int,
+                 window_start: int, window_end: int) -> Tuple[Tuple[int, int], ...]:
+    """Occurrences of a rule overlapping [window_start, window_end), cached."""
+    anchor_day, time_of_day = divmod(anchor, DAY_MINUTES)
+    weekdays = rule.byweekday or ((anchor_day + 3) % 7,)
+    # Occurrences starting up to `duration` before the window still overlap it
+    first_day = max(anchor_day, (window_start - time_of_day - duration) // DAY_MINUTES)
+    last_day = (window_end - time_of_day - 1) // DAY_MINUTES
+    if rule.until_day is not None:
+        last_day = min(last_day, rule.until_day)
+
+    # Weeks are counted Monday to Monday from the anchor's week
+    anchor_week = (anchor_day + 3) // 7
+    occurrences = []
+    for day in range(first_day, last_day + 1):
+        if day in rule.exceptions:
+            continue
+        if rule.freq == "daily":
+            if (day - anchor_day) % rule.interval:
+                continue
+        elif (day + 3) % 7 not in weekdays or ((day + 3) // 7 - anchor_week) % rule.interval:
+            continue
+        start = day * DAY_MINUTES + time_of_day
+        if start < window_end and start + duration > window_start:
+            occurrences.append((start, start + duration))
+    return tuple(occurrences)
+
+
+def expand(event: Dict, window_start: int, window_end: int) -> List[Tuple[int, int]]:
+    """Busy intervals of a (possibly recurring) event within a window of epoch minutes."""
+    start = parse_minutes(event.get("startTime") or event["start"])
+    end = parse_minutes(event.get("endTime") or event["end"])
+    rule = rule_of(event)
+    if rule is None:
+        return [(start, end)]
+    return list(_occurrences(rule, start, end - start, window_start, window_end))
+
+
+def is_recurring(event: Dict) -> bool:
+    return bool(event.get("recurrence") or event.get("recurring"))
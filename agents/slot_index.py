@@ -0,0 +1,99 @@
+"""Free-slot index for best-fit task placement."""
+import bisect
+import itertools
+from typing import Iterable, List, Optional, Tuple
+
+from timespan import Span, hour_of
+
+# Score added when a slot starts more than PREFERENCE_WINDOW hours away from
+# the task's preferred hour, in minutes of slack (the allocator's 2 hours)
+PREFERENCE_PENALTY = 120
+PREFERENCE_WINDOW = 2
+
+_Key = Tuple[int, int, int]
+
+
+class SlotIndex:
+    """Free slots kept sorted by (length, start), overall and per start hour.
+
+    ``best_fit`` returns the slot with the lowest allocator score: slack
+    after the task, plus a penalty if the slot starts outside the preferred
+    hour window. That takes one bisect in the overall list plus one per
+    hour bucket in the window, instead of a scan of every slot. Ties go to
+    the earliest start.
+    """
+
+    def __init__(self, spans: Iterable[Span] = ()):
+        self._by_length: List[_Key] = []
+        self._by_hour: List[List[_Key]] = [[] for _ in range(24)]
+        for span in spans:
+            self._by_length.append(self._key(span))
+        self._by_length.sort()
+        for key in self._by_length:
+            self._by_hour[hour_of(key[1])].append(key)
+
+    def __len__(self) -> int:
+        return len(self._by_length)
+
+    def __iter__(self):
+        """Slots in (length, start) order."""
+        return (Span(start, end) for _, start, end in self._by_length)
+
+    @staticmethod
+    def _key(span: Span) -> _Key:
+        return (span.end - span.start, span.start, span.end)
+
+    def add(self, span: Span) -> None:
+        key = self._key(span)
+        bisect.insort(self._by_length, key)
+        bisect.insort(self._by_hour[hour_of(span.start)], key)
+
+    def remove(self, span: Span) -> None:
+        key = self._key(span)
+        for keys in (self._by_length, self._by_hour[hour_of(span.start)]):
+            i = bisect.bisect_left(keys, key)
+            if i == len(keys) or keys[i] != key:
+                raise KeyError(span)
+            del keys[i]
+
+    @staticmethod
+    def _first_fit(keys: List[_Key], minutes: int, latest_start: Optional[int]) -> Optional[_Key]:
+        """Shortest slot of at least `minutes` starting no later than `latest_start`."""
+        i = bisect.bisect_left(keys, (minutes,))
+        if latest_start is None:
+            return keys[i] if i < len(keys) else None
+        for key in itertools.islice(keys, i, None):
+            if key[1] <= latest_start:
+                return key
+        return None
+
+    def best_fit(self, minutes: int, preferred_hour: Optional[int] = None,
+                 latest_start: Optional[int] = None) -> Optional[Span]:
+        """Return the lowest-scoring slot at least `minutes` long, or None.
+
+        With `latest_start` (e.g. a deadline minus the task length), slots
+        starting later are skipped.
+        """
+        best: Optional[Tuple[int, int, _Key]] = None
+
+        key = self._first_fit(self._by_length, minutes, latest_start)
+        if key is not None:
+            score = key[0] - minutes
+            if preferred_hour is not None and abs(hour_of(key[1]) - preferred_hour) > PREFERENCE_WINDOW:
+                score += PREFERENCE_PENALTY
+            best = (score, key[1], key)
+
+        if preferred_hour is not None and best is not None and best[0] >= PREFERENCE_PENALTY:
+            # A longer slot inside the preferred window may still score lower
+            for hour in range(max(preferred_hour - PREFERENCE_WINDOW, 0),
+                              min(preferred_hour + PREFERENCE_WINDOW, 23) + 1):
+                key = self._first_fit(self._by_hour[hour], minutes, latest_start)
+                if key is not None:
+                    candidate = (key[0] - minutes, key[1], key)
+                    if candidate < best:
+                        best = candidate
+
+        if best is None:
+            return None
+        _, start, end = best[2]
+        return Span(start, end)
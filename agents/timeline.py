@@ -0,0 +1,116 @@
+"""Sweep-line computation of free time between busy intervals.
+
+Intervals are ``(start, end)`` pairs of epoch minutes (see ``timespan``).
+"""
+from datetime import date, datetime, time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from timespan import DAY_MINUTES, Span, minutes_of, parse_minutes
+from .recurrence import expand, is_recurring
+
+Interval = Tuple[int, int]
+
+MIN_SLOT_MINUTES = 30
+
+
+def parse_clock(value: str) -> time:
+    """Parse an "HH:MM" working-hours bound."""
+    return datetime.strptime(value, "%H:%M").time()
+
+
+def busy_intervals(events: Iterable[Dict], window: Optional[Interval] = None) -> List[Interval]:
+    """Parse each event once and merge overlapping or touching intervals.
+
+    Recurring events are expanded within `window` (epoch minutes); without a
+    window only their first occurrence counts.
+    """
+    intervals = []
+    for e in events:
+        if window is not None and is_recurring(e):
+            intervals.extend(expand(e, *window))
+        else:
+            intervals.append((parse_minutes(e.get("startTime") or e["start"]),
+                              parse_minutes(e.get("endTime") or e["end"])))
+    return merge_intervals(intervals)
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort intervals and merge overlapping or touching ones, dropping empty ones."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def expansion_window(start_date: date, end_date: date) -> Interval:
+    """Epoch-minute window covering start_date through end_date, plus a day for overnight hours."""
+    start = minutes_of(datetime.combine(start_date, time()))
+    return start, start + ((end_date - start_date).days + 2) * DAY_MINUTES
+
+
+def working_windows(start_date: date, end_date: date,
+                    work_start: time, work_end: time) -> Iterator[Interval]:
+    """Yield each day's working window from start_date to end_date inclusive.
+
+    A window whose end is not after its start runs past midnight.
+    """
+    first = minutes_of(datetime.combine(start_date, work_start))
+    length = minutes_of(datetime.combine(start_date, work_end)) - first
+    if length <= 0:
+        length += DAY_MINUTES
+    for day in range((end_date - start_date).days + 1):
+        start = first + day * DAY_MINUTES
+        yield start, start + length
+
+
+def free_intervals(busy: List[Interval], windows: Iterable[Interval],
+                   min_minutes: int = MIN_SLOT_MINUTES) -> Iterator[Span]:
+    """Sweep sorted windows against merged busy intervals, yielding the gaps.
+
+    Both inputs are sorted and non-overlapping, so one pass over each
+    suffices. Intervals crossing midnight clip every window they touch.
+    """
+    first = 0
+    for window_start, window_end in windows:
+        # Intervals ending before this window cannot touch any later one
+        while first < len(busy) and busy[first][1] <= window_start:
+            first += 1
+        cursor = window_start
+        i = first
+        while i < len(busy) and busy[i][0] < window_end:
+            start, end = busy[i]
+            if start - cursor >= min_minutes:
+                yield Span(cursor, start)
+            cursor = max(cursor, end)
+            i += 1
+        if window_end - cursor >= min_minutes:
+            yield Span(cursor, window_end)
+
+
+def expanding_free_intervals(events: Iterable[Dict], windows: Iterable[Interval],
+                             min_minutes: int = MIN_SLOT_MINUTES) -> Iterator[Span]:
+    """Like ``free_intervals``, expanding recurring events one window at a time.
+
+    Occurrences are generated only for the windows actually pulled, so a
+    long lazy stream costs nothing for days the caller never reaches.
+    """
+    events = list(events)
+    one_off = busy_intervals(e for e in events if not is_recurring(e))
+    recurring = [e for e in events if is_recurring(e)]
+    first = 0
+    for window_start, window_end in windows:
+        while first < len(one_off) and one_off[first][1] <= window_start:
+            first += 1
+        last = first
+        while last < len(one_off) and one_off[last][0] < window_end:
+            last += 1
+        busy = merge_intervals(one_off[first:last] + [
+            interval for e in recurring for interval in expand(e, window_start, window_end)
+        ])
+        yield from free_intervals(busy, ((window_start, window_end),), min_minutes)
@@ -0,0 +1,109 @@
+"""NumPy task × slot scoring for the allocator (optional dependency)."""
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the allocator falls back to SlotIndex
+    np = None
+
+from timespan import DAY_MINUTES, Span
+from .slot_index import PREFERENCE_PENALTY, PREFERENCE_WINDOW
+
+# Leftover slot parts shorter than this are dropped, as in the allocator
+MIN_LEFTOVER_MINUTES = 30
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _weight_table(slot_weights: Optional[Dict[str, float]]):
+    """24 × 7 table of learned slot weights keyed "hour_weekday"; 1.0 is neutral."""
+    table = np.ones((24, 7))
+    for key, weight in (slot_weights or {}).items():
+        hour, day = (int(part) for part in key.split("_"))
+        table[hour, day] = weight
+    return table
+
+
+def _score_columns(task_minutes, preferred, latest, starts, ends, compat: bool, weights):
+    """Cost of each task (rows) in each slot (columns); inf where it does not fit.
+
+    A slot starting after a task's ``latest`` start does not fit either.
+
+    Compatibility mode repeats ``SlotIndex.best_fit``'s scoring exactly, in
+    whole minutes so its ties stay exact: slack plus PREFERENCE_PENALTY when
+    the slot starts more than PREFERENCE_WINDOW hours from the preferred
+    hour. Otherwise the cost is slack in hours, the preference cost grows
+    with the distance around the clock (0-2), and slots with poor learned
+    completion and energy cost up to 2 more.
+    """
+    slot_minutes = ends - starts
+    hours = (starts % DAY_MINUTES) // 60
+    has_pref = (preferred >= 0)[:, None]
+    distance = np.abs(hours[None, :] - preferred[:, None])
+    if compat:
+        score = np.abs(slot_minutes[None, :] - task_minutes[:, None])
+        score += np.where(has_pref & (distance > PREFERENCE_WINDOW), float(PREFERENCE_PENALTY), 0.0)
+    else:
+        score = np.abs(slot_minutes[None, :] / 60 - (task_minutes / 60)[:, None])
+        distance = np.minimum(distance, 24 - distance)
+        score += np.where(has_pref, distance / 6.0, 0.0)
+        weekdays = (starts // DAY_MINUTES + 3) % 7
+        score += 2.0 * (1.0 - weights[hours, weekdays])[None, :]
+    score[slot_minutes[None, :] < task_minutes[:, None]] = np.inf
+    score[starts[None, :] > latest[:, None]] = np.inf
+    return score
+
+
+def vector_allocate(tasks: List[Tuple[Dict, Optional[int]]], slots: List[Span],
+                    compat: bool = True,
+                    slot_weights: Optional[Dict[str, float]] = None,
+                    latest_starts: Optional[List[Optional[int]]] = None) -> List[Optional[Span]]:
+    """Greedily place (task, preferred_hour) pairs in order, scoring all slots at once.
+
+    The cost matrix is built once. Each placement retires its slot's column
+    and appends a column for the leftover. Ties go to the earliest start,
+    as in ``SlotIndex.best_fit``, so compatibility mode places tasks
+    exactly as the indexed allocator does. Returns each task's
+    span, or None if it did not fit. ``latest_starts`` bounds each task's
+    start (None for no bound), e.g. its deadline minus its length.
+    """
+    count = len(tasks)
+    if not slots:
+        return [None] * count
+    capacity = len(slots) + count
+    starts = np.zeros(capacity, dtype=np.int64)
+    ends = np.zeros(capacity, dtype=np.int64)
+    starts[:len(slots)] = [s.start for s in slots]
+    ends[:len(slots)] = [s.end for s in slots]
+    task_minutes = np.array([t.get("estimatedMinutes", 60) for t, _ in tasks], dtype=float)
+    preferred = np.array([-1 if p is None else p for _, p in tasks], dtype=np.int64)
+    no_bound = np.iinfo(np.int64).max
+    latest = np.array([no_bound if s is None else s for s in latest_starts or [None] * count], dtype=np.int64)
+    weights = _weight_table(slot_weights)
+
+    cost = np.full((count, capacity), np.inf)
+    used = len(slots)
+    cost[:, :used] = _score_columns(task_minutes, preferred, latest, starts[:used], ends[:used], compat, weights)
+
+    placements: List[Optional[Span]] = []
+    for i in range(count):
+        row = cost[i, :used]
+        j = int(np.argmin(row))
+        if not np.isfinite(row[j]):
+            placements.append(None)
+            continue
+        ties = np.flatnonzero(row == row[j])
+        j = int(ties[np.argmin(starts[ties])])
+        task_end = int(starts[j]) + tasks[i][0].get("estimatedMinutes", 60)
+        placements.append(Span(int(starts[j]), task_end))
+        cost[:, j] = np.inf
+        if ends[j] - task_end >= MIN_LEFTOVER_MINUTES:
+            starts[used], ends[used] = task_end, ends[j]
+            cost[i + 1:, used] = _score_columns(
+                task_minutes[i + 1:], preferred[i + 1:], latest[i + 1:],
+                starts[used:used + 1], ends[used:used + 1], compat, weights
+            )[:, 0]
+            used += 1
+    return placements
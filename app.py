@@ -2,26 +2,26 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 
-from integration import get_schedule, update_task, add_goal, chat_command
-from memory.local_memory import LocalMemory
+from integration import run_schedule, update_task, add_goal, chat_command, reschedule, parser_stats
+from memory import open_memory
 
 # Initialize Flask app and CORS
 app = Flask(__name__)
 CORS(app)  # This will allow the frontend to make requests to the backend
 
-# Initialize memory store
-memory = LocalMemory("sample_data/memory.json")
+# Initialize memory store (backend selected by FLOW_MEMORY_BACKEND / FLOW_MEMORY_PATH)
+memory = open_memory()
 
 @app.route("/get_schedule", methods=["POST"])
 def schedule():
-    """Endpoint to generate a schedule."""
+    """Endpoint to generate a schedule; LLM calls run on the shared background loop."""
     data = request.get_json()
     user_id = data.get("user_id", "default")
     query = data.get("query", "")
     if not query:
         return jsonify({"error": "Query is required"}), 400
     
-    schedule_data = get_schedule(user_id, query, memory)
+    schedule_data = run_schedule(user_id, query, memory)
     return jsonify(schedule_data)
 
 @app.route("/update_task", methods=["POST"])
@@ -36,6 +36,25 @@ def task_update():
     update_task(user_id, task, memory)
     return jsonify({"status": "success"})
 
+@app.route("/reschedule", methods=["POST"])
+def schedule_patch():
+    """Endpoint to patch a previous schedule for a single change."""
+    data = request.get_json()
+    user_id = data.get("user_id", "default")
+    delta = data.get("delta")
+    if not delta:
+        return jsonify({"error": "Delta is required"}), 400
+    schedule = data.get("schedule", [])
+    if not isinstance(delta, dict) or not isinstance(schedule, list):
+        return jsonify({"error": "Delta must be an object and schedule a list"}), 400
+
+    horizon = {k: data[k] for k in ("horizonStart", "horizonEnd") if data.get(k)}
+    try:
+        result = reschedule(user_id, schedule, delta, memory, horizon)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid delta: {e}"}), 400
+    return jsonify(result)
+
 @app.route("/add_goal", methods=["POST"])
 def goal_add():
     """Endpoint to add a goal."""
@@ -60,5 +79,10 @@ def chat():
     response = chat_command(user_id, command, memory)
     return jsonify(response)
 
+@app.route("/parser_stats", methods=["GET"])
+def fast_path_stats():
+    """Endpoint reporting how often the parser's rule fast path answered."""
+    return jsonify(parser_stats())
+
 if __name__ == "__main__":
     app.run(debug=True, port=5000)
\ No newline at end of file
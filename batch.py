@@ -0,0 +1,229 @@
+"""Batch schedule generation for many users across worker processes.
+
+Inputs are user ids, or JSON objects with a "user_id" and any of "tasks",
+"fixedEvents", "preferences", "importedEvents", "horizonStart",
+"horizonEnd" and "query". Fields an input leaves out are read from memory.
+By default only the deterministic stages run (constraint, allocator,
+conflict resolver); ``llm=True`` adds the parser and coach, and the users
+of a chunk then run concurrently on one event loop per worker, so their LLM
+calls overlap.
+
+    python -m batch --all --workers 8 > schedules.jsonl
+    python -m batch --input users.jsonl --chunk-size 64 --llm
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+from memory import MemoryStore, open_memory
+
+Input = Union[str, Dict[str, Any]]
+
+DEFAULT_CHUNK_SIZE = 32
+DEFAULT_QUERY = "Plan my schedule"
+# Fields copied from each result into the batch output
+RESULT_FIELDS = ("schedule", "conflicts", "allocationStats", "errors")
+
+# Per-process memory, opened on first use from the backend/path given to
+# the worker initializer
+_memory: Optional[MemoryStore] = None
+_memory_options: Dict[str, Optional[str]] = {}
+# Per-process event loop for LLM chunks, kept so the shared LLM client's
+# async connections stay bound to a single loop
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _init_worker(backend: Optional[str], path: Optional[str]) -> None:
+    global _memory, _memory_options
+    _memory = None
+    _memory_options = {"backend": backend, "path": path}
+
+
+def _worker_memory() -> MemoryStore:
+    global _memory
+    if _memory is None:
+        _memory = open_memory(**_memory_options)
+    return _memory
+
+
+def _initial_state(item: Input) -> Dict[str, Any]:
+    """Agent-chain state for one input, reading missing fields from memory."""
+    from integration import schedule_state
+
+    if isinstance(item, str):
+        item = {"user_id": item}
+    state = dict(item)
+    state.setdefault("query", DEFAULT_QUERY)
+    if not {"tasks", "fixedEvents", "preferences"} <= state.keys():
+        stored = schedule_state(state["user_id"], state["query"], _worker_memory())
+        for key, value in stored.items():
+            state.setdefault(key, value)
+    return state
+
+
+def _agents(llm: bool) -> List:
+    from agents.allocator import AllocatorAgent
+    from agents.conflict import ConflictResolverAgent
+    from agents.constraint import ConstraintAgent
+
+    agents = [ConstraintAgent(), AllocatorAgent(), ConflictResolverAgent()]
+    if llm:
+        from agents.coach import CoachAgent
+        from agents.parser import ParserAgent
+        agents = [ParserAgent()] + agents + [CoachAgent()]
+    return agents
+
+
+def schedule_one(item: Input, agents: List) -> Dict[str, Any]:
+    """Run the agents over one input, collecting errors like the router does."""
+    state = _start(item)
+    if state["errors"]:
+        return state
+    for agent in agents:
+        try:
+            state = agent.run(state)
+        except Exception as e:
+            state["errors"].append({"agent": agent.name, "error": str(e), "type": "agent_error"})
+    return _result(state)
+
+
+async def aschedule_one(item: Input, agents: List) -> Dict[str, Any]:
+    """Asynchronous schedule_one, awaiting each agent's ``arun``."""
+    state = _start(item)
+    if state["errors"]:
+        return state
+    for agent in agents:
+        try:
+            state = await agent.arun(state)
+        except Exception as e:
+            state["errors"].append({"agent": agent.name, "error": str(e), "type": "agent_error"})
+    return _result(state)
+
+
+def _start(item: Input) -> Dict[str, Any]:
+    """Initial state for an input, or its error result if it cannot be read."""
+    try:
+        state = _initial_state(item)
+    except Exception as e:
+        user_id = item if isinstance(item, str) else item.get("user_id")
+        return {"user_id": user_id, "errors": [{"agent": "batch", "error": str(e), "type": "input_error"}]}
+    state["errors"] = []
+    return state
+
+
+def _result(state: Dict[str, Any]) -> Dict[str, Any]:
+    result = {"user_id": state["user_id"]}
+    result.update((key, state[key]) for key in RESULT_FIELDS if key in state)
+    return result
+
+
+def _run_chunk(chunk: List[Input], llm: bool) -> List[Dict[str, Any]]:
+    global _loop
+    agents = _agents(llm)
+    if not llm:
+        return [schedule_one(item, agents) for item in chunk]
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(_arun_chunk(chunk, agents))
+
+
+async def _arun_chunk(chunk: List[Input], agents: List) -> List[Dict[str, Any]]:
+    return list(await asyncio.gather(*(aschedule_one(item, agents) for item in chunk)))
+
+
+def _chunks(inputs: Iterable[Input], size: int) -> Iterator[List[Input]]:
+    it = iter(inputs)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(inputs: Iterable[Input], workers: Optional[int] = None,
+              chunk_size: int = DEFAULT_CHUNK_SIZE, llm: bool = False,
+              backend: Optional[str] = None, path: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Schedule every input, yielding results as their chunks complete.
+
+    Inputs are read lazily, with at most two chunks per worker in flight,
+    so a long JSONL stream is never held in memory. Results arrive in
+    completion order, not input order. ``workers=1`` runs in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(backend, path)
+        for chunk in _chunks(inputs, chunk_size):
+            yield from _run_chunk(chunk, llm)
+        return
+
+    chunks = _chunks(inputs, chunk_size)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(backend, path)) as pool:
+        pending = {pool.submit(_run_chunk, chunk, llm) for chunk in islice(chunks, workers * 2)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.add(pool.submit(_run_chunk, chunk, llm))
+                yield from future.result()
+
+
+def read_jsonl(stream: TextIO) -> Iterator[Input]:
+    """Inputs from a JSONL stream; a line holding a bare string is a user id."""
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate schedules for many users in parallel.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--users", nargs="+", help="user ids to schedule")
+    source.add_argument("--all", action="store_true", help="schedule every user in memory")
+    source.add_argument("--input", help="JSONL file of inputs, or - for stdin")
+    parser.add_argument("--output", help="JSONL file for results (default: stdout)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--llm", action="store_true", help="also run the parser and coach stages")
+    parser.add_argument("--backend", help="memory backend (default: FLOW_MEMORY_BACKEND)")
+    parser.add_argument("--path", help="memory path (default: FLOW_MEMORY_PATH)")
+    args = parser.parse_args(argv)
+
+    inputs: Iterable[Input] = args.users or []
+    if args.all:
+        inputs = open_memory(args.backend, args.path).users()
+    source_file = None
+    if args.input == "-":
+        inputs = read_jsonl(sys.stdin)
+    elif args.input:
+        source_file = open(args.input, encoding="utf-8")
+        inputs = read_jsonl(source_file)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    count = failed = 0
+    start = time.perf_counter()
+    try:
+        for result in run_batch(inputs, args.workers, args.chunk_size, args.llm, args.backend, args.path):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            count += 1
+            failed += bool(result.get("errors"))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if source_file is not None:
+            source_file.close()
+    elapsed = time.perf_counter() - start
+    print(f"Scheduled {count} users ({failed} with errors) in {elapsed:.2f}s, "
+          f"{count / elapsed if elapsed else 0:.1f} users/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ from datetime import datetime
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 
+from timespan import hour_of, parse_minutes, weekday_of
+
 
 class TaskFeedback(BaseModel):
     """Feedback for a completed task."""
@@ -17,6 +19,34 @@ class TaskFeedback(BaseModel):
     satisfaction: int = Field(..., ge=1, le=5)  # 1-5 scale
     notes: Optional[str] = None
 
+def feedback_to_record(feedback: TaskFeedback) -> Dict[str, Any]:
+    """Serialize task feedback to a JSON-safe dict."""
+    return {
+        **feedback.dict(),
+        "scheduled_start": feedback.scheduled_start.isoformat(),
+        "scheduled_end": feedback.scheduled_end.isoformat(),
+        "actual_start": feedback.actual_start.isoformat() if feedback.actual_start else None,
+        "actual_end": feedback.actual_end.isoformat() if feedback.actual_end else None
+    }
+
+
+def feedback_from_record(record: Dict[str, Any]) -> TaskFeedback:
+    """Rebuild task feedback from a dict written by `feedback_to_record`."""
+    record = dict(record)
+    record["scheduled_start"] = datetime.fromisoformat(record["scheduled_start"])
+    record["scheduled_end"] = datetime.fromisoformat(record["scheduled_end"])
+    if record.get("actual_start"):
+        record["actual_start"] = datetime.fromisoformat(record["actual_start"])
+    if record.get("actual_end"):
+        record["actual_end"] = datetime.fromisoformat(record["actual_end"])
+    return TaskFeedback(**record)
+
+
+def slot_weight(completion_rate: float, avg_energy: float) -> float:
+    """Combine a slot's completion rate and energy level into a 0-1 weight."""
+    return completion_rate * 0.6 + (avg_energy / 5.0) * 0.4
+
+
 class TimeSlotFeedback(BaseModel):
     """Aggregated feedback for time slots."""
     hour: int = Field(..., ge=0, le=23)
@@ -74,17 +104,17 @@ class FeedbackStore:
             return 1.0  # neutral weight for unknown slots
             
         # Combine completion rate and energy level
-        return (slot.completion_rate * 0.6 + (slot.avg_energy / 5.0) * 0.4)
+        return slot_weight(slot.completion_rate, slot.avg_energy)
         
     def update_schedule_weights(self, schedule: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Update task scheduling weights based on feedback history."""
         weighted_schedule = []
         
         for task in schedule:
-            start_time = datetime.fromisoformat(task["startTime"])
+            start = parse_minutes(task["startTime"])
             slot_weight = self.get_slot_weight(
-                start_time.hour,
-                start_time.weekday(),
+                hour_of(start),
+                weekday_of(start),
                 task.get("category", "")
             )
             
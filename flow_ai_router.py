@@ -2,11 +2,11 @@
 from typing import List, Dict, Any
 
 from agents.base import Agent
-from memory.local_memory import LocalMemory
+from memory import MemoryStore
 from context_manager import build_context
 
 
-def run_agent_chain(initial_state: Dict[str, Any], agents: List[Agent], memory: LocalMemory) -> Dict[str, Any]:
+def run_agent_chain(initial_state: Dict[str, Any], agents: List[Agent], memory: MemoryStore) -> Dict[str, Any]:
     """Run an agent chain with error handling and state validation.
     
     Args:
@@ -17,51 +17,83 @@ def run_agent_chain(initial_state: Dict[str, Any], agents: List[Agent], memory:
     Returns:
         Final state after all agents have processed
     """
-    state = dict(initial_state)
-    user_id = state.get("user_id", "default")
-    query = state.get("query", "")
-
-    # Initialize error tracking
-    state["errors"] = []
-    
+    state = _start(initial_state)
     try:
         # Retrieve relevant memories and build context
-        state["context"] = build_context(memory, user_id, query)
+        state["context"] = build_context(memory, state.get("user_id", "default"), state.get("query", ""))
         
         # Run each agent in sequence
         for agent in agents:
             try:
-                new_state = agent.run(state)
-                
-                # Validate state wasn't destroyed
-                if not isinstance(new_state, dict):
-                    raise ValueError(f"Agent {agent.name} returned invalid state type: {type(new_state)}")
-                    
-                state = new_state
-                
-                # Track agent completion
-                state.setdefault("completed_agents", []).append(agent.name)
-                
+                state = _advance(state, agent, agent.run(state))
             except Exception as e:
-                state["errors"].append({
-                    "agent": agent.name,
-                    "error": str(e),
-                    "type": "agent_error"
-                })
                 # Continue with next agent unless fatal
-                if str(e).startswith("FATAL:"):
+                if _record_agent_error(state, agent, e):
                     break
                     
     except Exception as e:
-        state["errors"].append({
-            "agent": "router",
-            "error": str(e),
-            "type": "system_error"
-        })
+        _record_system_error(state, e)
         
     return state
 
 
+async def arun_agent_chain(initial_state: Dict[str, Any], agents: List[Agent],
+                           memory: MemoryStore) -> Dict[str, Any]:
+    """Asynchronous run_agent_chain: awaits each agent's ``arun``.
+
+    LLM-backed agents await their calls, so one event loop can drive many
+    chains at once; deterministic agents run inline.
+    """
+    state = _start(initial_state)
+    try:
+        state["context"] = build_context(memory, state.get("user_id", "default"), state.get("query", ""))
+        for agent in agents:
+            try:
+                state = _advance(state, agent, await agent.arun(state))
+            except Exception as e:
+                if _record_agent_error(state, agent, e):
+                    break
+    except Exception as e:
+        _record_system_error(state, e)
+    return state
+
+
+def _start(initial_state: Dict[str, Any]) -> Dict[str, Any]:
+    state = dict(initial_state)
+    # Initialize error tracking
+    state["errors"] = []
+    return state
+
+
+def _advance(state: Dict[str, Any], agent: Agent, new_state: Any) -> Dict[str, Any]:
+    """Validate an agent's returned state and mark the agent completed."""
+    # Validate state wasn't destroyed
+    if not isinstance(new_state, dict):
+        raise ValueError(f"Agent {agent.name} returned invalid state type: {type(new_state)}")
+
+    # Track agent completion
+    new_state.setdefault("completed_agents", []).append(agent.name)
+    return new_state
+
+
+def _record_agent_error(state: Dict[str, Any], agent: Agent, error: Exception) -> bool:
+    """Record an agent failure; return whether it is fatal to the chain."""
+    state["errors"].append({
+        "agent": agent.name,
+        "error": str(error),
+        "type": "agent_error"
+    })
+    return str(error).startswith("FATAL:")
+
+
+def _record_system_error(state: Dict[str, Any], error: Exception) -> None:
+    state["errors"].append({
+        "agent": "router",
+        "error": str(error),
+        "type": "system_error"
+    })
+
+
 if __name__ == "__main__":
     # Test run with full agent chain
     from agents.parser import ParserAgent
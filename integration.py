@@ -1,15 +1,40 @@
 """Integration endpoints for file-based API commands."""
+import asyncio
 import json
+import threading
 from typing import Dict, Any, Optional
-from memory.local_memory import LocalMemory
-from flow_ai_router import run_agent_chain
+from memory import MemoryStore, open_memory
+from flow_ai_router import arun_agent_chain, run_agent_chain
+from agents import intent
 from agents.parser import ParserAgent
 from agents.constraint import ConstraintAgent
 from agents.allocator import AllocatorAgent
+from agents.conflict import ConflictResolverAgent
 from agents.coach import CoachAgent
+from agents.incremental import IncrementalScheduler
+from feedback import slot_weight
 
 # You can add more agents as needed
 
+# Memory opened on first use when callers do not pass one in
+_default_memory: Optional[MemoryStore] = None
+
+# Long-lived event loop on a daemon thread for schedule requests from sync
+# callers (e.g. Flask views), so the shared LLM client's async connections
+# stay bound to a single loop and concurrent requests overlap their LLM calls
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _get_memory(memory: Optional[MemoryStore]) -> MemoryStore:
+    """Return the given memory, or the shared default store."""
+    global _default_memory
+    if memory is not None:
+        return memory
+    if _default_memory is None:
+        _default_memory = open_memory()
+    return _default_memory
+
 def _clean_state_for_json(state: Dict[str, Any]) -> Dict[str, Any]:
     """Remove non-serializable items from the state for JSON conversion."""
     cleaned_state = {}
@@ -23,55 +48,106 @@ def _clean_state_for_json(state: Dict[str, Any]) -> Dict[str, Any]:
             pass
     return cleaned_state
 
-def get_schedule(user_id: str, query: str, memory: Optional[LocalMemory] = None) -> Dict[str, Any]:
+def _slot_weights(memory: MemoryStore, user_id: str) -> Dict[str, float]:
+    """Learned "hour_weekday" slot weights for the allocator's vector scoring."""
+    time_slots = memory.get_scheduling_insights(user_id)["time_slots"]
+    return {
+        key: slot_weight(slot["completion_rate"], slot["avg_energy"])
+        for key, slot in time_slots.items()
+    }
+
+def get_schedule(user_id: str, query: str, memory: Optional[MemoryStore] = None) -> Dict[str, Any]:
     """Generate a schedule for the user based on their query and memory."""
-    if memory is None:
-        memory = LocalMemory("sample_data/memory.json")
+    memory = _get_memory(memory)
     
-    agents = [ParserAgent(), ConstraintAgent(), AllocatorAgent(), CoachAgent()]
-    
-    # Retrieve all data for the user from memory
-    all_user_data = memory.retrieve(user_id=user_id, query="")
-    
-    # Filter the data into tasks, fixed events, and preferences
-    tasks = [item['item'] for item in all_user_data if isinstance(item, dict) and item.get('item', {}).get('type') == 'task']
-    # Assuming preferences are stored in a specific format; for now, we'll look for a 'preferences' key
-    preferences = [item['item'] for item in all_user_data if isinstance(item, dict) and 'break_ratio' in item.get('item', {})]
-    
-    # For fixedEvents, you might have another type or a different way to identify them.
-    # We will assume for now they might not be in memory and could be passed in the query.
-    fixed_events = [item['item'] for item in all_user_data if isinstance(item, dict) and item.get('item', {}).get('type') == 'fixedEvent']
+    result_state = run_agent_chain(schedule_state(user_id, query, memory), _schedule_agents(), memory)
+    return _clean_state_for_json(result_state)
 
+async def aget_schedule(user_id: str, query: str, memory: Optional[MemoryStore] = None) -> Dict[str, Any]:
+    """Asynchronous get_schedule: the parser and coach await their LLM calls."""
+    memory = _get_memory(memory)
+    result_state = await arun_agent_chain(schedule_state(user_id, query, memory), _schedule_agents(), memory)
+    return _clean_state_for_json(result_state)
 
-    initial_state = {
+def run_schedule(user_id: str, query: str, memory: Optional[MemoryStore] = None) -> Dict[str, Any]:
+    """Blocking aget_schedule, run on the process-wide background loop."""
+    return asyncio.run_coroutine_threadsafe(aget_schedule(user_id, query, memory), _background_loop()).result()
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="schedule-loop", daemon=True).start()
+        return _loop
+
+def _schedule_agents():
+    return [ParserAgent(), ConstraintAgent(), AllocatorAgent(), ConflictResolverAgent(), CoachAgent()]
+
+def schedule_state(user_id: str, query: str, memory: MemoryStore) -> Dict[str, Any]:
+    """Initial agent-chain state for scheduling a user from their memory."""
+    # Typed lookups straight from the memory's per-type indexes
+    return {
         "user_id": user_id,
         "query": query,
-        "tasks": tasks,
-        "fixedEvents": fixed_events,
-        "preferences": preferences[0] if preferences else {}
+        "tasks": [task for task in memory.tasks(user_id) if not task.get("removed")],
+        "fixedEvents": memory.fixed_events(user_id),
+        "preferences": memory.latest_preferences(user_id),
+        "slotWeights": _slot_weights(memory, user_id)
     }
 
-    result_state = run_agent_chain(initial_state, agents, memory)
-    return _clean_state_for_json(result_state)
+def reschedule(user_id: str, schedule: list, delta: Dict[str, Any],
+               memory: Optional[MemoryStore] = None,
+               horizon: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Patch a previous schedule for one change and record the change.
 
-def update_task(user_id: str, task: Dict[str, Any], memory: Optional[LocalMemory] = None) -> None:
+    Returns the patched schedule, the entries that moved and anything that
+    no longer fits, without rerunning the agent chain. `horizon` may give
+    "horizonStart"/"horizonEnd" dates to place moved tasks within.
+    """
+    memory = _get_memory(memory)
+    state = {
+        "schedule": schedule,
+        "fixedEvents": memory.fixed_events(user_id),
+        "preferences": memory.latest_preferences(user_id),
+        **(horizon or {})
+    }
+    result = IncrementalScheduler().apply(state, delta)
+
+    kind = delta["type"]
+    if kind == "task_added":
+        update_task(user_id, delta["task"], memory)
+    elif kind == "fixed_event_added":
+        memory.persist(user_id, {"type": "fixedEvent", **delta["event"]})
+    else:
+        for task in memory.tasks(user_id):
+            if task.get("title") == delta["title"]:
+                if kind == "task_removed":
+                    memory.persist(user_id, {**task, "removed": True})
+                else:
+                    memory.persist(user_id, {**task, "estimatedMinutes": delta["estimatedMinutes"]})
+                break
+    return result
+
+def update_task(user_id: str, task: Dict[str, Any], memory: Optional[MemoryStore] = None) -> None:
     """Update or add a task for the user."""
-    if memory is None:
-        memory = LocalMemory("sample_data/memory.json")
+    memory = _get_memory(memory)
     memory.persist(user_id, {"type": "task", **task})
 
-def add_goal(user_id: str, goal: Dict[str, Any], memory: Optional[LocalMemory] = None) -> None:
+def add_goal(user_id: str, goal: Dict[str, Any], memory: Optional[MemoryStore] = None) -> None:
     """Add a new goal for the user."""
-    if memory is None:
-        memory = LocalMemory("sample_data/memory.json")
+    memory = _get_memory(memory)
     memory.persist(user_id, {"type": "goal", **goal})
 
-def chat_command(user_id: str, command: str, memory: Optional[LocalMemory] = None) -> Dict[str, Any]:
+def chat_command(user_id: str, command: str, memory: Optional[MemoryStore] = None) -> Dict[str, Any]:
     """Process a chat command (general interface for LLM-based actions)."""
-    if memory is None:
-        memory = LocalMemory("sample_data/memory.json")
+    memory = _get_memory(memory)
     
-    agents = [ParserAgent(), ConstraintAgent(), AllocatorAgent(), CoachAgent()]
+    agents = [ParserAgent(), ConstraintAgent(), AllocatorAgent(), ConflictResolverAgent(), CoachAgent()]
     initial_state = {"user_id": user_id, "query": command}
     result_state = run_agent_chain(initial_state, agents, memory)
-    return _clean_state_for_json(result_state)
\ No newline at end of file
+    return _clean_state_for_json(result_state)
+
+def parser_stats() -> Dict[str, Any]:
+    """This process's counts of queries the parser answered by rules versus the LLM."""
+    return intent.stats.snapshot()
@@ -0,0 +1,144 @@
+"""Prompt-keyed cache of LLM response text, in memory and optionally on disk.
+
+Entries are keyed on a hash of model, prompt, temperature and max_tokens.
+The memory tier is an LRU of ``max_entries``; the disk tier is a SQLite
+file shared by every process that points at it. Deterministic calls
+(temperature 0) use ``deterministic_ttl`` (default: never expire), sampled
+calls ``ttl_seconds``.
+
+The default cache is configured from the environment: FLOW_LLM_CACHE=0
+disables it, FLOW_LLM_CACHE_SIZE sets the LRU size, FLOW_LLM_CACHE_TTL the
+TTL of sampled responses in seconds, and FLOW_LLM_CACHE_PATH enables the
+disk tier.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    expires REAL
+)
+"""
+
+
+def cache_key(model: str, prompt: str, temperature: float, max_tokens: int) -> str:
+    payload = json.dumps([model, prompt, float(temperature), int(max_tokens)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier response cache with TTLs and hit/miss counters."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 300,
+                 deterministic_ttl: Optional[float] = None, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.deterministic_ttl = deterministic_ttl
+        self.path = path
+        self._lock = threading.Lock()
+        # key -> (text, expiry time or None)
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0}
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            with self._db:
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(_SCHEMA)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached text for `key`, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] is None or entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[0]
+                del self._entries[key]
+                self._stats["expired"] += 1
+            if self._db is not None:
+                row = self._db.execute("SELECT text, expires FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    if row[1] is None or row[1] > now:
+                        self._remember(key, row[0], row[1])
+                        self._stats["disk_hits"] += 1
+                        return row[0]
+                    with self._db:
+                        self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, text: str, temperature: float) -> None:
+        ttl = self.deterministic_ttl if temperature == 0 else self.ttl_seconds
+        expires = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._remember(key, text, expires)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("INSERT OR REPLACE INTO responses (key, text, expires) VALUES (?, ?, ?)",
+                                     (key, text, expires))
+
+    def discard(self, key: str) -> None:
+        """Forget an entry, e.g. a response that failed validation."""
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _remember(self, key: str, text: str, expires: Optional[float]) -> None:
+        self._entries[key] = (text, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters, memory entries and the overall hit rate."""
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries))
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+_default: Optional[ResponseCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> Optional[ResponseCache]:
+    """The process-wide cache configured from the environment, or None if disabled."""
+    global _default
+    if os.environ.get("FLOW_LLM_CACHE", "1") == "0":
+        return None
+    with _default_lock:
+        if _default is None:
+            ttl = os.environ.get("FLOW_LLM_CACHE_TTL")
+            _default = ResponseCache(
+                max_entries=int(os.environ.get("FLOW_LLM_CACHE_SIZE", "1024")),
+                ttl_seconds=float(ttl) if ttl else 300,
+                path=os.environ.get("FLOW_LLM_CACHE_PATH") or None
+            )
+        return _default
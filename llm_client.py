@@ -3,16 +3,83 @@
 This is a thin wrapper so we can swap implementations later (REST, LiteLLM).
 The client attempts to use the Google SDK if available, falling back to a mock
 for development/testing.
+
+Agents share one client per configuration through ``LLMClient.shared()``, so
+``.env`` loading, SDK configuration and model construction happen once per
+process, and the SDK's underlying connection is reused across requests.
+``agenerate`` is the asyncio counterpart of ``generate``: one worker can keep
+many calls in flight with ``asyncio.gather``.
+
+Successful SDK responses are cached by prompt (see ``llm_cache``); a hit
+returns ``{"text": ..., "raw": None, "cached": True}``. Mock responses are
+never cached.
+
+SDK calls are bounded by ``llm_resilience``: each attempt has a timeout,
+failed attempts are retried with jittered backoff within an overall
+deadline, and a per-model circuit breaker skips the SDK while it keeps
+failing. In those cases the deterministic mock response is returned with
+``"fallback": True`` and the ``"error"``. ``generate_validated`` and
+``agenerate_validated`` also re-prompt when the response does not validate.
+The timeout is passed as ``request_options``, which needs
+google-generativeai 0.4.0 or later.
 """
+import asyncio
+import logging
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 
+from llm_cache import ResponseCache, cache_key, default_cache
+from llm_resilience import CircuitBreaker, RetryPolicy, breaker_for
+from validators import avalidate_llm_response, validate_llm_response
+
+logger = logging.getLogger(__name__)
+
+# Appended to the prompt when a response fails validation
+REPROMPT = """
+
+Your previous response could not be used: {error}
+Respond again with only the JSON object in the format above."""
+
+# Process-wide setup, guarded by _lock: .env is loaded once, the SDK is
+# configured once per API key, and shared clients are kept per configuration
+_lock = threading.Lock()
+_env_loaded = False
+_UNCONFIGURED = object()
+_configured_key: Any = _UNCONFIGURED
+_shared: Dict[Tuple[str, str, float, int], "LLMClient"] = {}
+
+
+def _load_env() -> None:
+    global _env_loaded
+    with _lock:
+        if not _env_loaded:
+            # load from .env if present
+            load_dotenv()
+            _env_loaded = True
+
+
+def _configure_sdk(api_key: Optional[str]):
+    """Import and configure the SDK, reconfiguring only when the key changes."""
+    global _configured_key
+    import google.generativeai as genai
+    with _lock:
+        if _configured_key is _UNCONFIGURED or _configured_key != api_key:
+            genai.configure(api_key=api_key)
+            _configured_key = api_key
+    return genai
+
 
 class LLMClient:
-    def __init__(self, api_key_env_var: str = "GEMINI_API_KEY", model_name: str = "models/gemini-2.5-flash", temperature: float = 0.7, max_tokens: int = 8000):
-        # load from .env if present
-        load_dotenv()
+    def __init__(self, api_key_env_var: str = "GEMINI_API_KEY", model_name: str = "models/gemini-2.5-flash", temperature: float = 0.7, max_tokens: int = 8000,
+                 cache: Optional[ResponseCache] = None, retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        _load_env()
+        self.cache = cache if cache is not None else default_cache()
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or breaker_for(model_name)
         self.api_key = os.environ.get(api_key_env_var)
         self._model = None
         self._has_sdk = False
@@ -20,35 +87,164 @@ class LLMClient:
         self.temperature = temperature
         self.max_tokens = max_tokens
         try:
-            import google.generativeai as genai
-            genai.configure(api_key=self.api_key)
+            genai = _configure_sdk(self.api_key)
             self._model = genai.GenerativeModel(self.model_name)
             self._has_sdk = True
         except Exception as e:
-            print(f"Warning: Could not initialize Gemini SDK: {e}")
+            logger.warning("Could not initialize Gemini SDK: %s", e)
             self._has_sdk = False
 
+    @classmethod
+    def shared(cls, api_key_env_var: str = "GEMINI_API_KEY", model_name: str = "models/gemini-2.5-flash",
+               temperature: float = 0.7, max_tokens: int = 8000) -> "LLMClient":
+        """Return the process-wide client for this configuration, creating it on first use."""
+        key = (api_key_env_var, model_name, temperature, max_tokens)
+        client = _shared.get(key)
+        if client is None:
+            client = cls(api_key_env_var, model_name, temperature, max_tokens)
+            with _lock:
+                client = _shared.setdefault(key, client)
+        return client
+
+    def _generation_config(self, temperature: Optional[float], max_tokens: Optional[int]) -> Dict[str, Any]:
+        return {
+            "temperature": temperature if temperature is not None else self.temperature,
+            "max_output_tokens": max_tokens if max_tokens is not None else self.max_tokens,
+            "top_p": 0.95,
+        }
+
+    def _cache_lookup(self, prompt: str, config: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Return (cache key, cached response); both None when caching is off."""
+        if self.cache is None:
+            return None, None
+        key = cache_key(self.model_name, prompt, config["temperature"], config["max_output_tokens"])
+        text = self.cache.get(key)
+        return key, ({"text": text, "raw": None, "cached": True} if text is not None else None)
+
+    def _store(self, key: Optional[str], config: Dict[str, Any], response) -> Dict[str, Any]:
+        if key is not None:
+            self.cache.put(key, response.text, config["temperature"])
+        return {"text": response.text, "raw": response}
+
     def generate(self, prompt: str, temperature: float = None, max_tokens: int = None) -> Dict[str, Any]:
         """Synchronous generation interface.
         Returns a dict with keys: text, raw.
         """
-        temp = temperature if temperature is not None else self.temperature
-        tokens = max_tokens if max_tokens is not None else self.max_tokens
-        if self._has_sdk and self._model:
-            try:
-                response = self._model.generate_content(
-                    prompt,
-                    generation_config={
-                        "temperature": temp,
-                        "max_output_tokens": tokens,
-                        "top_p": 0.95,
-                    }
-                )
-                return {"text": response.text, "raw": response}
-            except Exception as e:
-                print(f"Warning: Gemini call failed: {e}")
-                return self._mock_response(prompt)
-        return self._mock_response(prompt)
+        if not (self._has_sdk and self._model):
+            return self._mock_response(prompt)
+        config = self._generation_config(temperature, max_tokens)
+        key, cached = self._cache_lookup(prompt, config)
+        if cached is not None:
+            return cached
+        if not self.breaker.allow():
+            return self._fallback(prompt, "circuit open")
+        error = None
+        try:
+            for delay, timeout in self.retry.attempts():
+                if delay:
+                    time.sleep(delay)
+                try:
+                    response = self._model.generate_content(
+                        prompt, generation_config=config, request_options={"timeout": timeout})
+                    result = self._store(key, config, response)
+                except Exception as e:
+                    error = e
+                    logger.warning("Gemini call failed: %s", e)
+                    continue
+                self.breaker.record_success()
+                return result
+        except BaseException:
+            # Interrupted mid-call: free a half-open trial slot without
+            # counting a failure, since the outcome is unknown
+            self.breaker.release()
+            raise
+        self.breaker.record_failure()
+        return self._fallback(prompt, str(error))
+
+    async def agenerate(self, prompt: str, temperature: float = None, max_tokens: int = None) -> Dict[str, Any]:
+        """Asynchronous generation interface, with the same result and fallbacks as generate."""
+        if not (self._has_sdk and self._model):
+            return self._mock_response(prompt)
+        config = self._generation_config(temperature, max_tokens)
+        key, cached = self._cache_lookup(prompt, config)
+        if cached is not None:
+            return cached
+        if not self.breaker.allow():
+            return self._fallback(prompt, "circuit open")
+        error = None
+        try:
+            for delay, timeout in self.retry.attempts():
+                if delay:
+                    await asyncio.sleep(delay)
+                try:
+                    response = await asyncio.wait_for(self._model.generate_content_async(
+                        prompt, generation_config=config, request_options={"timeout": timeout}), timeout)
+                    result = self._store(key, config, response)
+                except Exception as e:
+                    error = e
+                    logger.warning("Gemini call failed: %s", e)
+                    continue
+                self.breaker.record_success()
+                return result
+        except BaseException:
+            # Cancelled mid-call (CancelledError is not an Exception)
+            self.breaker.release()
+            raise
+        self.breaker.record_failure()
+        return self._fallback(prompt, str(error))
+
+    def generate_validated(self, prompt: str, agent_type: str, max_retries: int = 3,
+                           temperature: float = None, max_tokens: int = None) -> Dict[str, Any]:
+        """Generate, re-prompting with the validation error while the response is invalid.
+
+        Returns the last response. Fallback responses are never re-prompted.
+        """
+        config = self._generation_config(temperature, max_tokens)
+        resp = self.generate(prompt, temperature, max_tokens)
+        current = prompt
+
+        def regenerate(error: str) -> Optional[str]:
+            nonlocal resp, current
+            current = self._reprompt(prompt, current, resp, config, error)
+            if current is None:
+                return None
+            resp = self.generate(current, temperature, max_tokens)
+            return resp["text"]
+
+        validate_llm_response(resp["text"], agent_type, max_retries, regenerate=regenerate)
+        return resp
+
+    async def agenerate_validated(self, prompt: str, agent_type: str, max_retries: int = 3,
+                                  temperature: float = None, max_tokens: int = None) -> Dict[str, Any]:
+        """Asynchronous generate_validated."""
+        config = self._generation_config(temperature, max_tokens)
+        resp = await self.agenerate(prompt, temperature, max_tokens)
+        current = prompt
+
+        async def regenerate(error: str) -> Optional[str]:
+            nonlocal resp, current
+            current = self._reprompt(prompt, current, resp, config, error)
+            if current is None:
+                return None
+            resp = await self.agenerate(current, temperature, max_tokens)
+            return resp["text"]
+
+        await avalidate_llm_response(resp["text"], agent_type, max_retries, regenerate=regenerate)
+        return resp
+
+    def _reprompt(self, prompt: str, current: str, resp: Dict[str, Any], config: Dict[str, Any],
+                  error: str) -> Optional[str]:
+        """The prompt to retry with after `error`, or None if retrying cannot help.
+
+        The rejected response is dropped from the cache so it is not served again.
+        """
+        if resp.get("fallback") or not self._has_sdk:
+            return None
+        if self.cache is not None:
+            self.cache.discard(cache_key(self.model_name, current, config["temperature"],
+                                         config["max_output_tokens"]))
+        return prompt + REPROMPT.format(error=error)
+
     def list_models(self):
         """List available Gemini models if SDK is available."""
         if self._has_sdk:
@@ -56,9 +252,12 @@ class LLMClient:
                 import google.generativeai as genai
                 return genai.list_models()
             except Exception as e:
-                print(f"Error listing models: {e}")
+                logger.warning("Error listing models: %s", e)
         return []
 
+    def _fallback(self, prompt: str, error: str) -> Dict[str, Any]:
+        return {**self._mock_response(prompt), "fallback": True, "error": error}
+
     def _mock_response(self, prompt: str) -> Dict[str, Any]:
         """Return a mock response with JSON-like content for testing."""
         if "schedule" in prompt.lower():
@@ -0,0 +1,118 @@
+"""Retry policy and circuit breaker for LLM calls.
+
+``RetryPolicy`` bounds each attempt with a timeout and spaces retries with
+capped exponential backoff and full jitter, giving up once the overall
+deadline would be passed. ``CircuitBreaker`` opens after consecutive
+failures, so callers fail fast to their fallback instead of queueing
+behind a degraded backend, and lets a single trial call through after
+``reset_seconds``.
+
+Defaults come from FLOW_LLM_TIMEOUT (seconds per attempt, 20),
+FLOW_LLM_MAX_ATTEMPTS (3), FLOW_LLM_DEADLINE (seconds per call across
+attempts, 45), FLOW_LLM_BREAKER_FAILURES (5) and FLOW_LLM_BREAKER_RESET
+(seconds, 30).
+"""
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class RetryPolicy:
+    def __init__(self, timeout: Optional[float] = None, max_attempts: Optional[int] = None,
+                 deadline: Optional[float] = None, base_delay: float = 0.5, max_delay: float = 8.0):
+        self.timeout = timeout if timeout is not None else float(os.environ.get("FLOW_LLM_TIMEOUT", "20"))
+        self.max_attempts = max_attempts or int(os.environ.get("FLOW_LLM_MAX_ATTEMPTS", "3"))
+        self.deadline = deadline if deadline is not None else float(os.environ.get("FLOW_LLM_DEADLINE", "45"))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def attempts(self) -> Iterator[Tuple[float, float]]:
+        """Yield (delay to wait first, timeout) for each attempt.
+
+        The caller sleeps for the delay (``time.sleep`` or ``asyncio.sleep``).
+        Stops after max_attempts, or when the delay plus a full timeout
+        would run past the deadline.
+        """
+        start = time.monotonic()
+        for attempt in range(self.max_attempts):
+            remaining = self.deadline - (time.monotonic() - start)
+            delay = self.backoff(attempt) if attempt else 0.0
+            if attempt and delay + self.timeout > remaining:
+                return
+            yield delay, min(self.timeout, remaining - delay)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker, safe to share between threads."""
+
+    def __init__(self, failure_threshold: Optional[int] = None, reset_seconds: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold or int(os.environ.get("FLOW_LLM_BREAKER_FAILURES", "5"))
+        self.reset_seconds = (reset_seconds if reset_seconds is not None
+                              else float(os.environ.get("FLOW_LLM_BREAKER_RESET", "30")))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if self._clock() - self._opened_at >= self.reset_seconds:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; half-open admits one trial at a time."""
+        with self._lock:
+            state = self._state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def release(self) -> None:
+        """End a call whose outcome is unknown (e.g. cancelled) without counting it."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(name: str) -> CircuitBreaker:
+    """The process-wide breaker for a backend (e.g. a model name)."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker()
+        return _breakers[name]
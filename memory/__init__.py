@@ -1 +1,42 @@
 """Memory package"""
+import os
+from typing import Optional
+
+from .local_memory import LocalMemory
+from .retention import RetentionPolicy
+from .sharded import ShardedMemory
+from .sqlite_memory import SQLiteMemory
+from .store import MemoryStore
+
+
+def open_memory(backend: Optional[str] = None, path: Optional[str] = None) -> MemoryStore:
+    """Open the configured memory backend.
+
+    The backend and path default to the FLOW_MEMORY_BACKEND ("json",
+    "sharded" or "sqlite") and FLOW_MEMORY_PATH environment variables. For the
+    JSON backends, FLOW_MEMORY_JOURNAL=1 enables journal mode,
+    FLOW_MEMORY_WRITE_WINDOW_MS sets the group-commit window and
+    FLOW_MEMORY_DURABILITY the fsync policy ("always", "interval", "never")
+    and FLOW_MEMORY_SNAPSHOT_FORMAT the snapshot format ("json", "binary").
+    The sharded backend reads FLOW_MEMORY_BUCKETS and FLOW_MEMORY_MAX_SHARDS.
+    """
+    backend = backend or os.environ.get("FLOW_MEMORY_BACKEND", "json")
+    path = path or os.environ.get("FLOW_MEMORY_PATH")
+    if backend == "sqlite":
+        return SQLiteMemory(path or "sample_data/memory.db")
+    json_options = {
+        "journal": os.environ.get("FLOW_MEMORY_JOURNAL") == "1",
+        "write_window_ms": float(os.environ.get("FLOW_MEMORY_WRITE_WINDOW_MS", "0")),
+        "durability": os.environ.get("FLOW_MEMORY_DURABILITY", "never"),
+        "snapshot_format": os.environ.get("FLOW_MEMORY_SNAPSHOT_FORMAT") or None
+    }
+    if backend == "sharded":
+        return ShardedMemory(
+            path or "sample_data/memory_shards",
+            buckets=int(os.environ.get("FLOW_MEMORY_BUCKETS", "64")),
+            max_open_shards=int(os.environ.get("FLOW_MEMORY_MAX_SHARDS", "16")),
+            **json_options
+        )
+    if backend == "json":
+        return LocalMemory(path or "sample_data/memory.json", **json_options)
+    raise ValueError(f"Unknown memory backend: {backend}")
@@ -0,0 +1,75 @@
+"""Token inverted index with BM25 scoring for keyword retrieval."""
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def item_text(item: Any) -> str:
+    """Flatten a memory item into searchable text (values only, not keys)."""
+    if isinstance(item, dict):
+        return " ".join(item_text(v) for v in item.values())
+    if isinstance(item, (list, tuple)):
+        return " ".join(item_text(v) for v in item)
+    return str(item)
+
+
+class BM25Index:
+    """Incremental inverted index over a sequence of documents.
+
+    Documents are identified by their insertion position. Postings and
+    document lengths are maintained on `add`, so `search` only touches the
+    postings of the query tokens rather than every document.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: List[int] = []
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, text: str) -> int:
+        """Index a document and return its id."""
+        doc_id = len(self.doc_lengths)
+        tokens = tokenize(text)
+        for token, tf in Counter(tokens).items():
+            self.postings.setdefault(token, {})[doc_id] = tf
+        self.doc_lengths.append(len(tokens))
+        self.total_length += len(tokens)
+        return doc_id
+
+    def search(self, query: str, limit: int = 5) -> List[int]:
+        """Return ids of the best matching documents, best first.
+
+        Ties are broken in favour of more recent documents.
+        """
+        n_docs = len(self.doc_lengths)
+        if not n_docs:
+            return []
+        avg_length = self.total_length / n_docs or 1.0
+
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda kv: (kv[1], kv[0]))
+        return [doc_id for doc_id, _ in best]
@@ -0,0 +1,108 @@
+"""Advisory inter-process file lock and write generation counters."""
+import os
+import struct
+import threading
+from typing import Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Exclusive advisory lock on a sidecar lock file.
+
+    Re-entrant within a process: nested `with` blocks on the same lock only
+    take the OS lock once. Threads sharing the object are serialized too.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fh = None
+
+    def __enter__(self) -> "FileLock":
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._fh = open(self.path, "a+b")
+                self._lock(self._fh.fileno())
+            except BaseException:
+                if self._fh is not None:
+                    self._fh.close()
+                    self._fh = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self._unlock(self._fh.fileno())
+            finally:
+                self._fh.close()
+                self._fh = None
+        self._thread_lock.release()
+
+    @staticmethod
+    def _lock(fileno: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(fileno, fcntl.LOCK_EX)
+            return
+        os.lseek(fileno, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fileno, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after ~10s; keep waiting like flock does
+                continue
+
+    @staticmethod
+    def _unlock(fileno: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(fileno, fcntl.LOCK_UN)
+            return
+        os.lseek(fileno, 0, os.SEEK_SET)
+        msvcrt.locking(fileno, msvcrt.LK_UNLCK, 1)
+
+
+class GenerationCounter:
+    """Write counters for a set of files, kept in a small sidecar file.
+
+    Writers bump a file's counter under the FileLock each time they replace
+    it. A reader that remembers the counter it last saw detects every
+    foreign write. That includes same-size rewrites within one mtime tick,
+    which an (mtime, size) comparison misses.
+    """
+
+    def __init__(self, path: str, slots: int):
+        self.path = path
+        self._format = "<%dQ" % slots
+        self._size = struct.calcsize(self._format)
+
+    def read(self) -> Tuple[int, ...]:
+        """Current counters; zeros if the sidecar does not exist yet."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read(self._size)
+        except OSError:
+            data = b""
+        return struct.unpack(self._format, data.ljust(self._size, b"\0"))
+
+    def bump(self, slot: int) -> int:
+        """Increment one counter and return its new value (hold the FileLock)."""
+        counters = list(self.read())
+        counters[slot] += 1
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            # One small write, so unlocked readers never see a partial update
+            os.write(fd, struct.pack(self._format, *counters))
+        finally:
+            os.close(fd)
+        return counters[slot]
@@ -0,0 +1,63 @@
+"""Classification and field helpers for stored memory items."""
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+# Sorts after any ISO timestamp: the last end of an open-ended recurring event
+OPEN_ENDED = "9999-12-31T23:59:59"
+
+
+def item_type(item: Any) -> Optional[str]:
+    """Classify a memory item for the typed indexes."""
+    if isinstance(item, dict):
+        if item.get("type"):
+            return item["type"]
+        if "break_ratio" in item:
+            # Preference records predate the "type" field
+            return "preferences"
+        return None
+    if isinstance(item, str):
+        return "note"
+    return None
+
+
+def event_start(event: Dict[str, Any]) -> str:
+    """Return a fixed event's ISO start time."""
+    return event.get("startTime") or event.get("start") or ""
+
+
+def event_end(event: Dict[str, Any]) -> str:
+    """Return a fixed event's ISO end time."""
+    return event.get("endTime") or event.get("end") or ""
+
+
+def is_recurring(event: Dict[str, Any]) -> bool:
+    return bool(event.get("recurrence") or event.get("recurring"))
+
+
+def event_last_end(event: Dict[str, Any]) -> str:
+    """Return the latest time any occurrence of a fixed event can end.
+
+    A one-off event ends at its end. A recurring event's occurrences run
+    until the day after its ``until`` date (an occurrence on that day may
+    run past midnight), or indefinitely without one.
+    """
+    if not is_recurring(event):
+        return event_end(event)
+    spec = event.get("recurrence")
+    until = spec.get("until") if isinstance(spec, dict) else None
+    if not until:
+        return OPEN_ENDED
+    try:
+        last = (date.fromisoformat(str(until)[:10]) + timedelta(days=2)).isoformat() + "T00:00:00"
+    except ValueError:
+        return OPEN_ENDED
+    return max(last, event_end(event))
+
+
+def latest_tasks(task_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep the latest version of each task, keyed by id or title."""
+    latest: Dict[Any, Dict[str, Any]] = {}
+    for task in task_items:
+        latest[task.get("id") or task.get("title")] = task
+    return list(latest.values())
+
@@ -1,9 +1,25 @@
 """Enhanced local memory store with feedback tracking."""
+import bisect
+import copy
+import heapq
 import json
-from datetime import datetime
-from typing import List, Any, Dict, Optional
+import os
+import threading
+import time
+import uuid
+from typing import List, Any, Dict, Optional, Set, Tuple
 
-from feedback import TaskFeedback, FeedbackStore
+from feedback import TaskFeedback, FeedbackStore, feedback_from_record, feedback_to_record
+from timespan import parse_minutes, to_iso
+from .bm25 import BM25Index, item_text
+from .filelock import FileLock, GenerationCounter
+from .items import event_end, event_last_end, event_start, is_recurring, item_type, latest_tasks
+from .retention import RetentionPolicy, compaction_report, expired_entries
+from .snapshot import BinarySnapshot, build_snapshot, encode_entries, is_binary
+from .writer import DurabilityPolicy, GroupCommitWriter
+
+# Slots in the generation counter sidecar
+_SNAPSHOT, _FEEDBACK = 0, 1
 
 
 class LocalMemory:
@@ -11,91 +27,161 @@ class LocalMemory:
 
     Features:
     - persist(user_id, item, tags=None)
-    - retrieve(user_id, query, limit): returns recent and keyword-matched items
+    - persist_batch(entries) / add_feedback_batch(pairs): bulk writes that
+      commit once, e.g. for imports
+    - retrieve(user_id, query, limit): returns recent items, or BM25-ranked
+      keyword matches from a per-user inverted index built at persist time
+    - entries(user_id): returns a user's raw entries from their partition
+    - tasks / fixed_events / latest_preferences(user_id): typed lookups
+      served from per-type indexes instead of scanning untyped items
     - add_feedback(user_id, feedback): stores task completion feedback
     - get_scheduling_insights(user_id): returns learned scheduling preferences
+    - compact(policy): folds the journal into the snapshot file, optionally
+      applying a RetentionPolicy, and reports entries and bytes reclaimed
+    - flush() / close(): commit pending group-commit writes
+
+    With ``journal=True`` each persist appends one compact JSON line to
+    ``*_journal.jsonl`` instead of rewriting the snapshot, so write cost does
+    not grow with history. The journal is folded into the snapshot every
+    ``compact_threshold`` records. Startup always replays snapshot + journal.
+
+    With ``lazy_feedback=True`` (the default) the feedback file is not parsed
+    at construction. It is read on the first feedback access, and a user's
+    ``FeedbackStore`` (datetime parsing plus ``TaskFeedback`` validation) is
+    only built when that user's feedback is used.
+
+    Writes are safe across processes (e.g. several gunicorn workers). Every
+    commit runs under an advisory lock on ``<path>.lock`` and bumps a write
+    generation in ``<path>.gen``. Before writing, it picks up anything other
+    processes committed since the generation it last saw, so no update is
+    lost. Snapshots are written to a temp file and
+    renamed into place. With ``write_window_ms > 0``, writes arriving within
+    the window are coalesced into one commit on a background thread and
+    ``persist`` returns without waiting for the disk. ``durability`` picks
+    when commits are fsynced: "always", "interval" (at most every
+    ``fsync_interval_ms``) or "never".
+
+    A ``retention`` policy is applied on every automatic journal compaction,
+    so a long-running journaled store stays bounded without manual passes.
+
+    ``snapshot_format="binary"`` (the default for ``*.bin`` paths) writes the
+    snapshot in the compact, memory-mapped format from ``memory.snapshot``.
+    Either format is recognised when reading. A binary snapshot is opened
+    without decoding any entries. Each user's partition is decoded on first
+    access, and users never touched are copied into the next snapshot as raw
+    bytes.
     """
 
-    def __init__(self, path: str, feedback_path: Optional[str] = None):
+    def __init__(self, path: str, feedback_path: Optional[str] = None,
+                 journal: bool = False, compact_threshold: int = 1000,
+                 lazy_feedback: bool = True, write_window_ms: float = 0,
+                 durability: str = "never", fsync_interval_ms: float = 1000,
+                 retention: Optional[RetentionPolicy] = None,
+                 snapshot_format: Optional[str] = None):
+        base = os.path.splitext(path)[0]
         self.path = path
-        self.feedback_path = feedback_path or path.replace(".json", "_feedback.json")
-        
-        # Initialize main memory store
-        try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                self.store = json.load(f)
-        except Exception:
-            self.store = {"memories": [], "user_feedback": {}}
-            
-        # Initialize feedback stores per user
+        self.feedback_path = feedback_path or base + "_feedback.json"
+        self.journal_path = base + "_journal.jsonl"
+        self.snapshot_format = snapshot_format or ("binary" if path.endswith(".bin") else "json")
+        if self.snapshot_format not in ("json", "binary"):
+            raise ValueError(f"Unknown snapshot format: {self.snapshot_format}")
+        self.journal = journal
+        self.compact_threshold = compact_threshold
+        self.retention = retention
+        self._journal_offset = 0
+        self._journal_records = 0
+        # Snapshot and feedback write generations this instance last saw
+        self._store_generation = 0
+        # Open binary snapshot and the users in it not yet decoded
+        self._snapshot: Optional[BinarySnapshot] = None
+        self._unloaded: Set[str] = set()
+
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(path + ".lock")
+        self._generations = GenerationCounter(path + ".gen", 2)
+        self._durability = DurabilityPolicy(durability, fsync_interval_ms)
+        self._writer = GroupCommitWriter(self._commit, write_window_ms)
+
+        # Initialize main memory store, then replay writes appended since the
+        # last snapshot
+        with self._file_lock:
+            self._load_store()
+            if journal and "journal_id" not in self.store:
+                # The snapshot must name the journal before records land in it
+                self._write_snapshot()
+
+        # Feedback stores per user, materialized on first access
         self.feedback_stores: Dict[str, FeedbackStore] = {}
-        
-        # Load existing feedback if any
-        try:
-            with open(self.feedback_path, "r", encoding="utf-8") as f:
-                feedback_data = json.load(f)
-                for user_id, user_feedback in feedback_data.items():
-                    store = FeedbackStore()
-                    for task_id, feedback in user_feedback.items():
-                        # Convert stored dict back to TaskFeedback
-                        feedback["scheduled_start"] = datetime.fromisoformat(feedback["scheduled_start"])
-                        feedback["scheduled_end"] = datetime.fromisoformat(feedback["scheduled_end"])
-                        if feedback.get("actual_start"):
-                            feedback["actual_start"] = datetime.fromisoformat(feedback["actual_start"])
-                        if feedback.get("actual_end"):
-                            feedback["actual_end"] = datetime.fromisoformat(feedback["actual_end"])
-                        store.add_task_feedback(TaskFeedback(**feedback))
-                    self.feedback_stores[user_id] = store
-        except Exception:
-            pass
+        self.lazy_feedback = lazy_feedback
+        # Byte range of each user's records in the feedback file; None until
+        # the file is indexed
+        self._feedback_index: Optional[Dict[str, Tuple[int, int]]] = None
+        # Raw per-user records decoded so far (None if undecodable)
+        self._feedback_raw: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._feedback_generation = 0
+        # Records added here but not yet committed: user -> task_id -> record
+        self._feedback_dirty: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if not lazy_feedback:
+            for user_id in self._feedback_users():
+                self._feedback_store(user_id)
 
     def persist(self, user_id: str, item: Any, tags: list | None = None) -> None:
         """Persist an item to memory with optional tags."""
-        entry = {"user_id": user_id, "item": item}
+        entry = {"user_id": user_id, "item": item, "ts": int(time.time())}
         if tags:
             entry["tags"] = tags
-        self.store.setdefault("memories", []).append(entry)
-        self._save_store()
+        with self._lock:
+            self._index_entry(entry)
+            self._writer.submit(("memory", entry))
+
+    def persist_batch(self, entries: List[Dict[str, Any]]) -> None:
+        """Persist raw entries ("user_id", "item", optional "tags"/"ts") in one commit."""
+        entries = [dict(entry, ts=entry.get("ts", int(time.time()))) for entry in entries]
+        with self._lock:
+            for entry in entries:
+                self._index_entry(entry)
+            self._writer.submit_many([("memory", entry) for entry in entries])
 
     def retrieve(self, user_id: str, query: str = "", limit: int = 5) -> List[Any]:
         """Retrieve relevant items from memory."""
         # Get base candidates
-        candidates = [m for m in self.store.get("memories", []) if m.get("user_id") == user_id]
+        self._materialize(user_id)
+        candidates = self._by_user.get(user_id, [])
         if not query:
-            return [c["item"] for c in candidates][-limit:]
-
-        # Score by query relevance
-        qtokens = set(query.lower().split())
-        scored = []
-        for c in candidates:
-            text = str(c.get("item", "")).lower()
-            score = sum(1 for t in qtokens if t in text)
-            scored.append((score, c))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        results = [c[1]["item"] for c in scored if c[0] > 0]
-        
+            return [c["item"] for c in candidates[-limit:]]
+
+        # Score by query relevance against the user's inverted index
+        index = self._text_index.get(user_id)
+        results = [candidates[doc_id]["item"] for doc_id in index.search(query, limit)] if index else []
+
         # Fallback to recent items
         if not results:
-            results = [c["item"] for c in candidates][-limit:]
+            results = [c["item"] for c in candidates[-limit:]]
 
         return results[:limit]
 
     def add_feedback(self, user_id: str, feedback: TaskFeedback) -> None:
         """Add task completion feedback for a user."""
-        if user_id not in self.feedback_stores:
-            self.feedback_stores[user_id] = FeedbackStore()
-            
-        store = self.feedback_stores[user_id]
-        store.add_task_feedback(feedback)
-        self._save_feedback()
+        with self._lock:
+            store = self._feedback_store(user_id, create=True)
+            store.add_task_feedback(feedback)
+            self._feedback_dirty.setdefault(user_id, {})[feedback.task_id] = feedback_to_record(feedback)
+            self._writer.submit(("feedback", user_id))
+
+    def add_feedback_batch(self, feedback: List[Tuple[str, TaskFeedback]]) -> None:
+        """Add (user_id, feedback) pairs, saving the feedback file once."""
+        with self._lock:
+            for user_id, item in feedback:
+                self._feedback_store(user_id, create=True).add_task_feedback(item)
+                self._feedback_dirty.setdefault(user_id, {})[item.task_id] = feedback_to_record(item)
+            self._writer.submit_many([("feedback", user_id) for user_id in dict(feedback)])
 
     def get_scheduling_insights(self, user_id: str) -> Dict[str, Any]:
         """Get learned scheduling preferences and insights for a user."""
-        if user_id not in self.feedback_stores:
+        store = self._feedback_store(user_id)
+        if store is None:
             return {"recommendations": [], "time_slots": {}}
             
-        store = self.feedback_stores[user_id]
         return {
             "recommendations": store.generate_scheduling_recommendations(),
             "time_slots": {
@@ -105,30 +191,497 @@ class LocalMemory:
 
     def adjust_schedule_weights(self, user_id: str, schedule: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Apply learned weights to a proposed schedule."""
-        if user_id not in self.feedback_stores:
+        store = self._feedback_store(user_id)
+        if store is None:
             return schedule
             
-        return self.feedback_stores[user_id].update_schedule_weights(schedule)
+        return store.update_schedule_weights(schedule)
+
+    def users(self) -> List[str]:
+        """Return the ids of all users with stored memories."""
+        return list(self._by_user) + [u for u in self._unloaded if u not in self._by_user]
+
+    def entries(self, user_id: str) -> List[Dict[str, Any]]:
+        """Return a user's raw memory entries in insertion order."""
+        self._materialize(user_id)
+        return list(self._by_user.get(user_id, []))
+
+    def tasks(self, user_id: str) -> List[Dict[str, Any]]:
+        """Return the user's tasks, latest version of each."""
+        return latest_tasks(self._typed(user_id, "task"))
+
+    def fixed_events(self, user_id: str, start: Optional[str] = None,
+                     end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return fixed events overlapping [start, end), ordered by start.
+
+        A recurring event is returned while any occurrence may still overlap.
+        """
+        self._materialize(user_id)
+        recurring = [
+            event for event in self._recurring.get(user_id, [])
+            if (end is None or event[0] < end) and (start is None or event_last_end(event[2]) > start)
+        ]
+        events = self._events.get(user_id, [])
+        # Events starting at or after `end` cannot overlap the window
+        hi = bisect.bisect_left(events, (end,)) if end is not None else len(events)
+        lo = 0
+        if start is not None:
+            # Nor can events starting more than the longest event before it
+            longest = self._longest_event.get(user_id, 0)
+            try:
+                lo = bisect.bisect_left(events, (to_iso(parse_minutes(start) - longest),), 0, hi)
+            except (TypeError, ValueError, OverflowError):
+                lo = 0
+        one_off = (event for event in events[lo:hi] if start is None or event_end(event[2]) > start)
+        return [copy.deepcopy(item) for _, _, item in heapq.merge(one_off, recurring)]
+
+    def latest_preferences(self, user_id: str) -> Dict[str, Any]:
+        """Return the most recent preferences record, or {}."""
+        self._materialize(user_id)
+        prefs = self._by_type.get(user_id, {}).get("preferences")
+        return copy.deepcopy(prefs[-1]) if prefs else {}
+
+    def _typed(self, user_id: str, type_name: str) -> List[Dict[str, Any]]:
+        """Return copies of a user's items of one type in insertion order."""
+        self._materialize(user_id)
+        return copy.deepcopy(self._by_type.get(user_id, {}).get(type_name, []))
+
+    def compact(self, policy: Optional[RetentionPolicy] = None) -> Dict[str, int]:
+        """Fold the journal into a fresh snapshot and truncate the journal.
+
+        With a retention policy, expired entries are dropped first. Returns
+        the entries and bytes reclaimed.
+        """
+        self.flush()
+        with self._lock, self._file_lock:
+            self._sync_from_disk([])
+            bytes_before = self._disk_size()
+            entries_before = self._entry_count()
+            if policy is not None:
+                self._apply_retention(policy)
+            self._write_snapshot()
+            return compaction_report(
+                entries_before,
+                self._entry_count(),
+                bytes_before,
+                self._disk_size()
+            )
+
+    def flush(self) -> None:
+        """Commit any writes still waiting in the group-commit window."""
+        self._writer.flush()
+
+    def close(self) -> None:
+        """Commit pending writes and stop the background writer."""
+        self._writer.close()
+
+    def _commit(self, batch: List[Tuple[str, Any]]) -> None:
+        """Write one group of memory and feedback records under the file lock."""
+        entries = [record for kind, record in batch if kind == "memory"]
+        with self._lock, self._file_lock:
+            if entries:
+                self._sync_from_disk(entries)
+                if self.journal:
+                    self._append_journal(entries)
+                else:
+                    self._write_snapshot()
+            if any(kind == "feedback" for kind, _ in batch):
+                self._save_feedback()
+
+    def _sync_from_disk(self, batch: List[Dict[str, Any]]) -> None:
+        """Pick up commits made by other processes since we last looked.
+
+        `batch` (being committed) and any still-queued entries are already
+        indexed in memory; they are re-applied if the store is reloaded.
+        """
+        if (self._generations.read()[_SNAPSHOT] == self._store_generation
+                and (not self.journal or self._catch_up_journal())):
+            return
+        pending = [record for kind, record in self._writer.pending() if kind == "memory"]
+        self._load_store()
+        for entry in batch + pending:
+            self._index_entry(entry)
+
+    def _load_store(self) -> None:
+        """(Re)build the store and its indexes from snapshot + journal."""
+        self._store_generation = self._generations.read()[_SNAPSHOT]
+        self._close_snapshot()
+        if is_binary(self.path):
+            # Only the header and per-user offsets are read here
+            self._snapshot = BinarySnapshot(self.path)
+            self.store = dict(self._snapshot.header)
+            self._reset_indexes([])
+            self._unloaded = set(self._snapshot.users())
+        else:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.store = json.load(f)
+            except Exception:
+                self.store = {"memories": [], "user_feedback": {}}
+            self._reset_indexes(self.store.pop("memories", []))
+
+        self._journal_offset = 0
+        self._journal_records = 0
+        self._catch_up_journal()
+
+    def _reset_indexes(self, entries: List[Dict[str, Any]]) -> None:
+        """Rebuild the partitions and indexes from a list of entries."""
+        # Memories are kept partitioned by user (in insertion order) so
+        # per-user reads never scan other users' entries
+        self._by_user: Dict[str, List[Dict[str, Any]]] = {}
+        self._text_index: Dict[str, BM25Index] = {}
+        self._by_type: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        # Per-user one-off fixed events sorted by start: (startTime, seq, item)
+        self._events: Dict[str, List[Tuple[str, int, Dict[str, Any]]]] = {}
+        # Per-user recurring fixed events, kept apart since their first
+        # occurrence says nothing about when they stop
+        self._recurring: Dict[str, List[Tuple[str, int, Dict[str, Any]]]] = {}
+        # Per-user longest fixed event in minutes, bounding range lookups
+        self._longest_event: Dict[str, float] = {}
+        for entry in entries:
+            self._index_entry(entry)
 
-    def _save_store(self) -> None:
-        """Save the main memory store."""
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(self.store, f, indent=2)
+    def _materialize(self, user_id: str) -> None:
+        """Decode a user's entries from the binary snapshot on first access."""
+        if user_id in self._unloaded:
+            self._unloaded.discard(user_id)
+            for entry in self._snapshot.entries(user_id):
+                self._index_entry(entry)
+
+    def _materialize_all(self) -> None:
+        for user_id in list(self._unloaded):
+            self._materialize(user_id)
+
+    def _close_snapshot(self) -> None:
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+        self._unloaded = set()
+
+    def _entry_count(self) -> int:
+        """Number of entries, including those not yet decoded."""
+        count = sum(len(entries) for entries in self._by_user.values())
+        return count + sum(self._snapshot.count(u) for u in self._unloaded)
+
+    def _apply_retention(self, policy: RetentionPolicy) -> None:
+        """Drop entries the policy expires and rebuild the indexes."""
+        self._materialize_all()
+        now = time.time()
+        kept = []
+        for entries in self._by_user.values():
+            drop = expired_entries(entries, policy, now)
+            kept.extend(e for i, e in enumerate(entries) if i not in drop)
+        self._reset_indexes(kept)
+
+    def _disk_size(self) -> int:
+        """Total bytes of the snapshot and journal files."""
+        size = 0
+        for path in (self.path, self.journal_path):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _catch_up_journal(self) -> bool:
+        """Apply journal records past our offset.
+
+        Returns False if the journal belongs to another snapshot (it was
+        folded in by a compaction), in which case nothing is applied.
+        """
+        try:
+            f = open(self.journal_path, "r+b")
+        except OSError:
+            self._journal_offset = 0
+            return True
+        with f:
+            header_line = f.readline()
+            try:
+                header = json.loads(header_line)
+            except json.JSONDecodeError:
+                header = {}
+            if header.get("journal_id") != self.store.get("journal_id"):
+                return False
+            offset = max(self._journal_offset, len(header_line))
+            f.seek(offset)
+            data = f.read()
+            lines = data.split(b"\n")
+            for line in lines[:-1]:
+                try:
+                    self._index_entry(json.loads(line))
+                except json.JSONDecodeError:
+                    # A corrupt record; skip it rather than lose the rest
+                    pass
+                else:
+                    self._journal_records += 1
+                offset += len(line) + 1
+            if lines[-1]:
+                # A torn final line from an interrupted append; drop it
+                f.truncate(offset)
+            self._journal_offset = offset
+        return True
+
+    def _index_entry(self, entry: Dict[str, Any]) -> None:
+        """Add an entry to its user's partition and keyword index."""
+        user_id = entry.get("user_id")
+        # Keep snapshot entries ahead of newer ones in the partition
+        self._materialize(user_id)
+        self._by_user.setdefault(user_id, []).append(entry)
+        index = self._text_index.get(user_id)
+        if index is None:
+            index = self._text_index[user_id] = BM25Index()
+        index.add(item_text([entry.get("item", ""), entry.get("tags", [])]))
+
+        item = entry.get("item")
+        type_name = item_type(item)
+        if type_name:
+            self._by_type.setdefault(user_id, {}).setdefault(type_name, []).append(item)
+        if type_name == "fixedEvent" and is_recurring(item):
+            bisect.insort(self._recurring.setdefault(user_id, []), (event_start(item), len(index), item))
+        elif type_name == "fixedEvent":
+            bisect.insort(self._events.setdefault(user_id, []), (event_start(item), len(index), item))
+            try:
+                # One minute of slack covers seconds lost to rounding
+                minutes = parse_minutes(event_end(item)) - parse_minutes(event_start(item)) + 1
+            except (TypeError, ValueError):
+                # Unparseable times disable the start bound for this user
+                minutes = float("inf")
+            if minutes > self._longest_event.get(user_id, 0):
+                self._longest_event[user_id] = minutes
+
+    def _append_journal(self, entries: List[Dict[str, Any]]) -> None:
+        """Append compact records to the journal in a single write."""
+        if self._journal_offset == 0:
+            # No journal for the current snapshot yet (or only a stale one)
+            self._write_journal_header()
+        data = "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in entries).encode("utf-8")
+        with open(self.journal_path, "r+b") as f:
+            # Write from the end of the last whole record, so a torn tail
+            # left by an interrupted append is overwritten, not extended
+            f.seek(self._journal_offset)
+            f.truncate()
+            f.write(data)
+            f.flush()
+            self._durability.sync(f.fileno())
+            self._journal_offset = f.tell()
+        self._journal_records += len(entries)
+        if self._journal_records >= self.compact_threshold:
+            if self.retention is not None:
+                self._apply_retention(self.retention)
+            self._write_snapshot()
+
+    def _write_journal_header(self) -> None:
+        """Start an empty journal that belongs to the current snapshot."""
+        header = (json.dumps({"journal_id": self.store["journal_id"]}) + "\n").encode("utf-8")
+        self._write_atomic(self.journal_path, header)
+        self._journal_offset = len(header)
+
+    def _write_snapshot(self) -> None:
+        """Save the main memory store and drop any journal it supersedes."""
+        if self.journal:
+            # Rotating the id marks the current journal as folded in, so a
+            # crash before it is replaced cannot replay it twice
+            self.store["journal_id"] = uuid.uuid4().hex
+        else:
+            self.store.pop("journal_id", None)
+        # Entries still queued for a group commit will be written by it
+        queued = {id(record) for kind, record in self._writer.pending() if kind == "memory"}
+        if self.snapshot_format == "binary":
+            # Users never decoded are copied over as raw bytes
+            segments = [(u, self._snapshot.count(u), self._snapshot.raw(u)) for u in self._unloaded]
+            for user_id, entries in self._by_user.items():
+                entries = [entry for entry in entries if id(entry) not in queued]
+                segments.append((user_id, len(entries), encode_entries(entries)))
+            data = build_snapshot(self.store, segments)
+        else:
+            self._materialize_all()
+            memories = [
+                entry for entries in self._by_user.values() for entry in entries
+                if id(entry) not in queued
+            ]
+            data = json.dumps({**self.store, "memories": memories}, indent=2).encode("utf-8")
+        # The old mapping must be released before the file is replaced
+        unloaded = self._unloaded
+        self._close_snapshot()
+        self._write_atomic(self.path, data)
+        if unloaded:
+            self._snapshot = BinarySnapshot(self.path)
+            self._unloaded = unloaded
+        self._store_generation = self._generations.bump(_SNAPSHOT)
+        self._journal_records = 0
+        if self.journal:
+            self._write_journal_header()
+        else:
+            self._journal_offset = 0
+            try:
+                os.remove(self.journal_path)
+            except OSError:
+                pass
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        """Replace a file via temp file + rename."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            self._durability.sync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _feedback_users(self) -> List[str]:
+        """Ids of every user with feedback on disk or in memory."""
+        if self._feedback_index is None:
+            self._read_feedback_file()
+        users = dict.fromkeys(self._feedback_index)
+        users.update(dict.fromkeys(self._feedback_raw))
+        users.update(dict.fromkeys(self.feedback_stores))
+        return list(users)
+
+    def _read_feedback_file(self) -> None:
+        """Index each user's byte range in the feedback file without decoding it.
+
+        Files not written one user per line (older or hand-edited ones) are
+        decoded whole instead.
+        """
+        self._feedback_generation = self._generations.read()[_FEEDBACK]
+        self._feedback_index = {}
+        self._feedback_raw = {}
+        try:
+            with open(self.feedback_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        index = _index_feedback_lines(data)
+        if index is not None:
+            self._feedback_index = index
+            return
+        try:
+            feedback_data = json.loads(data)
+        except ValueError:
+            return
+        if isinstance(feedback_data, dict):
+            self._feedback_raw = feedback_data
+
+    def _check_feedback_file(self) -> None:
+        """Index the feedback file on first use, or again after a foreign write."""
+        if self._feedback_index is None:
+            self._read_feedback_file()
+        elif self._generations.read()[_FEEDBACK] != self._feedback_generation:
+            # Another process wrote feedback: merge our uncommitted records
+            # into theirs and rebuild the affected stores lazily
+            self._read_feedback_file()
+            self.feedback_stores = {}
+            for user_id, records in self._feedback_dirty.items():
+                merged = dict(self._feedback_records(user_id) or {})
+                merged.update(records)
+                self._feedback_raw[user_id] = merged
+
+    def _feedback_records(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return a user's raw records, decoding only their slice of the file."""
+        self._check_feedback_file()
+        if user_id in self._feedback_raw:
+            return self._feedback_raw[user_id]
+        span = self._feedback_index.get(user_id)
+        if span is None:
+            return None
+        with open(self.feedback_path, "rb") as f:
+            f.seek(span[0])
+            chunk = f.read(span[1] - span[0])
+        try:
+            records = json.loads(chunk)
+        except ValueError:
+            records = None
+        self._feedback_raw[user_id] = records
+        return records
+
+    def _feedback_store(self, user_id: str, create: bool = False) -> Optional[FeedbackStore]:
+        """Return a user's feedback store, materializing it on first access."""
+        store = self.feedback_stores.get(user_id)
+        if store is not None:
+            return store
+        records = self._feedback_records(user_id)
+        if records is None and not create:
+            return None
+        store = FeedbackStore()
+        for record in (records or {}).values():
+            try:
+                store.add_task_feedback(feedback_from_record(record))
+            except Exception:
+                # Unreadable records stay in the raw data and are saved as read
+                pass
+        self.feedback_stores[user_id] = store
+        return store
 
     def _save_feedback(self) -> None:
-        """Save feedback data for all users."""
-        feedback_data = {}
-        for user_id, store in self.feedback_stores.items():
-            feedback_data[user_id] = {
-                task_id: {
-                    **feedback.dict(),
-                    "scheduled_start": feedback.scheduled_start.isoformat(),
-                    "scheduled_end": feedback.scheduled_end.isoformat(),
-                    "actual_start": feedback.actual_start.isoformat() if feedback.actual_start else None,
-                    "actual_end": feedback.actual_end.isoformat() if feedback.actual_end else None
-                }
-                for task_id, feedback in store.task_feedback.items()
-            }
-            
-        with open(self.feedback_path, "w", encoding="utf-8") as f:
-            json.dump(feedback_data, f, indent=2)
+        """Save feedback data for all users, one user per line."""
+        self._check_feedback_file()
+        self._feedback_dirty = {}
+
+        try:
+            with open(self.feedback_path, "rb") as f:
+                old = f.read()
+        except OSError:
+            old = b""
+        lines = []
+        for user_id in self._feedback_users():
+            records = self._feedback_raw.get(user_id)
+            store = self.feedback_stores.get(user_id)
+            if store is not None:
+                records = dict(records or {})
+                records.update(
+                    (task_id, feedback_to_record(feedback))
+                    for task_id, feedback in store.task_feedback.items()
+                )
+            if records is not None:
+                value = json.dumps(records, separators=(",", ":")).encode("utf-8")
+            elif user_id in self._feedback_index:
+                # Users never accessed are written back exactly as they were read
+                start, end = self._feedback_index[user_id]
+                value = old[start:end]
+            else:
+                continue
+            lines.append((user_id, value))
+
+        index = {}
+        parts = [b"{\n"]
+        offset = 2
+        for i, (user_id, value) in enumerate(lines):
+            key = json.dumps(user_id).encode("utf-8") + b": "
+            index[user_id] = (offset + len(key), offset + len(key) + len(value))
+            line = key + value + (b",\n" if i < len(lines) - 1 else b"\n")
+            parts.append(line)
+            offset += len(line)
+        parts.append(b"}\n")
+        self._write_atomic(self.feedback_path, b"".join(parts))
+        self._feedback_generation = self._generations.bump(_FEEDBACK)
+        self._feedback_index = index
+
+
+def _index_feedback_lines(data: bytes) -> Optional[Dict[str, Tuple[int, int]]]:
+    """Map users to the byte ranges of their records in a feedback file.
+
+    Returns None unless the file has the layout _save_feedback writes: "{",
+    one `"user": {...}` line per user, then "}".
+    """
+    if data.strip() == b"{}":
+        return {}
+    lines = data.split(b"\n")
+    if lines[0] != b"{" or lines[-1] != b"" or lines[-2] != b"}":
+        return None
+    decoder = json.JSONDecoder()
+    index = {}
+    offset = len(lines[0]) + 1
+    for i, line in enumerate(lines[1:-2]):
+        last = i == len(lines) - 4
+        try:
+            user_id, key_end = decoder.raw_decode(line.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            return None
+        # raw_decode counts characters; re-encode the key for its byte length
+        key_bytes = len(line.decode("utf-8")[:key_end].encode("utf-8"))
+        end = len(line) if last else len(line) - 1
+        if not isinstance(user_id, str) or line[key_bytes:key_bytes + 2] != b": " \
+                or (not last and line[-1:] != b","):
+            return None
+        index[user_id] = (offset + key_bytes + 2, offset + end)
+        offset += len(line) + 1
+    return index
@@ -0,0 +1,84 @@
+"""Retention policies that bound how much history a memory store keeps."""
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from .items import item_type
+
+
+@dataclass
+class RetentionPolicy:
+    """Per-type retention rules applied when a store is compacted.
+
+    - Older versions of a task (same id or title) are superseded by the latest.
+    - Tasks whose latest version is completed are dropped once older than
+      `completed_task_ttl_days` (by `completedAt`, else the write time).
+    - Only the latest preferences record is kept.
+    - Free-text notes are capped at the `max_notes_per_user` most recent.
+
+    Entries without any timestamp are never expired by age.
+    """
+    completed_task_ttl_days: Optional[float] = 30
+    drop_superseded_tasks: bool = True
+    keep_latest_preferences: bool = True
+    max_notes_per_user: Optional[int] = 200
+
+
+def _completed_at(entry: Dict[str, Any]) -> Optional[float]:
+    """Return when a task was completed, as epoch seconds, if known."""
+    completed_at = entry["item"].get("completedAt")
+    if completed_at:
+        try:
+            return datetime.fromisoformat(completed_at).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return entry.get("ts")
+
+
+def expired_entries(entries: List[Dict[str, Any]], policy: RetentionPolicy,
+                    now: Optional[float] = None) -> Set[int]:
+    """Return positions of one user's entries that the policy drops."""
+    now = time.time() if now is None else now
+    drop: Set[int] = set()
+    tasks: Dict[Any, List[int]] = {}
+    preferences: List[int] = []
+    notes: List[int] = []
+
+    for i, entry in enumerate(entries):
+        item = entry.get("item")
+        type_name = item_type(item)
+        if type_name == "task":
+            tasks.setdefault(item.get("id") or item.get("title"), []).append(i)
+        elif type_name == "preferences":
+            preferences.append(i)
+        elif type_name == "note":
+            notes.append(i)
+
+    for versions in tasks.values():
+        latest = entries[versions[-1]]
+        if policy.drop_superseded_tasks:
+            drop.update(versions[:-1])
+        if policy.completed_task_ttl_days is not None and latest["item"].get("completed"):
+            completed_at = _completed_at(latest)
+            if completed_at is not None and now - completed_at > policy.completed_task_ttl_days * 86400:
+                drop.update(versions)
+
+    if policy.keep_latest_preferences:
+        drop.update(preferences[:-1])
+    if policy.max_notes_per_user is not None:
+        drop.update(notes[:max(len(notes) - policy.max_notes_per_user, 0)])
+    return drop
+
+
+def compaction_report(entries_before: int, entries_after: int,
+                      bytes_before: int, bytes_after: int) -> Dict[str, int]:
+    """Summarize what a compaction pass reclaimed."""
+    return {
+        "entries_before": entries_before,
+        "entries_after": entries_after,
+        "entries_reclaimed": entries_before - entries_after,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_reclaimed": bytes_before - bytes_after
+    }
@@ -0,0 +1,169 @@
+"""User-sharded memory store: one LocalMemory per hash bucket, opened on demand."""
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import List, Any, Dict, Optional, Tuple
+
+from feedback import TaskFeedback, feedback_from_record
+from .local_memory import LocalMemory
+from .retention import RetentionPolicy, compaction_report
+
+
+class ShardedMemory:
+    """Memory store split into per-bucket shard files under `root`.
+
+    Users are assigned to one of `buckets` shards by a stable hash of their
+    id. Each shard is a `LocalMemory` (own snapshot, journal, feedback file
+    and lock), opened on first access and kept in an LRU of at most
+    `max_open_shards`. Idle shards are flushed and dropped. Resident memory
+    and per-request I/O therefore depend on the active users' shards, not on
+    the whole tenant base. Extra keyword arguments are passed to every shard.
+    """
+
+    def __init__(self, root: str, buckets: int = 64, max_open_shards: int = 16, **shard_options: Any):
+        if buckets < 1 or max_open_shards < 1:
+            raise ValueError("buckets and max_open_shards must be positive")
+        self.root = root
+        self.buckets = buckets
+        self.max_open_shards = max_open_shards
+        self.shard_options = shard_options
+        self._shards: "OrderedDict[int, LocalMemory]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def bucket(self, user_id: str) -> int:
+        """Return the shard bucket for a user (stable across processes)."""
+        return zlib.crc32(user_id.encode("utf-8")) % self.buckets
+
+    def shard_path(self, bucket: int) -> str:
+        ext = "bin" if self.shard_options.get("snapshot_format") == "binary" else "json"
+        return os.path.join(self.root, f"shard_{bucket:04d}.{ext}")
+
+    def persist(self, user_id: str, item: Any, tags: list | None = None) -> None:
+        """Persist an item to memory with optional tags."""
+        self._shard(user_id).persist(user_id, item, tags)
+
+    def retrieve(self, user_id: str, query: str = "", limit: int = 5) -> List[Any]:
+        """Retrieve relevant items from memory."""
+        return self._shard(user_id).retrieve(user_id, query, limit)
+
+    def users(self) -> List[str]:
+        """Return the ids of all users with stored memories, shard by shard."""
+        users = []
+        open_buckets = set(self.open_shards())
+        for bucket in range(self.buckets):
+            # An open shard may hold writes not yet on disk
+            if bucket in open_buckets or os.path.exists(self.shard_path(bucket)):
+                users.extend(self._shard_at(bucket).users())
+        return users
+
+    def entries(self, user_id: str) -> List[Dict[str, Any]]:
+        """Return a user's raw memory entries in insertion order."""
+        return self._shard(user_id).entries(user_id)
+
+    def tasks(self, user_id: str) -> List[Dict[str, Any]]:
+        """Return the user's tasks, latest version of each."""
+        return self._shard(user_id).tasks(user_id)
+
+    def fixed_events(self, user_id: str, start: Optional[str] = None,
+                     end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return fixed events overlapping [start, end), ordered by start."""
+        return self._shard(user_id).fixed_events(user_id, start, end)
+
+    def latest_preferences(self, user_id: str) -> Dict[str, Any]:
+        """Return the most recent preferences record, or {}."""
+        return self._shard(user_id).latest_preferences(user_id)
+
+    def add_feedback(self, user_id: str, feedback: TaskFeedback) -> None:
+        """Add task completion feedback for a user."""
+        self._shard(user_id).add_feedback(user_id, feedback)
+
+    def get_scheduling_insights(self, user_id: str) -> Dict[str, Any]:
+        """Get learned scheduling preferences and insights for a user."""
+        return self._shard(user_id).get_scheduling_insights(user_id)
+
+    def adjust_schedule_weights(self, user_id: str, schedule: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply learned weights to a proposed schedule."""
+        return self._shard(user_id).adjust_schedule_weights(user_id, schedule)
+
+    def open_shards(self) -> List[int]:
+        """Return the buckets currently held open, least recently used first."""
+        with self._lock:
+            return list(self._shards)
+
+    def flush(self) -> None:
+        """Commit pending writes on every open shard."""
+        for shard in self._open():
+            shard.flush()
+
+    def compact(self, policy: Optional[RetentionPolicy] = None) -> Dict[str, int]:
+        """Compact every shard on disk and report the combined reclaim."""
+        totals = compaction_report(0, 0, 0, 0)
+        for bucket in range(self.buckets):
+            if not os.path.exists(self.shard_path(bucket)):
+                continue
+            report = self._shard_at(bucket).compact(policy)
+            for key in totals:
+                totals[key] += report[key]
+        return totals
+
+    def close(self) -> None:
+        """Flush and release every open shard."""
+        with self._lock:
+            shards = list(self._shards.values())
+            self._shards.clear()
+        for shard in shards:
+            shard.close()
+
+    def import_memory(self, source: LocalMemory) -> None:
+        """Copy every user's memories and feedback from a single-file store.
+
+        Entries are grouped by shard first, so each shard is written once
+        rather than once per entry.
+        """
+        entries: Dict[int, List[Dict[str, Any]]] = {}
+        for user_id in source.users():
+            entries.setdefault(self.bucket(user_id), []).extend(source.entries(user_id))
+        try:
+            with open(source.feedback_path, "r", encoding="utf-8") as f:
+                feedback_data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            feedback_data = {}
+        feedback: Dict[int, List[Tuple[str, TaskFeedback]]] = {}
+        for user_id, records in feedback_data.items():
+            feedback.setdefault(self.bucket(user_id), []).extend(
+                (user_id, feedback_from_record(record)) for record in records.values()
+            )
+        for bucket in sorted(entries.keys() | feedback.keys()):
+            shard = self._shard_at(bucket)
+            shard.persist_batch(entries.get(bucket, []))
+            shard.add_feedback_batch(feedback.get(bucket, []))
+        self.flush()
+
+    def _open(self) -> List[LocalMemory]:
+        with self._lock:
+            return list(self._shards.values())
+
+    def _shard(self, user_id: str) -> LocalMemory:
+        """Return the user's shard."""
+        return self._shard_at(self.bucket(user_id))
+
+    def _shard_at(self, bucket: int) -> LocalMemory:
+        """Return a bucket's shard, opening it and evicting the LRU shard if needed."""
+        evicted = None
+        with self._lock:
+            shard = self._shards.get(bucket)
+            if shard is not None:
+                self._shards.move_to_end(bucket)
+                return shard
+            shard = LocalMemory(self.shard_path(bucket), **self.shard_options)
+            self._shards[bucket] = shard
+            if len(self._shards) > self.max_open_shards:
+                _, evicted = self._shards.popitem(last=False)
+        if evicted is not None:
+            # A caller still holding the evicted shard keeps working: a
+            # closed shard commits its writes inline
+            evicted.close()
+        return shard
@@ -0,0 +1,152 @@
+"""Binary snapshot format for LocalMemory, readable in place through mmap.
+
+Layout (little-endian)::
+
+    b"FLOWSNP1" | u32 header_len | header JSON (top-level store keys)
+    | records, grouped by user: u32 len | compact JSON entry (no user_id)
+    | footer JSON {"users": {user_id: [offset, length, count]}} | u64 footer_offset
+
+Opening a snapshot reads only the header and footer. A user's records are
+decoded on first access, and unchanged users can be copied into the next
+snapshot byte for byte.
+
+Convert to and from the JSON format with::
+
+    python -m memory.snapshot to-binary sample_data/memory.json sample_data/memory.bin
+    python -m memory.snapshot to-json sample_data/memory.bin sample_data/memory.json
+"""
+import argparse
+import json
+import mmap
+import struct
+from typing import Any, Dict, Iterable, List, Tuple
+
+MAGIC = b"FLOWSNP1"
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_COMPACT = (",", ":")
+
+
+def is_binary(path: str) -> bool:
+    """Return True if the file is a binary snapshot."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def encode_entries(entries: Iterable[Dict[str, Any]]) -> bytes:
+    """Encode one user's entries as length-prefixed records."""
+    out = bytearray()
+    for entry in entries:
+        payload = json.dumps(
+            {k: v for k, v in entry.items() if k != "user_id"}, separators=_COMPACT
+        ).encode("utf-8")
+        out += _U32.pack(len(payload))
+        out += payload
+    return bytes(out)
+
+
+def build_snapshot(store: Dict[str, Any], segments: Iterable[Tuple[str, int, bytes]]) -> bytes:
+    """Assemble a snapshot from top-level keys and per-user (user_id, count, records)."""
+    header = json.dumps(store, separators=_COMPACT).encode("utf-8")
+    out = bytearray(MAGIC)
+    out += _U32.pack(len(header))
+    out += header
+    users = {}
+    for user_id, count, records in segments:
+        users[user_id] = [len(out), len(records), count]
+        out += records
+    footer_offset = len(out)
+    out += json.dumps({"users": users}, separators=_COMPACT).encode("utf-8")
+    out += _U64.pack(footer_offset)
+    return bytes(out)
+
+
+class BinarySnapshot:
+    """Read-only, memory-mapped view of a binary snapshot."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a binary memory snapshot")
+        header_start = len(MAGIC) + _U32.size
+        (header_len,) = _U32.unpack_from(self._mm, len(MAGIC))
+        self.header: Dict[str, Any] = json.loads(self._mm[header_start:header_start + header_len])
+        (footer_offset,) = _U64.unpack_from(self._mm, len(self._mm) - _U64.size)
+        self._users: Dict[str, List[int]] = json.loads(
+            self._mm[footer_offset:len(self._mm) - _U64.size]
+        )["users"]
+
+    def users(self) -> List[str]:
+        return list(self._users)
+
+    def count(self, user_id: str) -> int:
+        """Number of entries stored for a user."""
+        return self._users[user_id][2]
+
+    def raw(self, user_id: str) -> bytes:
+        """A user's encoded records, for copying into a new snapshot."""
+        offset, length, _ = self._users[user_id]
+        return self._mm[offset:offset + length]
+
+    def entries(self, user_id: str) -> List[Dict[str, Any]]:
+        """Decode a user's entries."""
+        offset, length, _ = self._users[user_id]
+        end = offset + length
+        entries = []
+        while offset < end:
+            (size,) = _U32.unpack_from(self._mm, offset)
+            offset += _U32.size
+            entry = {"user_id": user_id}
+            entry.update(json.loads(self._mm[offset:offset + size]))
+            entries.append(entry)
+            offset += size
+        return entries
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def json_to_binary(src: str, dst: str) -> None:
+    """Convert a JSON memory snapshot to the binary format."""
+    with open(src, "r", encoding="utf-8") as f:
+        store = json.load(f)
+    by_user: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in store.pop("memories", []):
+        by_user.setdefault(entry.get("user_id"), []).append(entry)
+    data = build_snapshot(store, ((u, len(e), encode_entries(e)) for u, e in by_user.items()))
+    with open(dst, "wb") as f:
+        f.write(data)
+
+
+def binary_to_json(src: str, dst: str) -> None:
+    """Convert a binary memory snapshot to the JSON format."""
+    snapshot = BinarySnapshot(src)
+    try:
+        store = dict(snapshot.header)
+        store["memories"] = [e for user_id in snapshot.users() for e in snapshot.entries(user_id)]
+    finally:
+        snapshot.close()
+    with open(dst, "w", encoding="utf-8") as f:
+        json.dump(store, f, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert memory snapshots between JSON and binary.")
+    parser.add_argument("direction", choices=["to-binary", "to-json"])
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    args = parser.parse_args()
+    if args.direction == "to-binary":
+        json_to_binary(args.src, args.dst)
+    else:
+        binary_to_json(args.src, args.dst)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""SQLite-backed memory store with the same interface as LocalMemory."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Any, Dict, Optional, Tuple
+
+from feedback import TaskFeedback, FeedbackStore, feedback_from_record, feedback_to_record
+from .bm25 import item_text, tokenize
+from .items import event_last_end, event_start, item_type, latest_tasks
+from .retention import RetentionPolicy, compaction_report, expired_entries
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    type TEXT,
+    item TEXT NOT NULL,
+    tags TEXT,
+    ts INTEGER,
+    start TEXT,
+    ends TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_memories_user_type_seq ON memories (user_id, type, seq);
+CREATE INDEX IF NOT EXISTS idx_memories_user_seq ON memories (user_id, seq);
+CREATE TABLE IF NOT EXISTS feedback (
+    user_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (user_id, task_id)
+);
+"""
+
+_FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(user_id, body)"
+
+
+def _fts_phrase(text: str) -> str:
+    """Quote text as an FTS5 phrase."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class SQLiteMemory:
+    """SQLite memory store for multi-worker deployments.
+
+    Drop-in replacement for `LocalMemory`: writes are single-row inserts in
+    WAL mode instead of full-file rewrites, so concurrent Flask workers can
+    persist without the read-modify-write races of `memory.json`. Each thread
+    gets its own pooled connection. Keyword retrieval uses FTS5 when the
+    SQLite build has it and falls back to recent items otherwise.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        # user -> (feedback version it was built from, store)
+        self._feedback_cache: Dict[str, Tuple[Tuple[int, int], FeedbackStore]] = {}
+        self._feedback_lock = threading.Lock()
+        conn = self._conn()
+        with conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(memories)")}
+            if "ts" not in columns:
+                # Databases created before write timestamps were recorded
+                conn.execute("ALTER TABLE memories ADD COLUMN ts INTEGER")
+            if "start" not in columns:
+                # Databases created before fixed event times had columns
+                conn.execute("ALTER TABLE memories ADD COLUMN start TEXT")
+                conn.execute("ALTER TABLE memories ADD COLUMN ends TEXT")
+            if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+                # Fill in event times; recurring events end with their last occurrence
+                rows = conn.execute("SELECT seq, item FROM memories WHERE type = 'fixedEvent'").fetchall()
+                conn.executemany("UPDATE memories SET start = ?, ends = ? WHERE seq = ?", [
+                    (event_start(event), event_last_end(event), seq)
+                    for seq, event in ((seq, json.loads(item)) for seq, item in rows)
+                ])
+                conn.execute("PRAGMA user_version = 1")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memories_user_type_start "
+                         "ON memories (user_id, type, start)")
+            try:
+                conn.execute(_FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                self.has_fts = False
+
+    def persist(self, user_id: str, item: Any, tags: list | None = None) -> None:
+        """Persist an item to memory with optional tags."""
+        type_name = item_type(item)
+        start = ends = None
+        if type_name == "fixedEvent":
+            start, ends = event_start(item), event_last_end(item)
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO memories (user_id, type, item, tags, ts, start, ends) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (user_id, type_name, json.dumps(item), json.dumps(tags) if tags else None,
+                 int(time.time()), start, ends)
+            )
+            if self.has_fts:
+                conn.execute(
+                    "INSERT INTO memories_fts (rowid, user_id, body) VALUES (?, ?, ?)",
+                    (cur.lastrowid, user_id, item_text([item, tags or []]))
+                )
+
+    def retrieve(self, user_id: str, query: str = "", limit: int = 5) -> List[Any]:
+        """Retrieve relevant items from memory."""
+        tokens = set(tokenize(query)) if query and self.has_fts else set()
+        if tokens:
+            match = "user_id : {} AND body : ({})".format(
+                _fts_phrase(user_id), " OR ".join(_fts_phrase(t) for t in tokens)
+            )
+            rows = self._conn().execute(
+                "SELECT m.item FROM memories_fts f JOIN memories m ON m.seq = f.rowid "
+                "WHERE memories_fts MATCH ? AND m.user_id = ? "
+                "ORDER BY bm25(memories_fts, 0.0, 1.0), m.seq DESC LIMIT ?",
+                (match, user_id, limit)
+            ).fetchall()
+            if rows:
+                return [json.loads(row[0]) for row in rows]
+
+        # Fallback to recent items
+        rows = self._conn().execute(
+            "SELECT item FROM memories WHERE user_id = ? ORDER BY seq DESC LIMIT ?",
+            (user_id, limit)
+        ).fetchall()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def users(self) -> List[str]:
+        """Return the ids of all users with stored memories."""
+        rows = self._conn().execute(
+            "SELECT user_id FROM memories GROUP BY user_id ORDER BY MIN(seq)"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def entries(self, user_id: str) -> List[Dict[str, Any]]:
+        """Return a user's raw memory entries in insertion order."""
+        rows = self._conn().execute(
+            "SELECT item, tags, ts FROM memories WHERE user_id = ? ORDER BY seq", (user_id,)
+        ).fetchall()
+        entries = []
+        for item, tags, ts in rows:
+            entry = {"user_id": user_id, "item": json.loads(item)}
+            if ts is not None:
+                entry["ts"] = ts
+            if tags:
+                entry["tags"] = json.loads(tags)
+            entries.append(entry)
+        return entries
+
+    def tasks(self, user_id: str) -> List[Dict[str, Any]]:
+        """Return the user's tasks, latest version of each."""
+        return latest_tasks(self._typed(user_id, "task"))
+
+    def fixed_events(self, user_id: str, start: Optional[str] = None,
+                     end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return fixed events overlapping [start, end), ordered by start.
+
+        A recurring event is returned while any occurrence may still overlap.
+        """
+        rows = self._conn().execute(
+            "SELECT item FROM memories WHERE user_id = ?1 AND type = 'fixedEvent' "
+            "AND (?2 IS NULL OR start < ?2) AND (?3 IS NULL OR ends > ?3) ORDER BY start, seq",
+            (user_id, end, start)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def latest_preferences(self, user_id: str) -> Dict[str, Any]:
+        """Return the most recent preferences record, or {}."""
+        row = self._conn().execute(
+            "SELECT item FROM memories WHERE user_id = ? AND type = 'preferences' "
+            "ORDER BY seq DESC LIMIT 1", (user_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _typed(self, user_id: str, type_name: str) -> List[Dict[str, Any]]:
+        """Return a user's items of one type via the (user_id, type, seq) index."""
+        rows = self._conn().execute(
+            "SELECT item FROM memories WHERE user_id = ? AND type = ? ORDER BY seq",
+            (user_id, type_name)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def add_feedback(self, user_id: str, feedback: TaskFeedback) -> None:
+        """Add task completion feedback for a user."""
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO feedback (user_id, task_id, data) VALUES (?, ?, ?)",
+                (user_id, feedback.task_id, json.dumps(feedback_to_record(feedback)))
+            )
+        with self._feedback_lock:
+            self._feedback_cache.pop(user_id, None)
+
+    def get_scheduling_insights(self, user_id: str) -> Dict[str, Any]:
+        """Get learned scheduling preferences and insights for a user."""
+        store = self._feedback_store(user_id)
+        if store is None:
+            return {"recommendations": [], "time_slots": {}}
+
+        return {
+            "recommendations": store.generate_scheduling_recommendations(),
+            "time_slots": {
+                k: v.dict() for k, v in store.time_slots.items()
+            }
+        }
+
+    def adjust_schedule_weights(self, user_id: str, schedule: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply learned weights to a proposed schedule."""
+        store = self._feedback_store(user_id)
+        if store is None:
+            return schedule
+
+        return store.update_schedule_weights(schedule)
+
+    def compact(self, policy: Optional[RetentionPolicy] = None) -> Dict[str, int]:
+        """Delete entries the retention policy expires, then VACUUM.
+
+        Returns the entries and bytes reclaimed.
+        """
+        conn = self._conn()
+        bytes_before = self._disk_size()
+        entries_before = conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+        if policy is not None:
+            now = time.time()
+            users = [row[0] for row in conn.execute("SELECT DISTINCT user_id FROM memories")]
+            with conn:
+                for user_id in users:
+                    # Only these types have retention rules
+                    rows = conn.execute(
+                        "SELECT seq, item, ts FROM memories WHERE user_id = ? "
+                        "AND type IN ('task', 'preferences', 'note') ORDER BY seq", (user_id,)
+                    ).fetchall()
+                    entries = [{"item": json.loads(item), "ts": ts} for _, item, ts in rows]
+                    dropped = [(rows[i][0],) for i in expired_entries(entries, policy, now)]
+                    conn.executemany("DELETE FROM memories WHERE seq = ?", dropped)
+                    if self.has_fts:
+                        conn.executemany("DELETE FROM memories_fts WHERE rowid = ?", dropped)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        entries_after = conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+        return compaction_report(entries_before, entries_after, bytes_before, self._disk_size())
+
+    def close(self) -> None:
+        """Close the calling thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _disk_size(self) -> int:
+        """Total bytes of the database and its WAL."""
+        size = 0
+        for path in (self.path, self.path + "-wal"):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _feedback_store(self, user_id: str) -> Optional[FeedbackStore]:
+        """Return a user's feedback store, rebuilt only when their rows change.
+
+        The cached store is checked against the row count and highest rowid
+        (INSERT OR REPLACE gives a replaced row a new rowid), so writes from
+        other processes are picked up without re-reading unchanged rows.
+        """
+        conn = self._conn()
+        version = tuple(conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(rowid), 0) FROM feedback WHERE user_id = ?", (user_id,)
+        ).fetchone())
+        with self._feedback_lock:
+            cached = self._feedback_cache.get(user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        if not version[0]:
+            return None
+        rows = conn.execute(
+            "SELECT data FROM feedback WHERE user_id = ? ORDER BY rowid", (user_id,)
+        ).fetchall()
+        store = FeedbackStore()
+        for (data,) in rows:
+            store.add_task_feedback(feedback_from_record(json.loads(data)))
+        with self._feedback_lock:
+            self._feedback_cache[user_id] = (version, store)
+        return store
+
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
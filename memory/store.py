@@ -0,0 +1,35 @@
+"""Interface shared by every memory backend."""
+from typing import Any, Dict, List, Optional, Protocol, runtime_checkable
+
+from feedback import TaskFeedback
+from .retention import RetentionPolicy
+
+
+@runtime_checkable
+class MemoryStore(Protocol):
+    """What callers may rely on from LocalMemory, ShardedMemory and SQLiteMemory."""
+
+    def persist(self, user_id: str, item: Any, tags: list | None = None) -> None: ...
+
+    def retrieve(self, user_id: str, query: str = "", limit: int = 5) -> List[Any]: ...
+
+    def users(self) -> List[str]: ...
+
+    def entries(self, user_id: str) -> List[Dict[str, Any]]: ...
+
+    def tasks(self, user_id: str) -> List[Dict[str, Any]]: ...
+
+    def fixed_events(self, user_id: str, start: Optional[str] = None,
+                     end: Optional[str] = None) -> List[Dict[str, Any]]: ...
+
+    def latest_preferences(self, user_id: str) -> Dict[str, Any]: ...
+
+    def add_feedback(self, user_id: str, feedback: TaskFeedback) -> None: ...
+
+    def get_scheduling_insights(self, user_id: str) -> Dict[str, Any]: ...
+
+    def adjust_schedule_weights(self, user_id: str, schedule: List[Dict[str, Any]]) -> List[Dict[str, Any]]: ...
+
+    def compact(self, policy: Optional[RetentionPolicy] = None) -> Dict[str, int]: ...
+
+    def close(self) -> None: ...
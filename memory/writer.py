@@ -0,0 +1,127 @@
+"""Group-commit write path and durability policies for file-backed stores."""
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class DurabilityPolicy:
+    """Decides when a committed file is fsynced.
+
+    - "always": fsync every commit
+    - "interval": fsync at most once per `interval_ms`
+    - "never": leave flushing to the OS
+    """
+
+    MODES = ("always", "interval", "never")
+
+    def __init__(self, mode: str = "never", interval_ms: float = 1000):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown durability mode: {mode}")
+        self.mode = mode
+        self.interval_ms = interval_ms
+        self._last_sync = 0.0
+
+    def sync(self, fileno: int) -> None:
+        """fsync the file if the policy calls for it."""
+        if self.mode == "never":
+            return
+        now = time.monotonic()
+        if self.mode == "always" or (now - self._last_sync) * 1000 >= self.interval_ms:
+            os.fsync(fileno)
+            self._last_sync = now
+
+
+class GroupCommitWriter:
+    """Coalesces records submitted within a short window into one commit.
+
+    With `window_ms <= 0` every `submit` commits inline. Otherwise a daemon
+    thread waits `window_ms` after the first pending record, then hands all
+    records that arrived meanwhile to `commit` in a single call. `flush`
+    commits anything pending on the calling thread and waits for in-flight
+    commits. Once closed, `submit` commits inline again.
+    """
+
+    def __init__(self, commit: Callable[[List[Any]], None], window_ms: float = 0):
+        self._commit = commit
+        self.window_ms = window_ms
+        self._pending: List[Any] = []
+        self._in_flight = False
+        self._closed = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+    def submit(self, record: Any) -> None:
+        """Queue a record for the next commit."""
+        self.submit_many([record])
+
+    def submit_many(self, records: List[Any]) -> None:
+        """Queue several records to be committed together."""
+        if not records:
+            return
+        if self.window_ms <= 0 or self._closed:
+            self._commit(list(records))
+            return
+        with self._cond:
+            self._pending.extend(records)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+            self._cond.notify_all()
+
+    def pending(self) -> List[Any]:
+        """Return records queued but not yet handed to a commit."""
+        with self._cond:
+            return list(self._pending)
+
+    def flush(self) -> None:
+        """Commit everything pending now."""
+        batch = self._take()
+        if batch:
+            self._run_commit(batch)
+
+    def close(self) -> None:
+        """Flush and stop the background thread."""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _take(self) -> List[Any]:
+        """Claim the pending batch once no other commit is in flight."""
+        with self._cond:
+            while self._in_flight:
+                self._cond.wait()
+            batch, self._pending = self._pending, []
+            self._in_flight = bool(batch)
+            return batch
+
+    def _run_commit(self, batch: List[Any]) -> None:
+        try:
+            self._commit(batch)
+        finally:
+            with self._cond:
+                self._in_flight = False
+                self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._pending:
+                    return
+            # Let writes arriving within the window join this commit
+            time.sleep(self.window_ms / 1000)
+            batch = self._take()
+            if not batch:
+                continue
+            try:
+                self._run_commit(batch)
+            except Exception:
+                logger.exception("Group commit of %d records failed", len(batch))
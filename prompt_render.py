@@ -0,0 +1,123 @@
+"""Compact, token-budgeted rendering of prompt template inputs.
+
+Records are projected onto the fields a template needs and rendered as a
+pipe-separated table (one header line, one row per record) instead of
+indented JSON. When a prompt would exceed its template's token budget,
+the lowest-value sections give up items first, from the end of their
+list, and each trimmed list ends with a "(+N more)" line so the model
+knows it is seeing part of it.
+"""
+import json
+import math
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Rough English/JSON average for Gemini-style tokenizers
+CHARS_PER_TOKEN = 4
+# Memory context entries longer than this are cut off
+MAX_CONTEXT_CHARS = 240
+
+_ISO_SECONDS = re.compile(r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}):00$")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of `text`, at CHARS_PER_TOKEN characters per token."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def project(records: Iterable[Dict[str, Any]], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """Keep only `fields` of each record, dropping ones it does not have."""
+    return [{f: r[f] for f in fields if f in r} for r in records]
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        match = _ISO_SECONDS.match(value)
+        return (match.group(1) if match else value).replace("|", "/").replace("\n", " ")
+    return compact_json(value)
+
+
+def table_rows(records: Iterable[Dict[str, Any]], fields: Sequence[str]) -> List[str]:
+    """One pipe-separated row per record, in `fields` order (ISO seconds dropped)."""
+    return ["|".join(_cell(r.get(f)) for f in fields) for r in records]
+
+
+def context_lines(context: Iterable[Any]) -> List[str]:
+    """Memory context as "- entry" lines, each minified and cut to MAX_CONTEXT_CHARS."""
+    lines = []
+    for entry in context or []:
+        if isinstance(entry, str) and entry.startswith(("{", "[")):
+            # Memory items arrive as indented or spaced JSON strings
+            try:
+                entry = json.loads(entry)
+            except ValueError:
+                pass
+        text = entry if isinstance(entry, str) else compact_json(entry)
+        if len(text) > MAX_CONTEXT_CHARS:
+            text = text[:MAX_CONTEXT_CHARS - 3] + "..."
+        lines.append(f"- {text}")
+    return lines
+
+
+class Section(NamedTuple):
+    """A list-valued template field: header (e.g. a table header) plus item lines."""
+    name: str
+    lines: List[str]
+    header: Optional[str] = None
+    # Items never trimmed away
+    keep: int = 0
+
+
+class Rendered(NamedTuple):
+    text: str
+    tokens_before: int
+    tokens_after: int
+    # Items trimmed from each section to meet the budget
+    dropped: Dict[str, int]
+
+
+def _section_text(section: Section, shown: int) -> str:
+    lines = ([section.header] if section.header else []) + section.lines[:shown]
+    hidden = len(section.lines) - shown
+    if hidden:
+        lines.append(f"(+{hidden} more)")
+    return "\n".join(lines) if lines else "(none)"
+
+
+def fit(template: str, sections: List[Section], fields: Dict[str, str],
+        budget: Optional[int]) -> Tuple[str, Dict[str, int]]:
+    """Render sections into `template` within `budget` tokens.
+
+    `sections` are ordered lowest value first: the first section is trimmed
+    down to its `keep` items before the next one loses any. Trimming stops
+    at the budget or when nothing more can go. Returns the prompt and the
+    number of items dropped from each trimmed section.
+    """
+    shown = {s.name: len(s.lines) for s in sections}
+
+    def render() -> str:
+        values = dict(fields, **{s.name: _section_text(s, shown[s.name]) for s in sections})
+        return template.format(**values)
+
+    text = render()
+    if budget is not None:
+        for section in sections:
+            over = estimate_tokens(text) - budget
+            if over <= 0:
+                break
+            # Drop lines by their estimated size, then settle on the exact render
+            while shown[section.name] > section.keep and over > 0:
+                shown[section.name] -= 1
+                over -= estimate_tokens(section.lines[shown[section.name]]) + 1
+            text = render()
+            while shown[section.name] > section.keep and estimate_tokens(text) > budget:
+                shown[section.name] -= 1
+                text = render()
+    dropped = {s.name: len(s.lines) - shown[s.name] for s in sections if shown[s.name] < len(s.lines)}
+    return text, dropped
@@ -1,9 +1,25 @@
 """Prompt templates for agents and LLM response validation."""
 import json
+import os
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Union
 from pydantic import BaseModel, Field, ValidationError
 
+from prompt_render import (Rendered, Section, compact_json, context_lines, estimate_tokens, fit,
+                           table_rows)
+
+# Fields each template needs from its records
+EVENT_FIELDS = ("title", "startTime", "endTime", "recurring")
+TASK_FIELDS = ("id", "title", "category", "estimatedMinutes", "priority", "deadline")
+SLOT_FIELDS = ("id", "startTime", "endTime", "duration")
+SCHEDULE_FIELDS = ("title", "category", "startTime", "endTime", "priority")
+
+
+def _table(name: str, records: List[Dict], fields: tuple, keep: int = 0) -> Section:
+    """A section rendering `records` as a table of the `fields` any of them has."""
+    present = [f for f in fields if any(f in r for r in records)]
+    return Section(name, table_rows(records, present), "|".join(present) if records else None, keep)
+
 
 class LLMResponse(BaseModel):
     """Base model for LLM responses."""
@@ -32,14 +48,38 @@ class CoachResponse(LLMResponse):
 
 
 class AgentPromptTemplate:
-    """Base class for agent prompts with validation and retry logic."""
+    """Base class for agent prompts with validation and retry logic.
+
+    ``render`` fills the template compactly (projected fields, tables,
+    minified JSON) within ``token_budget`` estimated tokens, trimming the
+    lowest-value sections first; ``format_verbose`` is the original
+    indented-JSON rendering, kept for comparison. FLOW_PROMPT_COMPACT=0
+    makes ``render`` and ``format`` use the verbose form.
+    """
     
     max_retries: int = 3
     response_model: type[LLMResponse] = LLMResponse
+    token_budget: Optional[int] = None
     
     @classmethod
     def format(cls, **kwargs) -> str:
+        return cls.render(**kwargs).text
+
+    @classmethod
+    def format_verbose(cls, **kwargs) -> str:
+        raise NotImplementedError
+
+    @classmethod
+    def render(cls, **kwargs) -> Rendered:
         raise NotImplementedError
+
+    @classmethod
+    def _fit(cls, verbose: str, sections: List[Section], fields: Dict[str, str]) -> Rendered:
+        before = estimate_tokens(verbose)
+        if os.environ.get("FLOW_PROMPT_COMPACT", "1") == "0":
+            return Rendered(verbose, before, before, {})
+        text, dropped = fit(cls.template, sections, fields, cls.token_budget)
+        return Rendered(text, before, estimate_tokens(text), dropped)
     
     @classmethod
     def validate_response(cls, response: str) -> Union[Dict[str, Any], None]:
@@ -96,11 +136,18 @@ Format your response as JSON with these fields:
 
 Return your response in JSON format:'''
 
+    token_budget = 1200
+
     @classmethod
-    def format(cls, context: list, query: str) -> str:
+    def format_verbose(cls, context: list, query: str) -> str:
         context_str = "\n".join(f"- {c}" for c in (context or []))
         return cls.template.format(context=context_str, query=query)
 
+    @classmethod
+    def render(cls, context: list, query: str) -> Rendered:
+        return cls._fit(cls.format_verbose(context, query),
+                        [Section("context", context_lines(context))], {"query": query})
+
 
 class ConstraintPromptTemplate(AgentPromptTemplate):
     response_model = ConstraintResponse
@@ -132,14 +179,25 @@ Identify scheduling constraints and provide suggestions. Format as JSON:
 
 Response (JSON only):'''
 
+    token_budget = 3000
+
     @classmethod
-    def format(cls, fixed_events: List[Dict], tasks: List[Dict], preferences: Dict) -> str:
+    def format_verbose(cls, fixed_events: List[Dict], tasks: List[Dict], preferences: Dict) -> str:
         return cls.template.format(
             fixed_events=json.dumps(fixed_events, indent=2),
             tasks=json.dumps(tasks, indent=2),
             preferences=json.dumps(preferences, indent=2)
         )
 
+    @classmethod
+    def render(cls, fixed_events: List[Dict], tasks: List[Dict], preferences: Dict) -> Rendered:
+        # Tasks past the budget go first; fixed events are the constraints themselves
+        return cls._fit(
+            cls.format_verbose(fixed_events, tasks, preferences),
+            [_table("tasks", tasks, TASK_FIELDS), _table("fixed_events", fixed_events, EVENT_FIELDS)],
+            {"preferences": compact_json(preferences)}
+        )
+
 
 class AllocatorPromptTemplate(AgentPromptTemplate):
     response_model = AllocationResponse
@@ -169,14 +227,26 @@ Format your response as JSON:
 
 Response (JSON only):'''
 
+    token_budget = 3000
+
     @classmethod
-    def format(cls, available_slots: List[Dict], tasks: List[Dict], preferences: Dict) -> str:
+    def format_verbose(cls, available_slots: List[Dict], tasks: List[Dict], preferences: Dict) -> str:
         return cls.template.format(
             available_slots=json.dumps(available_slots, indent=2),
             tasks=json.dumps(tasks, indent=2),
             preferences=json.dumps(preferences, indent=2)
         )
 
+    @classmethod
+    def render(cls, available_slots: List[Dict], tasks: List[Dict], preferences: Dict) -> Rendered:
+        # Slots are numbered so the response can name them; later slots are dropped first
+        slots = [{"id": i, **slot} for i, slot in enumerate(available_slots)]
+        return cls._fit(
+            cls.format_verbose(available_slots, tasks, preferences),
+            [_table("available_slots", slots, SLOT_FIELDS, keep=1), _table("tasks", tasks, TASK_FIELDS)],
+            {"preferences": compact_json(preferences)}
+        )
+
 
 class CoachPromptTemplate(AgentPromptTemplate):
     response_model = CoachResponse
@@ -205,15 +275,26 @@ Format your response as JSON:
 
 Response (JSON only):'''
 
+    token_budget = 2000
+
     @classmethod
-    def format(cls, context: List[str], schedule: List[Dict], preferences: Dict) -> str:
+    def format_verbose(cls, context: List[str], schedule: List[Dict],
+                       preferences: Optional[Dict] = None) -> str:
         return cls.template.format(
-            context="\n".join(f"- {c}" for c in context),
+            context="\n".join(f"- {c}" for c in (context or [])),
             schedule=json.dumps(schedule, indent=2),
-            preferences=json.dumps(preferences, indent=2)
+            preferences=json.dumps(preferences or {}, indent=2)
+        )
+
+    @classmethod
+    def render(cls, context: List[str], schedule: List[Dict],
+               preferences: Optional[Dict] = None) -> Rendered:
+        # Memory context is trimmed before any of the schedule being reviewed
+        return cls._fit(
+            cls.format_verbose(context, schedule, preferences),
+            [Section("context", context_lines(context)), _table("schedule", schedule, SCHEDULE_FIELDS)],
+            {"preferences": compact_json(preferences or {})}
         )
-        schedule_str = json.dumps(schedule, indent=2)
-        return cls.template.format(context=context_str, schedule=schedule_str)
 
 
 
@@ -0,0 +1,209 @@
+"""Unit tests for allocator slot selection."""
+import random
+
+import pytest
+
+from agents.allocator import AllocatorAgent
+from agents.slot_index import SlotIndex
+from timespan import Span, hour_of, parse_minutes
+
+
+def _score(slot, minutes, preferred_hour):
+    if slot is None:
+        return None
+    score = slot.minutes - minutes
+    if preferred_hour is not None and abs(hour_of(slot.start) - preferred_hour) > 2:
+        score += 120
+    return score
+
+
+def test_slot_index_matches_reference_scan():
+    rng = random.Random(7)
+    allocator = AllocatorAgent()
+    base = parse_minutes("2025-10-20T00:00:00")
+    for _ in range(200):
+        slots = []
+        for _ in range(rng.randint(0, 30)):
+            start = base + rng.randrange(0, 14 * 24 * 60, 15)
+            slots.append(Span(start, start + rng.choice([30, 45, 60, 90, 120, 240])))
+        index = SlotIndex(slots)
+        minutes = rng.choice([30, 60, 90, 120])
+        preferences = {"preferred_study_time": f"{rng.randint(0, 23):02d}:00"} if rng.random() < 0.7 else {}
+        task = {"title": "t", "category": "study", "estimatedMinutes": minutes}
+
+        expected = allocator._find_best_slot(task, slots, preferences)
+        preferred_hour = allocator.preferred_hour(task, preferences)
+        actual = index.best_fit(minutes, preferred_hour)
+        assert _score(actual, minutes, preferred_hour) == _score(expected, minutes, preferred_hour)
+
+
+def test_slot_index_split_and_remove():
+    index = SlotIndex([Span(0, 120), Span(600, 660)])
+    assert index.best_fit(60) == Span(600, 660)
+    index.remove(Span(600, 660))
+    assert index.best_fit(60) == Span(0, 120)
+    index.remove(Span(0, 120))
+    index.add(Span(60, 120))
+    assert list(index) == [Span(60, 120)]
+    assert index.best_fit(90) is None
+
+
+def test_vector_compat_matches_indexed_placement():
+    pytest.importorskip("numpy")
+
+    rng = random.Random(11)
+    indexed = AllocatorAgent(scoring="indexed")
+    compat = AllocatorAgent(scoring="vector_compat")
+    base = parse_minutes("2025-10-20T00:00:00")
+    for _ in range(300):
+        slots = []
+        for _ in range(rng.randint(1, 40)):
+            start = base + rng.randrange(0, 14 * 24 * 60, 30)
+            slots.append(Span(start, start + rng.choice([30, 40, 60, 70, 80, 90, 100, 120, 180, 200, 480])))
+        tasks = [
+            {"title": f"t{i}", "category": rng.choice(["study", "work"]),
+             "estimatedMinutes": rng.choice([30, 40, 60, 70, 90, 100, 120]),
+             "urgent": rng.random() < 0.5, "important": rng.random() < 0.5}
+            for i in range(rng.randint(1, 30))
+        ]
+        for task in tasks:
+            if rng.random() < 0.3:
+                task["deadline"] = f"2025-10-{rng.randint(20, 30)}"
+        preferences = {"preferred_study_time": "14:00"}
+        prioritized = indexed.prioritized(tasks)
+        assert compat._place(prioritized, slots, preferences, {}) == \
+            indexed._place_indexed(prioritized, slots, preferences)
+
+
+def test_vector_scoring_prefers_learned_slots():
+    pytest.importorskip("numpy")
+    state = {
+        "tasks": [{"title": "Essay", "category": "study", "estimatedMinutes": 60}],
+        # Monday 09:00 and Monday 15:00, equally long
+        "availableSlots": [
+            {"startTime": "2025-10-20T09:00:00", "endTime": "2025-10-20T10:00:00", "duration": 1.0},
+            {"startTime": "2025-10-20T15:00:00", "endTime": "2025-10-20T16:00:00", "duration": 1.0}
+        ],
+        "slotWeights": {"9_0": 0.2}
+    }
+    state = AllocatorAgent(scoring="vector").run(state)
+    assert state["schedule"][0]["startTime"] == "2025-10-20T15:00:00"
+
+
+def test_optimal_mode_recovers_tasks_greedy_drops():
+    state = {
+        "tasks": [
+            {"title": f"Task {minutes}-{i}", "category": "study", "estimatedMinutes": minutes,
+             "urgent": True, "important": True}
+            for i, minutes in enumerate([60, 60, 120])
+        ],
+        "availableSlots": [
+            {"startTime": "2025-10-20T09:00:00", "endTime": "2025-10-20T11:00:00", "duration": 2.0},
+            {"startTime": "2025-10-20T13:00:00", "endTime": "2025-10-20T14:00:00", "duration": 1.0}
+        ]
+    }
+    state = AllocatorAgent(allocation="optimal").run(state)
+    stats = state["allocationStats"]
+    assert stats["greedy"] == {"tasks": 2, "minutes": 120, "weightedMinutes": 360}
+    assert stats["scheduled"] == {"tasks": 2, "minutes": 180, "weightedMinutes": 540}
+    assert stats["provenOptimal"]
+    titles = {e["title"]: (e["startTime"], e["endTime"]) for e in state["schedule"]}
+    assert titles["Task 120-2"] == ("2025-10-20T09:00:00", "2025-10-20T11:00:00")
+
+
+def test_optimal_mode_keeps_deadlines():
+    from agents.constraint import ConstraintAgent
+
+    state = {
+        "tasks": [
+            {"title": "A", "category": "work", "estimatedMinutes": 240, "urgent": True, "important": True},
+            {"title": "B", "category": "work", "estimatedMinutes": 240, "important": True,
+             "deadline": "2025-01-06"}
+        ],
+        "horizonStart": "2025-01-06",
+        "horizonEnd": "2025-01-07",
+        "preferences": {"workDayStart": "09:00", "workDayEnd": "13:00"}
+    }
+    state = AllocatorAgent(allocation="optimal").run(ConstraintAgent().run(state))
+    times = {e["title"]: (e["startTime"], e["endTime"]) for e in state["schedule"] if e["title"] != "Break"}
+    # Greedy gives A the deadline day; the search moves A so B fits in time
+    assert state["allocationStats"]["greedy"]["tasks"] == 1
+    assert times == {"A": ("2025-01-07T09:00:00", "2025-01-07T13:00:00"),
+                     "B": ("2025-01-06T09:00:00", "2025-01-06T13:00:00")}
+
+    # With only the day after the deadline left, B stays unscheduled
+    state = {**state, "horizonStart": "2025-01-07", "horizonEnd": "2025-01-08"}
+    state = AllocatorAgent(allocation="optimal").run(ConstraintAgent().run(state))
+    assert [e["title"] for e in state["schedule"]] == ["A"]
+
+
+def test_optimal_mode_never_worse_than_greedy():
+    rng = random.Random(5)
+    for _ in range(30):
+        slots = []
+        for day in range(3):
+            start = parse_minutes("2025-10-20T09:00:00") + day * 24 * 60
+            for _ in range(rng.randint(1, 4)):
+                length = rng.choice([30, 60, 90, 120])
+                slots.append(Span(start, start + length))
+                start += length + 30
+        state = {
+            "tasks": [
+                {"title": f"t{i}", "category": "work", "estimatedMinutes": rng.choice([30, 45, 60, 90]),
+                 "urgent": rng.random() < 0.5, "important": rng.random() < 0.5,
+                 "deadline": rng.choice([None, "2025-10-20T11:00:00", "2025-10-21"])}
+                for i in range(rng.randint(1, 15))
+            ],
+            "slotIntervals": slots,
+            "preferences": {"breakDuration": 0}
+        }
+        state = AllocatorAgent(allocation="optimal").run(state)
+        stats = state["allocationStats"]
+        assert stats["scheduled"]["weightedMinutes"] >= stats["greedy"]["weightedMinutes"]
+
+        spans = sorted(
+            (parse_minutes(e["startTime"]), parse_minutes(e["endTime"]))
+            for e in state["schedule"] if e["category"] != "break"
+        )
+        for (_, end), (start, _) in zip(spans, spans[1:]):
+            assert end <= start
+        for start, end in spans:
+            assert any(slot.start <= start and end <= slot.end for slot in slots)
+        deadlines = {task["title"]: AllocatorAgent()._deadline(task) for task in state["tasks"]}
+        for e in state["schedule"]:
+            if e["category"] != "break" and deadlines[e["title"]] is not None:
+                assert parse_minutes(e["endTime"]) <= deadlines[e["title"]]
+
+
+def test_streaming_pulls_only_needed_days():
+    from agents.constraint import ConstraintAgent
+
+    state = {
+        "tasks": [
+            {"title": "Essay", "category": "study", "estimatedMinutes": 240, "important": True},
+            {"title": "Quiz prep", "category": "study", "estimatedMinutes": 300, "deadline": "2025-09-01"},
+            {"title": "Too late", "category": "study", "estimatedMinutes": 60, "deadline": "2025-08-01"}
+        ],
+        "horizonStart": "2025-09-01"
+    }
+    state = ConstraintAgent(streaming=True).run(state)
+    state = AllocatorAgent().run(state)
+
+    times = {e["title"]: (e["startTime"], e["endTime"]) for e in state["schedule"]}
+    assert times == {"Essay": ("2025-09-01T09:00:00", "2025-09-01T13:00:00")}
+    # Quiz prep cannot finish by its deadline, so no later day is pulled for it
+    assert len(state["availableSlots"]) == 1
+    assert "slotStream" not in state
+
+
+@pytest.mark.parametrize("scoring", ["indexed", "vector", "vector_compat"])
+def test_greedy_placement_respects_deadlines(scoring):
+    if scoring != "indexed":
+        pytest.importorskip("numpy")
+    slots = [Span(parse_minutes("2025-09-02T09:00:00"), parse_minutes("2025-09-02T12:00:00")),
+             Span(parse_minutes("2025-09-01T15:00:00"), parse_minutes("2025-09-01T17:00:00"))]
+    tasks = [({"title": "Report", "estimatedMinutes": 180, "deadline": "2025-09-01"}, "urgent_important"),
+             ({"title": "Quiz", "estimatedMinutes": 120, "deadline": "2025-09-01T16:30:00"}, "urgent_important"),
+             ({"title": "Reading", "estimatedMinutes": 60, "deadline": "2025-09-01"}, "urgent_important")]
+    spans = AllocatorAgent(scoring=scoring)._place(tasks, slots, {}, {})
+    assert spans == [None, None, Span(slots[1].start, slots[1].start + 60)]
@@ -0,0 +1,68 @@
+"""Unit tests for batch scheduling."""
+import json
+
+import pytest
+from batch import main, run_batch
+from memory import MemoryStore, open_memory
+
+WEEK = {"horizonStart": "2025-10-20", "horizonEnd": "2025-10-24"}
+
+
+def _input(i):
+    return {
+        "user_id": f"user{i}",
+        "tasks": [{"title": f"Task {i}-{n}", "category": "study", "estimatedMinutes": 30 + 15 * n} for n in range(3)],
+        "fixedEvents": [{"title": "Class", "startTime": "2025-10-20T10:00:00",
+                         "endTime": "2025-10-20T12:00:00", "recurring": "weekdays"}],
+        "preferences": {"workDayStart": "09:00", "workDayEnd": "17:00"},
+        **WEEK
+    }
+
+
+def test_pool_matches_in_process_run():
+    inputs = [_input(i) for i in range(12)]
+    serial = {r["user_id"]: r for r in run_batch(inputs, workers=1, chunk_size=5)}
+    pooled = {r["user_id"]: r for r in run_batch(iter(inputs), workers=2, chunk_size=5)}
+    assert serial == pooled
+    assert len(serial) == 12
+    assert all(len(r["schedule"]) >= 3 and not r["errors"] for r in serial.values())
+
+
+def test_cli_reads_jsonl_and_reports_throughput(tmp_path, monkeypatch, capsys):
+    source = tmp_path / "inputs.jsonl"
+    source.write_text("\n".join(json.dumps(_input(i)) for i in range(3)) + "\n")
+    output = tmp_path / "out.jsonl"
+    main(["--input", str(source), "--output", str(output), "--workers", "1"])
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["user_id"] for r in results] == ["user0", "user1", "user2"]
+    assert "Scheduled 3 users (0 with errors)" in capsys.readouterr().err
+
+
+def test_bad_input_is_reported_not_raised():
+    result, = run_batch([{"user_id": "x", "tasks": [], "fixedEvents": [{"title": "broken"}], "preferences": {}}],
+                        workers=1)
+    assert result["errors"][0]["agent"] == "constraint"
+
+
+@pytest.mark.parametrize("backend, name", [("json", "memory.json"), ("sharded", "shards"), ("sqlite", "memory.db")])
+def test_cli_schedules_all_users_in_every_backend(tmp_path, backend, name):
+    path = str(tmp_path / name)
+    memory = open_memory(backend, path)
+    assert isinstance(memory, MemoryStore)
+    for user_id in ("alice", "bob"):
+        memory.persist(user_id, {"type": "task", "title": "Read", "category": "study", "estimatedMinutes": 60})
+        memory.persist(user_id, {"type": "preferences", "workDayStart": "09:00", "workDayEnd": "17:00"})
+    memory.close()
+
+    output = tmp_path / "out.jsonl"
+    main(["--all", "--backend", backend, "--path", path, "--workers", "1", "--output", str(output)])
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(r["user_id"] for r in results) == ["alice", "bob"]
+    assert all(r["schedule"] and not r["errors"] for r in results)
+
+
+def test_llm_chunks_run_the_async_chain():
+    inputs = [dict(_input(i), query="Plan my week") for i in range(3)]
+    results = list(run_batch(inputs, workers=1, llm=True))
+    assert [r["user_id"] for r in results] == ["user0", "user1", "user2"]
+    assert all(r["schedule"] and not r["errors"] for r in results)
@@ -0,0 +1,69 @@
+"""Unit tests for the conflict resolver."""
+import time
+
+from agents.conflict import ConflictResolverAgent
+
+
+def _entry(title, start, end, priority=None, category="work"):
+    entry = {"title": title, "category": category,
+             "startTime": f"2025-10-20T{start}:00", "endTime": f"2025-10-20T{end}:00"}
+    if priority:
+        entry["priority"] = priority
+    return entry
+
+
+def test_resolves_by_priority_into_nearest_free_slot():
+    state = {
+        "fixedEvents": [{"title": "Standup", "startTime": "2025-10-20T09:00:00", "endTime": "2025-10-20T09:30:00"}],
+        "importedEvents": [{"title": "Dentist", "startTime": "2025-10-20T13:00:00", "endTime": "2025-10-20T14:00:00"}],
+        "schedule": [
+            _entry("Report", "09:00", "10:00", "high"),
+            _entry("Email", "09:30", "10:00", "low"),
+            _entry("Review", "12:30", "13:30", "medium"),
+            _entry("Walk", "16:00", "16:30")
+        ],
+        "preferences": {"workDayStart": "09:00", "workDayEnd": "17:00"}
+    }
+    result = ConflictResolverAgent().run(state)
+
+    groups = result["conflicts"]
+    assert [[(i["title"], i["action"]) for i in g["items"]] for g in groups] == [
+        [("Standup", "kept"), ("Report", "moved"), ("Email", "kept")],
+        [("Review", "moved"), ("Dentist", "kept")]
+    ]
+    assert all(g["resolved"] for g in groups)
+    times = {e["title"]: (e["startTime"][11:16], e["endTime"][11:16]) for e in result["schedule"]}
+    # Report outranks Email but not Standup; Review slides just clear of Dentist
+    assert times == {
+        "Report": ("10:00", "11:00"), "Email": ("09:30", "10:00"),
+        "Review": ("12:00", "13:00"), "Walk": ("16:00", "16:30")
+    }
+    assert result["schedule"][1]["previousStartTime"] == "2025-10-20T09:00:00"
+
+
+def test_no_conflicts_leaves_schedule_alone():
+    schedule = [_entry("A", "09:00", "10:00", "high"), _entry("B", "10:00", "11:00", "low")]
+    result = ConflictResolverAgent().run({"fixedEvents": [], "schedule": list(schedule)})
+    assert result["conflicts"] == []
+    assert result["schedule"] == schedule
+
+
+def test_unplaceable_task_is_reported_and_removed():
+    state = {
+        "fixedEvents": [{"title": "Offsite", "startTime": "2025-10-20T09:00:00", "endTime": "2025-10-20T17:00:00"}],
+        "schedule": [_entry("Plan", "10:00", "11:00", "high"), _entry("Break", "11:00", "11:15", category="break")]
+    }
+    result = ConflictResolverAgent().run(state)
+    assert [i["action"] for i in result["conflicts"][0]["items"]] == ["kept", "unscheduled", "dropped"]
+    assert not result["conflicts"][0]["resolved"]
+    assert result["schedule"] == []
+
+
+def test_thousands_of_events():
+    events = [{"title": f"e{i}", "startTime": f"2025-10-{1 + i // 300:02d}T{9 + i % 300 // 40:02d}:{i % 40:02d}:00",
+               "endTime": f"2025-10-{1 + i // 300:02d}T{9 + i % 300 // 40:02d}:{i % 40 + 15:02d}:00"}
+              for i in range(5000)]
+    start = time.perf_counter()
+    result = ConflictResolverAgent().run({"importedEvents": events, "schedule": []})
+    assert time.perf_counter() - start < 1.0
+    assert result["conflicts"]
@@ -0,0 +1,47 @@
+"""Unit tests for free-slot computation."""
+from datetime import date
+
+from agents.constraint import ConstraintAgent
+
+
+def _event(start, end):
+    return {"title": "Busy", "startTime": start, "endTime": end}
+
+
+def test_overlapping_events_are_merged():
+    state = ConstraintAgent().run({
+        "fixedEvents": [
+            _event("2025-10-18T09:00:00", "2025-10-18T11:00:00"),
+            _event("2025-10-18T10:30:00", "2025-10-18T11:30:00"),
+            _event("2025-10-18T14:00:00", "2025-10-18T14:20:00")
+        ],
+        "preferences": {"workDayStart": "08:00", "workDayEnd": "18:00"}
+    })
+    assert [(s["startTime"], s["endTime"]) for s in state["availableSlots"]] == [
+        ("2025-10-18T08:00:00", "2025-10-18T09:00:00"),
+        ("2025-10-18T11:30:00", "2025-10-18T14:00:00"),
+        ("2025-10-18T14:20:00", "2025-10-18T18:00:00")
+    ]
+    assert state["availableSlots"][1]["duration"] == 2.5
+
+
+def test_events_crossing_midnight_block_the_next_day():
+    state = ConstraintAgent().run({
+        "fixedEvents": [_event("2025-10-18T16:00:00", "2025-10-19T10:00:00")],
+        "horizonEnd": "2025-10-19"
+    })
+    assert [(s["startTime"], s["endTime"]) for s in state["availableSlots"]] == [
+        ("2025-10-18T09:00:00", "2025-10-18T16:00:00"),
+        ("2025-10-19T10:00:00", "2025-10-19T17:00:00")
+    ]
+
+
+def test_horizon_without_events():
+    state = ConstraintAgent().run({"fixedEvents": []})
+    slots = state["availableSlots"]
+    assert len(slots) == 7
+    assert slots[0]["startTime"] == f"{date.today().isoformat()}T09:00:00"
+
+    state = ConstraintAgent().run({"horizonStart": "2025-11-03", "horizonEnd": "2025-11-16"})
+    assert len(state["availableSlots"]) == 14
+    assert state["availableSlots"][-1]["endTime"] == "2025-11-16T17:00:00"
@@ -0,0 +1,92 @@
+"""Unit tests for incremental rescheduling."""
+import pytest
+
+from agents.incremental import IncrementalScheduler
+
+
+def _entry(title, start, end, priority="medium"):
+    return {"title": title, "category": "work", "startTime": start, "endTime": end, "priority": priority}
+
+
+@pytest.fixture
+def state():
+    return {
+        "schedule": [
+            _entry("Report", "2025-10-20T09:00:00", "2025-10-20T11:00:00", "high"),
+            _entry("Email", "2025-10-20T11:00:00", "2025-10-20T12:00:00", "low"),
+            _entry("Review", "2025-10-20T13:00:00", "2025-10-20T17:00:00")
+        ],
+        "fixedEvents": [{"title": "Lunch", "startTime": "2025-10-20T12:00:00", "endTime": "2025-10-20T13:00:00"}],
+        "preferences": {"breakDuration": 0},
+        "horizonStart": "2025-10-20",
+        "horizonEnd": "2025-10-21"
+    }
+
+
+def _times(result):
+    return {e["title"]: (e["startTime"], e["endTime"]) for e in result["schedule"] if e["category"] != "break"}
+
+
+def test_fixed_event_moves_only_overlapping_entries(state):
+    result = IncrementalScheduler().apply(state, {
+        "type": "fixed_event_added",
+        "event": {"title": "Call", "startTime": "2025-10-20T10:30:00", "endTime": "2025-10-20T11:00:00"}
+    })
+    times = _times(result)
+    assert times["Email"] == ("2025-10-20T11:00:00", "2025-10-20T12:00:00")
+    assert times["Review"] == ("2025-10-20T13:00:00", "2025-10-20T17:00:00")
+    assert times["Report"] == ("2025-10-21T09:00:00", "2025-10-21T11:00:00")
+    assert [m["title"] for m in result["moved"]] == ["Report"]
+    assert result["moved"][0]["previousStartTime"] == "2025-10-20T09:00:00"
+
+
+def test_duration_change_grows_in_place_or_moves(state):
+    state["schedule"][1]["endTime"] = "2025-10-20T11:30:00"
+    result = IncrementalScheduler().apply(state, {"type": "duration_changed", "title": "Email", "estimatedMinutes": 60})
+    assert _times(result)["Email"] == ("2025-10-20T11:00:00", "2025-10-20T12:00:00")
+    assert result["moved"] == []
+
+    result = IncrementalScheduler().apply(state, {"type": "duration_changed", "title": "Email", "estimatedMinutes": 90})
+    assert _times(result)["Email"] == ("2025-10-21T09:00:00", "2025-10-21T10:30:00")
+
+
+def test_high_priority_task_displaces_lower_priority(state):
+    state["horizonEnd"] = "2025-10-20"
+    result = IncrementalScheduler().apply(state, {
+        "type": "task_added",
+        "task": {"title": "Urgent fix", "category": "work", "estimatedMinutes": 60, "urgent": True, "important": True}
+    })
+    assert _times(result)["Urgent fix"] == ("2025-10-20T11:00:00", "2025-10-20T12:00:00")
+    assert [e["title"] for e in result["unscheduled"]] == ["Email"]
+
+    result = IncrementalScheduler().apply(state, {"type": "task_removed", "title": "Review"})
+    assert set(_times(result)) == {"Report", "Email"}
+
+
+@pytest.mark.parametrize("delta", [
+    {"type": "reorder"},
+    {"type": "task_added", "task": "Urgent fix"},
+    {"type": "fixed_event_added"}
+])
+def test_malformed_delta_is_rejected(state, delta):
+    with pytest.raises(ValueError):
+        IncrementalScheduler().apply(state, delta)
+
+
+def test_repairs_keep_deadlines(state):
+    state["schedule"][1]["deadline"] = "2025-10-20T12:30:00"
+    # Email can only move earlier than 11:30, so it displaces nothing and stays unplaced
+    result = IncrementalScheduler().apply(state, {"type": "duration_changed", "title": "Email", "estimatedMinutes": 90})
+    assert "Email" not in _times(result)
+    assert [e["title"] for e in result["unscheduled"]] == ["Email"]
+
+    result = IncrementalScheduler().apply(state, {
+        "type": "task_added",
+        "task": {"title": "Quiz", "category": "work", "estimatedMinutes": 60, "deadline": "2025-10-20",
+                 "urgent": True, "important": True}
+    })
+    # Tomorrow is free, but only today meets the deadline, so Email (low) makes room
+    # and cannot move anywhere early enough for its own
+    assert _times(result)["Quiz"] == ("2025-10-20T11:00:00", "2025-10-20T12:00:00")
+    assert result["schedule"][1]["deadline"] == "2025-10-20"
+    assert [e["title"] for e in result["unscheduled"]] == ["Email"]
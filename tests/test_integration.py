@@ -1,5 +1,7 @@
 """Unit tests for integration endpoints."""
-from integration import get_schedule, update_task, add_goal, chat_command
+import asyncio
+
+from integration import aget_schedule, get_schedule, run_schedule, update_task, add_goal, chat_command
 from memory.local_memory import LocalMemory
 
 def test_update_and_get_schedule():
@@ -30,3 +32,26 @@ def test_chat_command():
     memory = LocalMemory("sample_data/memory.json")
     result = chat_command(user_id, "What should I focus on this weekend?", memory)
     assert isinstance(result, dict)
+
+def test_async_schedule_matches_sync(tmp_path):
+    user_id = "test_user"
+    memory = LocalMemory(str(tmp_path / "memory.json"))
+    update_task(user_id, {"title": "Write report", "estimatedMinutes": 60, "category": "work"}, memory)
+    sync = get_schedule(user_id, "Schedule my work tasks", memory)
+    result = asyncio.run(aget_schedule(user_id, "Schedule my work tasks", memory))
+    assert result["completed_agents"] == sync["completed_agents"] and len(sync["completed_agents"]) == 5
+    assert result["schedule"] == sync["schedule"]
+    assert result["coach_messages"] == sync["coach_messages"]
+
+
+def test_sync_callers_share_one_background_loop(tmp_path):
+    import integration
+
+    user_id = "test_user"
+    memory = LocalMemory(str(tmp_path / "memory.json"))
+    update_task(user_id, {"title": "Write report", "estimatedMinutes": 60, "category": "work"}, memory)
+    first = run_schedule(user_id, "Schedule my work tasks", memory)
+    loop = integration._loop
+    second = run_schedule(user_id, "Schedule my work tasks", memory)
+    assert integration._loop is loop and loop.is_running()
+    assert first["schedule"] == second["schedule"] == get_schedule(user_id, "Schedule my work tasks", memory)["schedule"]
@@ -0,0 +1,91 @@
+"""Unit tests for the rule-based intent fast path."""
+import pytest
+
+from agents import intent
+from agents.parser import ParserAgent
+from integration import parser_stats
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Schedule my week for physics exams", "plan_exam"),
+    ("Move my gym session to 7pm tomorrow", "reschedule"),
+    ("I prefer to start work at 8:00", "update_preferences"),
+    ("Add a goal to learn Rust by the end of the month", "add_goal"),
+    ("Add a task: write report, 2 hours, high priority", "schedule_task"),
+    ("How can I be more productive?", "general_advice"),
+])
+def test_routine_queries_are_confident(query, expected):
+    result = intent.classify(query)
+    assert result.intent == expected
+    assert result.confidence >= 0.7
+
+
+def test_parameters_and_ambiguous_queries():
+    assert intent.classify("Add a task: write report, 2 hours, high priority").parameters == {
+        "priority": "high", "duration": "2 hours"
+    }
+    assert intent.classify("Move DSA to 7pm tomorrow").parameters == {
+        "specific_times": ["7pm"], "date_range": "tomorrow"
+    }
+    assert intent.classify("hello there").confidence == 0
+    # Two unrelated intents compete, so the LLM decides
+    assert intent.classify("Should I move my exam prep or ask for tips?").confidence < 0.7
+
+
+@pytest.mark.parametrize("query, parameters", [
+    ("Move DSA to Friday", {"date_range": "friday"}),
+    ("Schedule my tasks for next Monday evening", {"date_range": "next monday evening"}),
+    ("Move the review to March 3rd at 9am", {"date_range": "march 3rd", "specific_times": ["9am"]}),
+    ("Reschedule it to the 5th", {"date_range": "the 5th"}),
+    ("Move it to 2025-10-24", {"date_range": "2025-10-24"}),
+])
+def test_weekdays_and_dates_are_extracted(query, parameters):
+    assert intent.classify(query).parameters == parameters
+
+
+@pytest.mark.parametrize("query", [
+    # A generic verb alone is not enough
+    "Plan a trip to Paris",
+    # People and places the rules cannot extract go to the LLM
+    "Schedule a meeting with Bob on Friday at 3pm",
+    "Move my meeting with Alice to Friday",
+])
+def test_generic_or_entity_queries_defer_to_llm(query):
+    assert intent.classify(query).confidence < 0.7
+
+
+@pytest.mark.parametrize("query", [
+    "Don't schedule anything tomorrow",
+    "I don't want to study for the exam",
+    "Never move my gym session",
+    # Answerable only with the subjects or preferences the LLM would extract
+    "Schedule my week for exams",
+    "I prefer mornings",
+])
+def test_negated_or_underspecified_queries_defer_to_llm(query):
+    assert intent.classify(query).confidence < 0.7
+
+
+def test_subjects_and_preferences_are_extracted():
+    assert intent.classify("Help me revise for my chemistry midterm and physics final").parameters == {
+        "subjects": ["chemistry", "physics"]
+    }
+    assert intent.classify("I prefer to start work at 8am and finish work at 5 pm").parameters["preferences"] == {
+        "workDayStart": "08:00", "workDayEnd": "17:00"
+    }
+    assert intent.classify("I prefer breaks of 10 minutes").parameters["preferences"] == {"breakDuration": 10}
+
+
+def test_parser_falls_back_to_llm_below_threshold():
+    intent.stats.reset()
+    agent = ParserAgent(fast_path=True, threshold=0.7)
+    routine = agent.run({"query": "Reschedule my gym session to later"})
+    assert routine["parsedBy"] == "rules"
+    assert routine["parsed"]["intent"] == "reschedule"
+    vague = agent.run({"query": "hello there"})
+    assert vague["parsedBy"] == "llm"
+    assert intent.stats.snapshot() == {
+        "hits": 1, "fallbacks": 1, "hit_rate": 0.5, "by_intent": {"reschedule": 1}
+    }
+    assert parser_stats() == intent.stats.snapshot()
+    assert ParserAgent(fast_path=False).run({"query": "Reschedule my gym session"})["parsedBy"] == "llm"
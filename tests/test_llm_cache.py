@@ -0,0 +1,75 @@
+"""Unit tests for the LLM response cache."""
+import asyncio
+
+from llm_cache import ResponseCache, cache_key
+from llm_client import LLMClient
+
+
+class FakeModel:
+    """Stands in for the Gemini model, counting calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def _response(self, prompt):
+        self.calls += 1
+        return type("Response", (), {"text": f'{{"echo": "{prompt}", "n": {self.calls}}}'})()
+
+    def generate_content(self, prompt, generation_config, **options):
+        return self._response(prompt)
+
+    async def generate_content_async(self, prompt, generation_config, **options):
+        return self._response(prompt)
+
+
+def _client(cache, temperature=0):
+    client = LLMClient(temperature=temperature, cache=cache)
+    client._model, client._has_sdk = FakeModel(), True
+    return client
+
+
+def test_repeated_prompts_hit_the_cache():
+    client = _client(ResponseCache())
+    first = client.generate("plan")
+    again = client.generate("plan")
+    assert again == {"text": first["text"], "raw": None, "cached": True}
+    assert asyncio.run(client.agenerate("plan"))["cached"]
+    assert client.generate("plan", max_tokens=10)["text"] != first["text"]
+    assert client._model.calls == 2
+    stats = client.cache.stats()
+    assert (stats["memory_hits"], stats["misses"]) == (2, 2)
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = ResponseCache(max_entries=2, ttl_seconds=10)
+    now = [1000.0]
+    monkeypatch.setattr("llm_cache.time.time", lambda: now[0])
+    for key in "abc":
+        cache.put(key, key.upper(), temperature=0.7)
+    assert cache.get("a") is None
+    cache.put("d", "D", temperature=0)
+    now[0] += 11
+    assert cache.get("c") is None
+    assert cache.get("d") == "D"
+    assert cache.stats()["expired"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+    key = cache_key("m", "prompt", 0, 100)
+    cache = ResponseCache(path=path)
+    cache.put(key, "answer", temperature=0)
+    cache.close()
+    reopened = ResponseCache(path=path)
+    assert reopened.get(key) == "answer"
+    assert reopened.stats()["disk_hits"] == 1
+    assert reopened.get(key) == "answer"
+    assert reopened.stats()["memory_hits"] == 1
+
+
+def test_mock_responses_are_not_cached():
+    cache = ResponseCache()
+    client = LLMClient(cache=cache)
+    client.generate("plan my schedule")
+    client.generate("plan my schedule")
+    assert cache.stats()["entries"] == 0
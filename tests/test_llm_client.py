@@ -0,0 +1,40 @@
+"""Unit tests for the shared LLM client."""
+import asyncio
+
+import llm_client
+from agents.coach import CoachAgent
+from agents.parser import ParserAgent
+from llm_client import LLMClient
+
+
+def test_shared_client_is_created_once_per_configuration():
+    assert LLMClient.shared() is LLMClient.shared()
+    assert ParserAgent().llm is ParserAgent().llm
+    assert CoachAgent().llm is LLMClient.shared()
+    assert LLMClient.shared(temperature=0) is not LLMClient.shared()
+
+
+def test_env_is_loaded_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(llm_client, "_env_loaded", False)
+    monkeypatch.setattr(llm_client, "load_dotenv", lambda: calls.append(1))
+    LLMClient()
+    LLMClient()
+    assert calls == [1]
+
+
+def test_agenerate_keeps_calls_in_flight():
+    client = LLMClient.shared()
+
+    async def run():
+        return await asyncio.gather(*(client.agenerate(f"plan my schedule {i}") for i in range(20)))
+
+    responses = asyncio.run(run())
+    assert len(responses) == 20
+    assert all(r == client.generate(r["raw"]["prompt"]) for r in responses)
+
+
+def test_agent_arun_matches_run():
+    agent = ParserAgent()
+    state = {"query": "plan my schedule", "context": []}
+    assert asyncio.run(agent.arun(dict(state))) == agent.run(dict(state))
@@ -0,0 +1,139 @@
+"""Unit tests for LLM timeouts, retries, circuit breaking and re-prompts."""
+import asyncio
+
+from llm_cache import ResponseCache
+from llm_client import LLMClient
+from llm_resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, RetryPolicy
+from validators import validate_llm_response
+
+VALID = '{"intent": "reschedule", "parameters": {}}'
+
+
+class ScriptedModel:
+    """Plays back a script of responses; an Exception entry is raised."""
+
+    def __init__(self, *script, delay=0.0):
+        self.script = list(script)
+        self.prompts = []
+        self.timeouts = []
+        self.delay = delay
+
+    def _next(self, prompt, options):
+        self.prompts.append(prompt)
+        self.timeouts.append(options["request_options"]["timeout"])
+        item = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+        if isinstance(item, Exception):
+            raise item
+        return type("Response", (), {"text": item})()
+
+    def generate_content(self, prompt, generation_config, **options):
+        return self._next(prompt, options)
+
+    async def generate_content_async(self, prompt, generation_config, **options):
+        await asyncio.sleep(self.delay)
+        return self._next(prompt, options)
+
+
+def _client(model, breaker=None, **retry):
+    policy = RetryPolicy(**{"timeout": 5, "max_attempts": 3, "deadline": 30, "base_delay": 0.001, **retry})
+    client = LLMClient(temperature=0, cache=ResponseCache(), retry=policy,
+                       breaker=breaker or CircuitBreaker(failure_threshold=2, reset_seconds=60))
+    client._model, client._has_sdk = model, True
+    return client
+
+
+def test_retries_with_timeouts_then_succeeds():
+    model = ScriptedModel(TimeoutError("slow"), ConnectionError("reset"), VALID)
+    resp = _client(model).generate("plan")
+    assert resp["text"] == VALID and "fallback" not in resp
+    assert model.timeouts == [5, 5, 5]
+
+
+def test_exhausted_retries_fall_back_and_open_the_breaker():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60, clock=lambda: now[0])
+    model = ScriptedModel(ConnectionError("down"))
+    client = _client(model, breaker)
+    for _ in range(2):
+        resp = client.generate("plan my schedule")
+        assert resp["fallback"] and resp["error"] == "down"
+    assert breaker.state == OPEN and len(model.prompts) == 6
+
+    # Open: fail fast without calling the model
+    assert client.generate("plan my schedule")["error"] == "circuit open"
+    assert len(model.prompts) == 6
+
+    # Half-open: one trial call; success closes the breaker
+    now[0] += 61
+    assert breaker.state == HALF_OPEN
+    model.script = [VALID]
+    assert client.generate("plan my schedule")["text"] == VALID
+    assert breaker.state == CLOSED
+
+
+def test_async_calls_are_cut_off_at_the_timeout():
+    model = ScriptedModel(VALID, delay=1.0)
+    client = _client(model, timeout=0.05, max_attempts=2)
+    resp = asyncio.run(client.agenerate("plan"))
+    assert resp["fallback"]
+    assert model.prompts == []
+
+
+def test_deadline_limits_attempts(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("llm_resilience.time.monotonic", lambda: now[0])
+    policy = RetryPolicy(timeout=10, max_attempts=5, deadline=25, base_delay=0.001)
+    timeouts = []
+    for _, timeout in policy.attempts():
+        timeouts.append(timeout)
+        now[0] += timeout  # each attempt times out
+    assert timeouts == [10, 10]
+
+
+def test_invalid_response_is_reprompted_and_evicted_from_cache():
+    model = ScriptedModel("not json", VALID)
+    client = _client(model)
+    resp = client.generate_validated("plan", "parser")
+    assert resp["text"] == VALID
+    assert len(model.prompts) == 2
+    assert "could not be used" in model.prompts[1]
+    # The invalid answer to the original prompt is not served again
+    model.script = [VALID]
+    assert client.generate("plan")["text"] == VALID
+
+
+def test_validate_without_regenerate_checks_once():
+    calls = []
+    assert "error" in validate_llm_response("nope", "parser")
+    result = validate_llm_response("nope", "parser", max_retries=3,
+                                   regenerate=lambda error: calls.append(error) or VALID)
+    assert result == {"intent": "reschedule", "parameters": {}}
+    assert len(calls) == 1
+
+
+def test_cancelled_trial_releases_the_half_open_breaker():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] += 61
+    client = _client(ScriptedModel(VALID, delay=1.0), breaker)
+
+    async def cancel_trial():
+        task = asyncio.ensure_future(client.agenerate("plan"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_trial())
+    # The next caller gets the trial instead of failing fast forever
+    assert breaker.state == HALF_OPEN and breaker.allow()
+
+
+def test_async_invalid_response_is_reprompted():
+    model = ScriptedModel("not json", VALID)
+    resp = asyncio.run(_client(model).agenerate_validated("plan", "parser"))
+    assert resp["text"] == VALID
+    assert "could not be used" in model.prompts[1]
@@ -0,0 +1,339 @@
+"""Unit tests for the local memory store."""
+import json
+import os
+from datetime import datetime
+
+import pytest
+from feedback import TaskFeedback
+from memory.filelock import GenerationCounter
+from memory.local_memory import LocalMemory
+from memory.retention import RetentionPolicy
+
+
+@pytest.fixture
+def memory_path(tmp_path):
+    return str(tmp_path / "memory.json")
+
+
+def test_journal_appends_without_rewriting_snapshot(memory_path):
+    memory = LocalMemory(memory_path, journal=True)
+    memory.persist("test_user", "first note")
+    with open(memory_path, "r", encoding="utf-8") as f:
+        snapshot = f.read()
+
+    memory.persist("test_user", "second note")
+    memory.close()
+    with open(memory_path, "r", encoding="utf-8") as f:
+        assert f.read() == snapshot
+
+    reopened = LocalMemory(memory_path, journal=True)
+    assert reopened.retrieve("test_user", limit=10) == ["first note", "second note"]
+
+
+def test_journal_compaction_folds_records(memory_path):
+    memory = LocalMemory(memory_path, journal=True, compact_threshold=3)
+    for i in range(4):
+        memory.persist("test_user", f"note {i}")
+    memory.close()
+
+    with open(memory_path, "r", encoding="utf-8") as f:
+        assert len(json.load(f)["memories"]) == 3
+    reopened = LocalMemory(memory_path, journal=True)
+    assert reopened.retrieve("test_user", limit=10) == [f"note {i}" for i in range(4)]
+
+
+def test_journal_ignores_torn_and_stale_records(memory_path):
+    memory = LocalMemory(memory_path, journal=True)
+    memory.persist("test_user", "kept")
+    memory.close()
+    with open(memory.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"user_id": "test_user", "it')
+
+    assert LocalMemory(memory_path).retrieve("test_user") == ["kept"]
+
+    # A journal left behind by a finished compaction must not be replayed
+    memory = LocalMemory(memory_path, journal=True)
+    with open(memory.journal_path, "r", encoding="utf-8") as f:
+        stale = f.read()
+    memory.compact()
+    with open(memory.journal_path, "w", encoding="utf-8") as f:
+        f.write(stale)
+    assert LocalMemory(memory_path).retrieve("test_user") == ["kept"]
+
+
+def test_journal_append_after_torn_tail(memory_path):
+    memory = LocalMemory(memory_path, journal=True)
+    memory.persist("test_user", "kept")
+    # An append interrupted after this instance last read the journal
+    with open(memory.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"user_id": "test_user", "it')
+    memory.persist("test_user", "after")
+    memory.close()
+
+    reopened = LocalMemory(memory_path, journal=True)
+    reopened.persist("test_user", "later")
+    reopened.close()
+    with open(memory.journal_path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert [json.loads(line)["item"] for line in lines[1:]] == ["kept", "after", "later"]
+    assert LocalMemory(memory_path, journal=True).retrieve("test_user", limit=10) == ["kept", "after", "later"]
+
+
+def test_partitions_keep_users_apart(memory_path):
+    memory = LocalMemory(memory_path)
+    memory.persist("alice", "alice note", tags=["misc"])
+    memory.persist("bob", "bob note")
+    memory.persist("alice", {"type": "task", "title": "Read"})
+
+    assert memory.retrieve("alice") == ["alice note", {"type": "task", "title": "Read"}]
+    assert memory.retrieve("bob") == ["bob note"]
+    assert memory.entries("alice")[0]["tags"] == ["misc"]
+    assert [e["item"] for e in LocalMemory(memory_path).entries("bob")] == ["bob note"]
+
+
+def test_keyword_retrieval_ranks_matches(memory_path):
+    memory = LocalMemory(memory_path)
+    memory.persist("test_user", "Prefers DSA practice after 20:00")
+    memory.persist("test_user", {"type": "task", "title": "Physics revision"}, tags=["exam"])
+    memory.persist("test_user", "Physics exam on Friday")
+    memory.persist("other_user", "Physics tutoring")
+
+    results = memory.retrieve("test_user", "physics exam", limit=2)
+    assert results == [
+        "Physics exam on Friday",
+        {"type": "task", "title": "Physics revision"},
+    ]
+    # Unmatched queries fall back to the most recent items
+    assert memory.retrieve("test_user", "chemistry", limit=1) == ["Physics exam on Friday"]
+
+
+def test_typed_queries(memory_path):
+    memory = LocalMemory(memory_path)
+    memory.persist("test_user", {"type": "task", "title": "Read", "estimatedMinutes": 30})
+    memory.persist("test_user", {"break_ratio": {"work_minutes": 50, "break_minutes": 10}})
+    memory.persist("test_user", {"type": "fixedEvent", "title": "Lab",
+                                 "startTime": "2025-10-21T09:00:00", "endTime": "2025-10-21T11:00:00"})
+    memory.persist("test_user", {"type": "fixedEvent", "title": "Lecture",
+                                 "startTime": "2025-10-20T09:00:00", "endTime": "2025-10-20T10:00:00"})
+    memory.persist("test_user", {"type": "task", "title": "Read", "estimatedMinutes": 45})
+    for i in range(6):
+        memory.persist("test_user", f"note {i}")
+    memory.persist("test_user", {"type": "preferences", "workDayStart": "08:00"})
+
+    assert memory.tasks("test_user") == [{"type": "task", "title": "Read", "estimatedMinutes": 45}]
+    assert memory.latest_preferences("test_user") == {"type": "preferences", "workDayStart": "08:00"}
+    assert [e["title"] for e in memory.fixed_events("test_user")] == ["Lecture", "Lab"]
+    assert [e["title"] for e in memory.fixed_events(
+        "test_user", "2025-10-20T09:30:00", "2025-10-21T09:00:00")] == ["Lecture"]
+    assert memory.latest_preferences("other_user") == {}
+
+    # A long event that started well before the window still overlaps it
+    memory.persist("test_user", {"type": "fixedEvent", "title": "Trip",
+                                 "startTime": "2025-10-18T08:00:00", "endTime": "2025-10-20T12:00:00"})
+    assert [e["title"] for e in memory.fixed_events("test_user", start="2025-10-20T10:30:00")] == [
+        "Trip", "Lab"]
+    assert [e["title"] for e in memory.fixed_events("test_user", start="2025-10-21T11:00:00")] == []
+
+    # Results are copies; callers cannot mutate the indexes
+    memory.tasks("test_user")[0]["estimatedMinutes"] = 0
+    memory.fixed_events("test_user")[0]["title"] = "Changed"
+    memory.latest_preferences("test_user")["workDayStart"] = "06:00"
+    assert memory.tasks("test_user")[0]["estimatedMinutes"] == 45
+    assert memory.fixed_events("test_user")[0]["title"] == "Trip"
+    assert memory.latest_preferences("test_user")["workDayStart"] == "08:00"
+
+
+def test_recurring_events_outlive_their_first_occurrence(memory_path):
+    memory = LocalMemory(memory_path)
+    memory.persist("test_user", {"type": "fixedEvent", "title": "Lecture", "recurring": "weekly",
+                                 "startTime": "2025-09-01T09:00:00", "endTime": "2025-09-01T10:00:00"})
+    memory.persist("test_user", {"type": "fixedEvent", "title": "Seminar",
+                                 "startTime": "2025-09-02T14:00:00", "endTime": "2025-09-02T15:00:00",
+                                 "recurrence": {"freq": "weekly", "until": "2025-10-14"}})
+    memory.persist("test_user", {"type": "fixedEvent", "title": "Lab",
+                                 "startTime": "2025-10-21T09:00:00", "endTime": "2025-10-21T11:00:00"})
+
+    week = ("2025-10-20T00:00:00", "2025-10-27T00:00:00")
+    assert [e["title"] for e in memory.fixed_events("test_user", *week)] == ["Lecture", "Lab"]
+    assert [e["title"] for e in memory.fixed_events("test_user", "2025-10-14T00:00:00")] == [
+        "Lecture", "Seminar", "Lab"]
+    # Not before the first occurrence
+    assert memory.fixed_events("test_user", end="2025-09-01T09:00:00") == []
+    assert [e["title"] for e in LocalMemory(memory_path).fixed_events("test_user", *week)] == ["Lecture", "Lab"]
+
+
+def test_feedback_is_materialized_per_user_on_demand(memory_path):
+    now = datetime.now()
+    memory = LocalMemory(memory_path)
+    for user_id in ("alice", "bob"):
+        memory.add_feedback(user_id, TaskFeedback(
+            task_id=f"{user_id}_task",
+            scheduled_start=now.replace(hour=8, minute=0),
+            scheduled_end=now.replace(hour=9, minute=0),
+            completed=False,
+            energy_level=2,
+            difficulty=3,
+            satisfaction=2
+        ))
+
+    reopened = LocalMemory(memory_path)
+    assert reopened.feedback_stores == {}
+    assert reopened.get_scheduling_insights("alice")["time_slots"]
+    assert list(reopened.feedback_stores) == ["alice"]
+
+    # Saving after touching one user must keep the untouched user's records
+    reopened.add_feedback("carol", memory.feedback_stores["alice"].task_feedback["alice_task"])
+    eager = LocalMemory(memory_path, lazy_feedback=False)
+    assert set(eager.feedback_stores) == {"alice", "bob", "carol"}
+
+    # Only the accessed user's slice of the file is decoded
+    lazy = LocalMemory(memory_path)
+    assert lazy.get_scheduling_insights("bob")["time_slots"]
+    assert set(lazy._feedback_raw) == {"bob"}
+    assert set(lazy._feedback_index) == {"alice", "bob", "carol"}
+
+
+def test_feedback_keeps_unreadable_records(memory_path, tmp_path):
+    now = datetime.now()
+    feedback_path = str(tmp_path / "memory_feedback.json")
+    # An indented file, as written before feedback was stored one user per line
+    with open(feedback_path, "w", encoding="utf-8") as f:
+        json.dump({"alice": {"broken": {"task_id": "broken", "completed": "maybe"}}}, f, indent=2)
+
+    memory = LocalMemory(memory_path)
+    memory.add_feedback("alice", TaskFeedback(
+        task_id="read",
+        scheduled_start=now.replace(hour=8, minute=0),
+        scheduled_end=now.replace(hour=9, minute=0),
+        completed=True,
+        energy_level=4,
+        difficulty=2,
+        satisfaction=4
+    ))
+    memory.close()
+
+    with open(feedback_path, "r", encoding="utf-8") as f:
+        assert set(json.load(f)["alice"]) == {"broken", "read"}
+    assert list(LocalMemory(memory_path)._feedback_store("alice").task_feedback) == ["read"]
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_concurrent_instances_do_not_lose_updates(memory_path, journal):
+    # Two instances on one file behave like two worker processes
+    first = LocalMemory(memory_path, journal=journal)
+    second = LocalMemory(memory_path, journal=journal)
+    first.persist("test_user", "from first")
+    second.persist("test_user", "from second")
+    first.persist("test_user", "first again")
+
+    assert LocalMemory(memory_path).retrieve("test_user", limit=10) == [
+        "from first", "from second", "first again"
+    ]
+    # Each writer also picks up the other's commits
+    assert len(first.entries("test_user")) == 3
+
+
+def test_same_size_foreign_rewrite_is_detected(memory_path):
+    memory = LocalMemory(memory_path)
+    memory.persist("test_user", "note 1")
+    # Another writer replaces the snapshot with one of the same size and
+    # mtime, bumping the generation as every writer does
+    st = os.stat(memory_path)
+    with open(memory_path, "r", encoding="utf-8") as f:
+        data = f.read()
+    with open(memory_path, "w", encoding="utf-8") as f:
+        f.write(data.replace("note 1", "note 9"))
+    os.utime(memory_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    GenerationCounter(memory_path + ".gen", 2).bump(0)
+
+    memory.persist("test_user", "note 2")
+    assert memory.retrieve("test_user", limit=10) == ["note 9", "note 2"]
+
+
+def test_group_commit_coalesces_writes(memory_path):
+    memory = LocalMemory(memory_path, journal=True, write_window_ms=50, durability="always")
+    commits = []
+    commit = memory._commit
+    memory._writer._commit = lambda batch: (commits.append(len(batch)), commit(batch))
+    for i in range(10):
+        memory.persist("test_user", f"note {i}")
+    # Reads see uncommitted writes immediately
+    assert len(memory.retrieve("test_user", limit=20)) == 10
+    memory.flush()
+
+    assert commits == [10]
+    assert len(LocalMemory(memory_path).entries("test_user")) == 10
+
+
+def test_feedback_merges_across_instances(memory_path):
+    now = datetime.now()
+
+    def feedback(task_id):
+        return TaskFeedback(
+            task_id=task_id,
+            scheduled_start=now.replace(hour=14, minute=0),
+            scheduled_end=now.replace(hour=15, minute=0),
+            completed=True,
+            energy_level=4,
+            difficulty=3,
+            satisfaction=4
+        )
+
+    first = LocalMemory(memory_path)
+    second = LocalMemory(memory_path)
+    first.add_feedback("test_user", feedback("a"))
+    second.add_feedback("test_user", feedback("b"))
+
+    eager = LocalMemory(memory_path, lazy_feedback=False)
+    assert set(eager.feedback_stores["test_user"].task_feedback) == {"a", "b"}
+
+
+def test_compaction_applies_retention(memory_path):
+    memory = LocalMemory(memory_path, journal=True)
+    memory.persist("test_user", {"type": "task", "title": "Essay"})
+    memory.persist("test_user", {"type": "task", "title": "Essay", "completed": True,
+                                 "completedAt": "2020-01-01T10:00:00"})
+    memory.persist("test_user", {"type": "task", "title": "Read"})
+    memory.persist("test_user", {"type": "task", "title": "Read", "completed": True})
+    memory.persist("test_user", {"type": "preferences", "workDayStart": "08:00"})
+    memory.persist("test_user", {"type": "preferences", "workDayStart": "09:00"})
+    for i in range(4):
+        memory.persist("test_user", f"note {i}")
+
+    report = memory.compact(RetentionPolicy(completed_task_ttl_days=30, max_notes_per_user=2))
+
+    assert report["entries_before"] == 10
+    assert report["entries_reclaimed"] == 6
+    assert report["bytes_reclaimed"] > 0
+    reopened = LocalMemory(memory_path)
+    assert reopened.tasks("test_user") == [{"type": "task", "title": "Read", "completed": True}]
+    assert reopened.latest_preferences("test_user") == {"type": "preferences", "workDayStart": "09:00"}
+    assert reopened.retrieve("test_user", "note", limit=5) == ["note 3", "note 2"]
+
+
+def test_binary_snapshot_round_trip(tmp_path):
+    from memory.snapshot import binary_to_json, json_to_binary
+
+    json_path = str(tmp_path / "memory.json")
+    memory = LocalMemory(json_path)
+    memory.persist("alice", {"type": "task", "title": "Essay"})
+    memory.persist("bob", "bob's note", tags=["misc"])
+    memory.persist("alice", "alice's note")
+
+    bin_path = str(tmp_path / "memory.bin")
+    json_to_binary(json_path, bin_path)
+    binary = LocalMemory(bin_path, journal=True)
+    # Nothing is decoded until a user is read
+    assert binary._by_user == {}
+    assert binary.tasks("alice") == [{"type": "task", "title": "Essay"}]
+    assert set(binary._by_user) == {"alice"}
+
+    binary.persist("alice", "later note")
+    binary.compact()
+    reopened = LocalMemory(bin_path)
+    assert reopened.retrieve("alice", limit=10) == [{"type": "task", "title": "Essay"}, "alice's note", "later note"]
+    assert reopened.entries("bob")[0]["tags"] == ["misc"]
+
+    binary_to_json(bin_path, json_path)
+    assert sorted(LocalMemory(json_path).users()) == ["alice", "bob"]
+    assert LocalMemory(json_path).retrieve("bob") == ["bob's note"]
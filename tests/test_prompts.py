@@ -0,0 +1,52 @@
+"""Unit tests for compact, token-budgeted prompt rendering."""
+import json
+
+from prompt_render import estimate_tokens
+from prompts import AllocatorPromptTemplate, CoachPromptTemplate, ParserPromptTemplate
+
+
+def _schedule(n):
+    return [{"title": f"Task {i}", "category": "study", "priority": "high", "notes": "x" * 50,
+             "startTime": f"2025-10-{20 + i // 8:02d}T{9 + i % 8:02d}:00:00",
+             "endTime": f"2025-10-{20 + i // 8:02d}T{10 + i % 8:02d}:00:00"} for i in range(n)]
+
+
+def test_compact_rendering_projects_fields_into_a_table():
+    context = [json.dumps({"type": "task", "title": "DSA practice"})]
+    rendered = CoachPromptTemplate.render(context=context, schedule=_schedule(3),
+                                          preferences={"workDayStart": "09:00"})
+    assert "title|category|startTime|endTime|priority\nTask 0|study|2025-10-20T09:00|2025-10-20T10:00|high" \
+        in rendered.text
+    assert '- {"type":"task","title":"DSA practice"}' in rendered.text
+    assert "notes" not in rendered.text
+    assert rendered.tokens_after < rendered.tokens_before
+    assert rendered.tokens_before == estimate_tokens(
+        CoachPromptTemplate.format_verbose(context, _schedule(3), {"workDayStart": "09:00"}))
+
+
+def test_budget_trims_context_before_schedule():
+    context = [f"memory note {i} " + "y" * 200 for i in range(40)]
+    rendered = CoachPromptTemplate.render(context=context, schedule=_schedule(20))
+    assert rendered.tokens_after <= CoachPromptTemplate.token_budget
+    assert set(rendered.dropped) == {"context"}
+
+    rendered = CoachPromptTemplate.render(context=context, schedule=_schedule(200))
+    assert rendered.tokens_after <= CoachPromptTemplate.token_budget
+    assert rendered.dropped["context"] == 40
+    assert 0 < rendered.dropped["schedule"] < 200
+    assert "(+40 more)" in rendered.text
+    assert "Task 0|" in rendered.text
+
+
+def test_allocator_slots_get_ids_and_parser_keeps_query():
+    slots = [{"startTime": "2025-10-20T09:00:00", "endTime": "2025-10-20T10:00:00", "duration": 1.0}]
+    text = AllocatorPromptTemplate.format(available_slots=slots, tasks=[{"id": "t1", "title": "A"}], preferences={})
+    assert "id|startTime|endTime|duration\n0|2025-10-20T09:00|2025-10-20T10:00|1.0" in text
+    assert ParserPromptTemplate.render(context=[], query="plan my week").text.count("plan my week") == 1
+
+
+def test_verbose_mode_switch(monkeypatch):
+    monkeypatch.setenv("FLOW_PROMPT_COMPACT", "0")
+    rendered = CoachPromptTemplate.render(context=[], schedule=_schedule(2))
+    assert rendered.text == CoachPromptTemplate.format_verbose([], _schedule(2))
+    assert rendered.tokens_before == rendered.tokens_after
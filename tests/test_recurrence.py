@@ -0,0 +1,76 @@
+"""Unit tests for recurring fixed events."""
+from agents.constraint import ConstraintAgent
+from agents.recurrence import _occurrences, expand
+from timespan import parse_minutes, to_iso
+
+
+def _window(start, end):
+    return parse_minutes(start), parse_minutes(end)
+
+
+def test_weekly_rule_with_exceptions_and_until():
+    event = {
+        "title": "Lecture",
+        "startTime": "2025-10-20T10:00:00",
+        "endTime": "2025-10-20T11:30:00",
+        "recurrence": {"freq": "weekly", "byweekday": ["MO", "TH"], "until": "2025-11-03",
+                       "exceptions": ["2025-10-23"]}
+    }
+    starts = [to_iso(s) for s, _ in expand(event, *_window("2025-10-01T00:00:00", "2025-12-01T00:00:00"))]
+    assert starts == [
+        "2025-10-20T10:00:00", "2025-10-27T10:00:00",
+        "2025-10-30T10:00:00", "2025-11-03T10:00:00"
+    ]
+
+
+def test_shorthand_and_interval():
+    event = {"start": "2025-10-20T09:00:00", "end": "2025-10-20T16:00:00", "recurring": "weekdays"}
+    assert len(expand(event, *_window("2025-10-20T00:00:00", "2025-11-03T00:00:00"))) == 10
+
+    fortnightly = {"startTime": "2025-10-20T09:00:00", "endTime": "2025-10-20T10:00:00",
+                   "recurrence": {"freq": "weekly", "interval": 2}}
+    starts = [to_iso(s)[:10] for s, _ in expand(fortnightly, *_window("2025-10-01T00:00:00", "2025-11-30T00:00:00"))]
+    assert starts == ["2025-10-20", "2025-11-03", "2025-11-17"]
+
+
+def test_constraint_expands_within_horizon_and_caches():
+    _occurrences.cache_clear()
+    state = {
+        "fixedEvents": [{"title": "College", "startTime": "2025-10-20T09:00:00",
+                         "endTime": "2025-10-20T16:00:00", "recurring": "weekdays"}],
+        "horizonStart": "2025-10-20",
+        "horizonEnd": "2025-10-26"
+    }
+    slots = ConstraintAgent().run(dict(state))["availableSlots"]
+    # One hour after college on weekdays, the whole working day at the weekend
+    assert [(s["startTime"][:10], s["duration"]) for s in slots] == [
+        ("2025-10-20", 1.0), ("2025-10-21", 1.0), ("2025-10-22", 1.0), ("2025-10-23", 1.0),
+        ("2025-10-24", 1.0), ("2025-10-25", 8.0), ("2025-10-26", 8.0)
+    ]
+    ConstraintAgent().run(dict(state))
+    assert _occurrences.cache_info().hits == 1
+
+
+def test_streaming_expands_recurrences_per_pulled_day(monkeypatch):
+    from agents import timeline
+
+    windows = []
+
+    def recording_expand(event, window_start, window_end):
+        windows.append((window_start, window_end))
+        return expand(event, window_start, window_end)
+
+    monkeypatch.setattr(timeline, "expand", recording_expand)
+    state = {
+        "fixedEvents": [{"title": "College", "startTime": "2025-10-20T09:00:00",
+                         "endTime": "2025-10-20T16:00:00", "recurring": "weekdays"},
+                        {"title": "Dentist", "startTime": "2025-10-25T10:00:00",
+                         "endTime": "2025-10-25T11:00:00"}],
+        "horizonStart": "2025-10-20"
+    }
+    stream = ConstraintAgent(streaming=True).run(dict(state))["slotStream"]
+    first_week = [next(stream) for _ in range(8)]
+    assert len(windows) == 7
+
+    eager = ConstraintAgent().run(dict(state, horizonEnd="2025-10-26"))["slotIntervals"]
+    assert first_week == eager
@@ -0,0 +1,66 @@
+"""Unit tests for the user-sharded memory store."""
+import os
+from datetime import datetime
+
+import pytest
+from feedback import TaskFeedback
+from memory import LocalMemory, ShardedMemory
+
+
+@pytest.fixture
+def memory(tmp_path):
+    return ShardedMemory(str(tmp_path / "shards"), buckets=8, max_open_shards=2)
+
+
+def test_users_live_in_their_own_shard(memory):
+    users = [f"user_{i}" for i in range(6)]
+    for user_id in users:
+        memory.persist(user_id, {"type": "task", "title": f"Task for {user_id}"})
+        memory.persist(user_id, f"note for {user_id}")
+
+    # Only the most recently used shards stay open
+    assert len(memory.open_shards()) <= 2
+    for user_id in users:
+        assert memory.tasks(user_id) == [{"type": "task", "title": f"Task for {user_id}"}]
+        assert memory.retrieve(user_id, "note") == [f"note for {user_id}"]
+
+    shard_files = [f for f in os.listdir(memory.root) if f.endswith(".json")]
+    assert len(shard_files) == len({memory.bucket(u) for u in users})
+
+
+def test_import_from_single_file(tmp_path, memory):
+    source = LocalMemory(str(tmp_path / "memory.json"))
+    source.persist("alice", "alice note")
+    source.persist("bob", {"type": "task", "title": "Read"})
+
+    memory.import_memory(source)
+    memory.close()
+    reopened = ShardedMemory(memory.root, buckets=8)
+    assert reopened.retrieve("alice") == ["alice note"]
+    assert reopened.tasks("bob") == [{"type": "task", "title": "Read"}]
+
+
+def test_import_writes_each_shard_once(tmp_path, memory, monkeypatch):
+    now = datetime.now()
+    source = LocalMemory(str(tmp_path / "memory.json"))
+    for i in range(20):
+        source.persist(f"user_{i % 4}", f"note {i}")
+    source.add_feedback("user_0", TaskFeedback(
+        task_id="read",
+        scheduled_start=now.replace(hour=8, minute=0),
+        scheduled_end=now.replace(hour=9, minute=0),
+        completed=True,
+        energy_level=4,
+        difficulty=2,
+        satisfaction=4
+    ))
+
+    writes = []
+    write_snapshot = LocalMemory._write_snapshot
+    monkeypatch.setattr(LocalMemory, "_write_snapshot",
+                        lambda self: writes.append(self.path) or write_snapshot(self))
+    memory.import_memory(source)
+
+    assert sorted(writes) == sorted({memory.shard_path(memory.bucket(f"user_{i}")) for i in range(4)})
+    assert memory.retrieve("user_1", limit=10) == [f"note {i}" for i in range(1, 20, 4)]
+    assert memory.get_scheduling_insights("user_0")["time_slots"]
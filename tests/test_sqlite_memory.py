@@ -0,0 +1,131 @@
+"""Unit tests for the SQLite memory backend."""
+import threading
+from datetime import datetime
+
+import pytest
+from feedback import TaskFeedback
+from memory import RetentionPolicy, SQLiteMemory, open_memory
+
+
+@pytest.fixture
+def memory(tmp_path):
+    return SQLiteMemory(str(tmp_path / "memory.db"))
+
+
+def test_persist_and_retrieve(memory):
+    memory.persist("test_user", "Prefers DSA practice after 20:00")
+    memory.persist("test_user", {"type": "task", "title": "Physics revision"}, tags=["exam"])
+    memory.persist("other_user", "Physics tutoring")
+
+    assert memory.retrieve("test_user", limit=1) == [{"type": "task", "title": "Physics revision"}]
+    assert memory.retrieve("test_user", "physics") == [{"type": "task", "title": "Physics revision"}]
+    assert memory.retrieve("test_user", "chemistry", limit=1) == [{"type": "task", "title": "Physics revision"}]
+    assert memory.entries("test_user")[1]["tags"] == ["exam"]
+
+
+def test_concurrent_writers_keep_every_entry(memory):
+    def write(worker):
+        for i in range(20):
+            memory.persist("test_user", f"note {worker}-{i}")
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(memory.entries("test_user")) == 80
+
+
+def test_feedback_insights(memory):
+    now = datetime.now()
+    memory.add_feedback("test_user", TaskFeedback(
+        task_id="morning_fail",
+        scheduled_start=now.replace(hour=8, minute=0),
+        scheduled_end=now.replace(hour=9, minute=0),
+        completed=False,
+        energy_level=2,
+        difficulty=4,
+        satisfaction=2
+    ))
+    weighted = memory.adjust_schedule_weights("test_user", [{
+        "title": "Morning Study",
+        "startTime": now.replace(hour=8, minute=0).isoformat(),
+        "endTime": now.replace(hour=9, minute=0).isoformat()
+    }])
+    assert weighted[0]["slot_weight"] < 1.0
+    assert memory.get_scheduling_insights("other_user") == {"recommendations": [], "time_slots": {}}
+
+
+def test_feedback_store_is_cached_until_rows_change(memory):
+    now = datetime.now()
+
+    def feedback(task_id):
+        return TaskFeedback(task_id=task_id, scheduled_start=now.replace(hour=8, minute=0),
+                            scheduled_end=now.replace(hour=9, minute=0), completed=True,
+                            energy_level=4, difficulty=2, satisfaction=4)
+
+    memory.add_feedback("test_user", feedback("first"))
+    store = memory._feedback_store("test_user")
+    assert memory._feedback_store("test_user") is store
+
+    memory.add_feedback("test_user", feedback("second"))
+    assert set(memory._feedback_store("test_user").task_feedback) == {"first", "second"}
+
+    # A write through another connection (e.g. another worker) is seen too
+    SQLiteMemory(memory.path).add_feedback("test_user", feedback("third"))
+    assert set(memory._feedback_store("test_user").task_feedback) == {"first", "second", "third"}
+
+
+def test_open_memory_selects_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("FLOW_MEMORY_BACKEND", "sqlite")
+    assert isinstance(open_memory(path=str(tmp_path / "memory.db")), SQLiteMemory)
+    with pytest.raises(ValueError):
+        open_memory(backend="redis")
+
+
+def test_typed_queries(memory):
+    memory.persist("test_user", {"type": "task", "title": "Read", "estimatedMinutes": 30})
+    memory.persist("test_user", {"break_ratio": {"work_minutes": 50, "break_minutes": 10}})
+    memory.persist("test_user", {"type": "fixedEvent", "title": "Lab",
+                                 "startTime": "2025-10-21T09:00:00", "endTime": "2025-10-21T11:00:00"})
+    memory.persist("test_user", {"type": "task", "title": "Read", "estimatedMinutes": 45})
+
+    assert memory.tasks("test_user") == [{"type": "task", "title": "Read", "estimatedMinutes": 45}]
+    assert memory.latest_preferences("test_user") == {"break_ratio": {"work_minutes": 50, "break_minutes": 10}}
+    assert memory.fixed_events("test_user", end="2025-10-21T09:00:00") == []
+    assert [e["title"] for e in memory.fixed_events("test_user", start="2025-10-21T10:00:00")] == ["Lab"]
+    memory.persist("test_user", {"type": "fixedEvent", "title": "Trip",
+                                 "startTime": "2025-10-18T08:00:00", "endTime": "2025-10-21T12:00:00"})
+    assert [e["title"] for e in memory.fixed_events("test_user", "2025-10-21T10:00:00", "2025-10-22T00:00:00")] == [
+        "Trip", "Lab"]
+
+
+def test_recurring_events_outlive_their_first_occurrence(memory):
+    memory.persist("test_user", {"type": "fixedEvent", "title": "Lecture", "recurring": "weekly",
+                                 "startTime": "2025-09-01T09:00:00", "endTime": "2025-09-01T10:00:00"})
+    memory.persist("test_user", {"type": "fixedEvent", "title": "Seminar",
+                                 "startTime": "2025-09-02T14:00:00", "endTime": "2025-09-02T15:00:00",
+                                 "recurrence": {"freq": "weekly", "until": "2025-10-14"}})
+    memory.persist("test_user", {"type": "fixedEvent", "title": "Lab",
+                                 "startTime": "2025-10-21T09:00:00", "endTime": "2025-10-21T11:00:00"})
+
+    week = ("2025-10-20T00:00:00", "2025-10-27T00:00:00")
+    assert [e["title"] for e in memory.fixed_events("test_user", *week)] == ["Lecture", "Lab"]
+    assert [e["title"] for e in memory.fixed_events("test_user", "2025-10-14T00:00:00")] == [
+        "Lecture", "Seminar", "Lab"]
+    assert memory.fixed_events("test_user", end="2025-09-01T09:00:00") == []
+
+
+def test_compaction_applies_retention(memory):
+    memory.persist("test_user", {"type": "task", "title": "Essay"})
+    memory.persist("test_user", {"type": "task", "title": "Essay", "completed": True,
+                                 "completedAt": "2020-01-01T10:00:00"})
+    memory.persist("test_user", {"type": "preferences", "workDayStart": "08:00"})
+    memory.persist("test_user", {"type": "preferences", "workDayStart": "09:00"})
+    memory.persist("test_user", "old note")
+
+    report = memory.compact(RetentionPolicy(max_notes_per_user=0))
+
+    assert report["entries_reclaimed"] == 4
+    assert memory.tasks("test_user") == []
+    assert memory.retrieve("test_user", "note") == [{"type": "preferences", "workDayStart": "09:00"}]
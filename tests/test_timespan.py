@@ -0,0 +1,23 @@
+"""Unit tests for the epoch-minute time representation."""
+from datetime import datetime
+
+from timespan import Span, hour_of, parse_minutes, to_iso, weekday_of
+
+
+def test_minutes_round_trip_calendar_fields():
+    for value in ["2025-10-18T10:30:00", "2024-02-29T23:59:00", "1999-12-31T00:00:00"]:
+        minutes = parse_minutes(value)
+        dt = datetime.fromisoformat(value)
+        assert to_iso(minutes) == value
+        assert hour_of(minutes) == dt.hour
+        assert weekday_of(minutes) == dt.weekday()
+
+
+def test_span_to_slot():
+    span = Span.parse("2025-10-18T09:00:00", "2025-10-18T11:30:00")
+    assert span.minutes == 150
+    assert span.to_slot() == {
+        "startTime": "2025-10-18T09:00:00",
+        "endTime": "2025-10-18T11:30:00",
+        "duration": 2.5
+    }
@@ -0,0 +1,77 @@
+"""Compact time representation used inside the scheduling pipeline.
+
+ISO timestamps are parsed once, at the pipeline boundary, into integer
+minutes since 1970-01-01 (naive wall-clock time). They are turned back into
+ISO strings only when a response is serialized.
+"""
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict
+
+EPOCH = datetime(1970, 1, 1)
+MINUTE = timedelta(minutes=1)
+DAY_MINUTES = 24 * 60
+
+
+def minutes_of(dt: datetime) -> int:
+    """Convert a datetime to epoch minutes."""
+    return (dt - EPOCH) // MINUTE
+
+
+def from_minutes(minutes: int) -> datetime:
+    return EPOCH + timedelta(minutes=minutes)
+
+
+@lru_cache(maxsize=8192)
+def parse_minutes(value: str) -> int:
+    """Parse an ISO timestamp to epoch minutes (cached by string)."""
+    return minutes_of(datetime.fromisoformat(value))
+
+
+def to_iso(minutes: int) -> str:
+    return from_minutes(minutes).isoformat()
+
+
+def hour_of(minutes: int) -> int:
+    """Hour of the day (0-23)."""
+    return (minutes % DAY_MINUTES) // 60
+
+
+def weekday_of(minutes: int) -> int:
+    """Day of the week, Monday == 0 (the epoch was a Thursday)."""
+    return (minutes // DAY_MINUTES + 3) % 7
+
+
+class Span:
+    """A half-open [start, end) interval in epoch minutes."""
+
+    __slots__ = ("start", "end")
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def parse(cls, start: str, end: str) -> "Span":
+        return cls(parse_minutes(start), parse_minutes(end))
+
+    @property
+    def minutes(self) -> int:
+        return self.end - self.start
+
+    @property
+    def hours(self) -> float:
+        return (self.end - self.start) / 60
+
+    def to_slot(self) -> Dict[str, Any]:
+        """Serialize as an availableSlots entry."""
+        return {"startTime": to_iso(self.start), "endTime": to_iso(self.end), "duration": self.hours}
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Span) and (self.start, self.end) == (other.start, other.end)
+
+    def __hash__(self) -> int:
+        return hash((self.start, self.end))
+
+    def __repr__(self) -> str:
+        return f"Span({to_iso(self.start)}, {to_iso(self.end)})"
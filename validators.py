@@ -1,5 +1,5 @@
 """JSON response validation and retry logic for LLM outputs."""
-from typing import Dict, Any, Optional, Tuple
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple
 import json
 from pydantic import ValidationError, BaseModel
 
@@ -71,31 +71,63 @@ class ResponseValidator:
 
 def validate_llm_response(response: str,
                          agent_type: str,
-                         max_retries: int = 3) -> Dict[str, Any]:
-    """Validate LLM response with retries.
+                         max_retries: int = 3,
+                         regenerate: Optional[Callable[[str], Optional[str]]] = None) -> Dict[str, Any]:
+    """Validate LLM response, re-prompting on failure.
     
     Args:
         response: Raw LLM response text
         agent_type: Type of agent ("parser", "constraint", "allocator", "coach")
-        max_retries: Maximum number of retry attempts
+        max_retries: Maximum number of attempts, including the first response
+        regenerate: Called with the validation error to get a new response
+            from the model; returning None stops retrying. Without it the
+            response is validated once.
         
     Returns:
         Validated response dict or error dict
     """
     validator = ResponseValidator()
+    data, error = validator.clean_and_validate(response, agent_type)
     
-    for attempt in range(max_retries):
+    attempts = 1
+    while error and regenerate is not None and attempts < max_retries:
+        new_response = regenerate(error)
+        if new_response is None:
+            break
+        response = new_response
         data, error = validator.clean_and_validate(response, agent_type)
+        attempts += 1
         
-        if data and not error:
-            return data
-            
-        if attempt < max_retries - 1:
-            # Could implement exponential backoff here if needed
-            continue
-            
+    return _validation_result(data, error, response)
+
+
+async def avalidate_llm_response(response: str,
+                                 agent_type: str,
+                                 max_retries: int = 3,
+                                 regenerate: Optional[Callable[[str], Awaitable[Optional[str]]]] = None
+                                 ) -> Dict[str, Any]:
+    """Like validate_llm_response, awaiting `regenerate` for each re-prompt."""
+    validator = ResponseValidator()
+    data, error = validator.clean_and_validate(response, agent_type)
+
+    attempts = 1
+    while error and regenerate is not None and attempts < max_retries:
+        new_response = await regenerate(error)
+        if new_response is None:
+            break
+        response = new_response
+        data, error = validator.clean_and_validate(response, agent_type)
+        attempts += 1
+
+    return _validation_result(data, error, response)
+
+
+def _validation_result(data: Optional[Dict[str, Any]], error: Optional[str], response: str) -> Dict[str, Any]:
+    if data and not error:
+        return data
+
     # If we exhausted retries, return error state
     return {
         "error": error or "Maximum retry attempts reached",
         "raw_response": response
-    }
\ No newline at end of file
+    }